@@ -27,6 +27,7 @@ from evennia.accounts.manager import AccountManager
 from evennia.accounts.models import AccountDB
 from evennia.commands.cmdsethandler import CmdSetHandler
 from evennia.comms.models import ChannelDB
+from evennia.locks.lockhandler import invalidate_lock_cache
 from evennia.objects.models import ObjectDB
 from evennia.scripts.scripthandler import ScriptHandler
 from evennia.server.models import ServerConfig
@@ -543,6 +544,8 @@ class DefaultAccount(AccountDB, metaclass=TypeclassBase):
 
         # re-cache locks to make sure superuser bypass is updated
         obj.locks.cache_lock_bypass(obj)
+        # cached lock results may depend on the puppeting account
+        invalidate_lock_cache()
         # final hook
         obj.at_post_puppet()
         SIGNAL_OBJECT_POST_PUPPET.send(sender=obj, account=self, session=session)
@@ -567,6 +570,8 @@ class DefaultAccount(AccountDB, metaclass=TypeclassBase):
                 obj.sessions.remove(session)
                 if not obj.sessions.count():
                     del obj.account
+                    # cached lock results may depend on the puppeting account
+                    invalidate_lock_cache()
                 obj.at_post_unpuppet(self, session=session)
                 obj.tags.remove("puppeted", category="account")
                 SIGNAL_OBJECT_POST_UNPUPPET.send(sender=obj, session=session, account=self)
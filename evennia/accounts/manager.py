@@ -9,6 +9,7 @@ from django.contrib.auth.models import UserManager
 from django.utils import timezone
 
 from evennia.server import signals
+from evennia.typeclasses.keyindex import get_key_index
 from evennia.typeclasses.managers import TypeclassManager, TypedObjectManager
 from evennia.utils.utils import class_from_module, dbid_to_obj, make_iter
 
@@ -177,6 +178,21 @@ class AccountDBManager(TypedObjectManager, UserManager):
             else:
                 typeclass = str(typeclass)
             query["db_typeclass_path"] = typeclass
+
+        index = isinstance(ostring, str) and get_key_index(self.model._meta.concrete_model)
+        if index:
+            # use the in-memory key index instead of scanning the table
+            match = "exact" if exact else "contains"
+            ids = index.search(
+                ostring, match=match, typeclasses=[typeclass] if typeclass else None, aliases=False
+            )
+            if ids is not None:
+                matches = self.filter(id__in=ids)
+                if not matches:
+                    ids = index.search(ostring, match=match, keys=False)
+                    matches = self.filter(id__in=ids) if ids else self.none()
+                return matches
+
         if exact:
             matches = self.filter(**query)
         else:
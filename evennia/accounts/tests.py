@@ -427,6 +427,15 @@ class TestDefaultAccountEv(BaseEvenniaTest):
             self.account.puppet_object(self.session, self.char1)
             self.account.msg.assert_called_with("You are already puppeting this object.")
 
+    def test_unpuppet_invalidates_lock_cache(self):
+        self.assertEqual(self.session.puppet, self.char1)
+        with patch("evennia.accounts.accounts.invalidate_lock_cache") as mock_invalidate:
+            self.char1.at_post_unpuppet = MagicMock(
+                side_effect=lambda *args, **kwargs: mock_invalidate.assert_called_once()
+            )
+            self.account.unpuppet_object(self.session)
+        self.char1.at_post_unpuppet.assert_called_once()
+
     @patch("evennia.accounts.accounts.time.time", return_value=10000)
     def test_idle_time(self, mock_time):
         self.session.cmd_last_visible = 10000 - 10
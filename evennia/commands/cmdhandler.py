@@ -32,7 +32,6 @@ from collections import defaultdict
 from copy import copy
 from itertools import chain
 from traceback import format_exc
-from weakref import WeakValueDictionary
 
 from django.conf import settings
 from django.utils.translation import gettext as _
@@ -40,7 +39,7 @@ from twisted.internet import reactor
 from twisted.internet.defer import inlineCallbacks
 from twisted.internet.task import deferLater
 
-from evennia.commands.cmdset import CmdSet
+from evennia.commands.cmdset import CMDSET_MERGE_CACHE, CmdSet
 from evennia.commands.command import InterruptCommand
 from evennia.utils import logger, utils
 from evennia.utils.utils import string_suggestions
@@ -49,7 +48,6 @@ _IN_GAME_ERRORS = settings.IN_GAME_ERRORS
 
 __all__ = ("cmdhandler", "InterruptCommand")
 _GA = object.__getattribute__
-_CMDSET_MERGE_CACHE = WeakValueDictionary()
 
 # tracks recursive calls by each caller
 # to avoid infinite loops (commands calling themselves)
@@ -148,6 +146,8 @@ _ERROR_RECURSION_LIMIT = _(
 
 # delayed imports
 _GET_INPUT = None
+_AT_ACCESS = None
+_CONTENTS_GET = None
 
 
 # helper functions
@@ -311,6 +311,65 @@ def generate_cmdset_providers(called_by, session=None):
     return cmdset_providers, cmdset_providers_list, cmdset_providers_errors_list, caller, error_to
 
 
+def _call_access(obj, caller):
+    """
+    Check the `call` lock of an object (to see if its cmdsets should be
+    made available to the caller).
+
+    Args:
+        obj (Object): The object with cmdsets.
+        caller (Object): The one wanting to use the cmdsets.
+
+    Returns:
+        bool: If the caller has `call` access.
+
+    Notes:
+        Most `call`-locks are static (like `call:true()`). For those, the result
+        is cached on the lockhandler until the lock changes so no lock functions
+        need to run. All other locks are checked normally.
+
+    """
+    global _AT_ACCESS
+    if not _AT_ACCESS:
+        from evennia.objects.objects import DefaultObject
+
+        _AT_ACCESS = DefaultObject.at_access
+    if getattr(type(obj), "at_access", _AT_ACCESS) is _AT_ACCESS:
+        result = obj.locks.get_static_result("call")
+        if result is not None:
+            return result
+    return obj.access(caller, access_type="call", no_superuser_bypass=True)
+
+
+def _get_cmdset_carriers(obj, exclude=None):
+    """
+    Get the contents of an object that may provide cmdsets to others.
+
+    Args:
+        obj (Object): The location or carrier of the objects.
+        exclude (Object, optional): Object to ignore.
+
+    Returns:
+        list: The cmdset-carrying contents of `obj`.
+
+    Notes:
+        If `contents_get` is not overridden, this is taken directly from the
+        contents-cache. Otherwise the result of `contents_get` is filtered so
+        the customized contents (like hiding objects in darkness) are respected.
+
+    """
+    global _CONTENTS_GET
+    if not _CONTENTS_GET:
+        from evennia.objects.objects import DefaultObject
+
+        _CONTENTS_GET = DefaultObject.contents_get
+    carriers = obj.contents_cache.get_cmdset_carriers(exclude=exclude)
+    if getattr(type(obj), "contents_get", _CONTENTS_GET) is _CONTENTS_GET:
+        return carriers
+    carrier_pks = {carrier.pk for carrier in carriers}
+    return [cobj for cobj in obj.contents_get(exclude=exclude) if cobj.pk in carrier_pks]
+
+
 @inlineCallbacks
 def get_and_merge_cmdsets(
     caller, cmdset_providers, callertype, raw_string, report_to=None, cmdid=None
@@ -357,15 +416,17 @@ def get_and_merge_cmdsets(
                     location = None
                 if location:
                     # Gather all cmdsets stored on objects in the room and
-                    # also in the caller's inventory and the location itself
+                    # also in the caller's inventory and the location itself. The
+                    # contents-caches keep track of which objects have cmdsets at all.
                     local_objlist = yield (
-                        location.contents_get(exclude=obj) + obj.contents_get() + [location]
+                        _get_cmdset_carriers(location, exclude=obj)
+                        + _get_cmdset_carriers(obj)
+                        + [location]
                     )
                     local_objlist = [
                         o
                         for o in local_objlist
-                        if not o._is_deleted
-                        and o.access(caller, access_type="call", no_superuser_bypass=True)
+                        if not o._is_deleted and _call_access(o, caller)
                     ]
                     for lobj in local_objlist:
                         try:
@@ -446,12 +507,9 @@ def get_and_merge_cmdsets(
             ]
 
         if cmdsets:
-            # faster to do tuple on list than to build tuple directly
-            mergehash = tuple([id(cmdset) for cmdset in cmdsets])
-            if mergehash in _CMDSET_MERGE_CACHE:
-                # cached merge exist; use that
-                cmdset = _CMDSET_MERGE_CACHE[mergehash]
-            else:
+            mergekey = CMDSET_MERGE_CACHE.get_key(cmdsets)
+            cmdset = CMDSET_MERGE_CACHE.get(mergekey)
+            if cmdset is None:
                 # we group and merge all same-prio cmdsets separately (this avoids
                 # order-dependent clashes in certain cases, such as
                 # when duplicates=True)
@@ -474,7 +532,7 @@ def get_and_merge_cmdsets(
                 # store the original, ungrouped set for diagnosis
                 cmdset.merged_from = cmdsets
                 # cache
-                _CMDSET_MERGE_CACHE[mergehash] = cmdset
+                CMDSET_MERGE_CACHE.add(mergekey, cmdset)
         else:
             cmdset = None
         for cset in (cset for cset in local_obj_cmdsets if cset):
@@ -27,8 +27,10 @@ Set theory.
 
 """
 
+from collections import OrderedDict, defaultdict
 from weakref import WeakKeyDictionary
 
+from django.conf import settings
 from django.utils.translation import gettext as _
 
 from evennia.utils.utils import inherits_from, is_iter
@@ -183,6 +185,8 @@ class CmdSet(object, metaclass=_CmdSetMeta):
     persistent = False
     key_mergetypes = {}
     errmessage = ""
+    # increased whenever commands are added/removed, to invalidate cached merges
+    _version = 0
     # pre-store properties to duplicate straight off
     to_duplicate = (
         "key",
@@ -565,6 +569,7 @@ class CmdSet(object, metaclass=_CmdSetMeta):
             # extra run to make sure to avoid doublets
             commands = list(set(commands))
         self.commands = commands
+        self._version += 1
 
     def remove(self, cmd):
         """
@@ -594,6 +599,7 @@ class CmdSet(object, metaclass=_CmdSetMeta):
                 pass
         else:
             self.commands = [oldcmd for oldcmd in self.commands if oldcmd != cmd]
+        self._version += 1
 
     def get(self, cmd):
         """
@@ -705,3 +711,134 @@ class CmdSet(object, metaclass=_CmdSetMeta):
 
         """
         pass
+
+
+class CmdSetMergeCache:
+    """
+    LRU cache of merged cmdsets, used by the cmdhandler to avoid re-merging the
+    same cmdsets for every command.
+
+    The merge result holds the actual Command instances of the merged cmdsets
+    (and these know which object they sit on), so a result can only be reused
+    for the same cmdset instances. The cache key is therefore the identity of
+    each cmdset together with the state affecting the merge (key, priority,
+    mergetype, flags and a version counter that changes when commands are
+    added or removed). Since the cache holds on to the merged cmdset (and
+    thereby to the cmdsets it was merged from), the identity cannot be reused
+    while the entry remains in the cache.
+
+    """
+
+    def __init__(self, maxsize=1000):
+        """
+        Args:
+            maxsize (int, optional): The max number of merge results to keep.
+                The least recently used results are evicted first.
+
+        """
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        # {id(cmdset): {key, ...}} to find the entries to invalidate
+        self._keys_by_cmdset = defaultdict(set)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def get_key(cmdsets):
+        """
+        Get the cache key for merging a sequence of cmdsets.
+
+        Args:
+            cmdsets (list): The cmdsets to merge, in merge order.
+
+        Returns:
+            tuple: The cache key.
+
+        """
+        return tuple(
+            [
+                (
+                    id(cmdset),
+                    cmdset._version,
+                    len(cmdset.commands),
+                    cmdset.key,
+                    cmdset.priority,
+                    cmdset.mergetype,
+                    cmdset.duplicates,
+                    cmdset.no_exits,
+                    cmdset.no_objs,
+                    cmdset.no_channels,
+                )
+                for cmdset in cmdsets
+            ]
+        )
+
+    def get(self, key):
+        """
+        Get a cached merge result.
+
+        Args:
+            key (tuple): A key from `get_key`.
+
+        Returns:
+            CmdSet or None: The merged cmdset, if cached.
+
+        """
+        cmdset = self._cache.get(key)
+        if cmdset is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return cmdset
+
+    def add(self, key, cmdset):
+        """
+        Cache a merge result.
+
+        Args:
+            key (tuple): A key from `get_key`.
+            cmdset (CmdSet): The merged cmdset.
+
+        """
+        self._cache[key] = cmdset
+        self._cache.move_to_end(key)
+        for part in key:
+            self._keys_by_cmdset[part[0]].add(key)
+        while len(self._cache) > self.maxsize:
+            self._remove(next(iter(self._cache)))
+
+    def _remove(self, key):
+        self._cache.pop(key, None)
+        for part in key:
+            keys = self._keys_by_cmdset.get(part[0])
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_cmdset[part[0]]
+
+    def invalidate(self, cmdsets):
+        """
+        Remove all cached merges involving any of the given cmdsets.
+
+        Args:
+            cmdsets (list): The cmdsets to invalidate.
+
+        """
+        for cmdset in cmdsets:
+            for key in list(self._keys_by_cmdset.get(id(cmdset), ())):
+                self._remove(key)
+
+    def clear(self):
+        """
+        Empty the cache.
+
+        """
+        self._cache.clear()
+        self._keys_by_cmdset.clear()
+
+
+CMDSET_MERGE_CACHE = CmdSetMergeCache(maxsize=settings.CMDSET_MERGE_CACHE_SIZE)
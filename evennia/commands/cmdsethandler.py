@@ -73,7 +73,7 @@ from traceback import format_exc
 from django.conf import settings
 from django.utils.translation import gettext as _
 
-from evennia.commands.cmdset import CmdSet
+from evennia.commands.cmdset import CMDSET_MERGE_CACHE, CmdSet
 from evennia.server.models import ServerConfig
 from evennia.utils import logger, utils
 
@@ -307,6 +307,8 @@ class CmdSetHandler(object):
 
         # the subset of the cmdset_paths that are to be stored in the database
         self.persistent_paths = [""]
+        # the stack as of the last update, for invalidating cached merges
+        self._merged_stack = []
 
         if init_true:
             self.update(init_mode=True)  # is then called from the object __init__.
@@ -378,6 +380,9 @@ class CmdSetHandler(object):
             to the central `cmdhandler.get_and_merge_cmdsets()`!
 
         """
+        # merges cached with the previous stack are no longer valid
+        CMDSET_MERGE_CACHE.invalidate(self._merged_stack)
+
         if init_mode:
             # reimport all persistent cmdsets
             storage = self.obj.cmdset_storage
@@ -423,6 +428,14 @@ class CmdSetHandler(object):
                 continue
             self.mergetype_stack.append(new_current.actual_mergetype)
         self.current = new_current
+        self._merged_stack = list(self.cmdset_stack)
+
+        # let the location know if we now carry cmdsets or not
+        location = getattr(self.obj, "db_location", None)
+        if location:
+            contents_cache = location.__dict__.get("contents_cache")
+            if contents_cache:
+                contents_cache.update_cmdset_carrier(self.obj, cmdsethandler=self)
 
     def add(self, cmdset, emit_to_obj=None, persistent=False, default_cmdset=False, **kwargs):
         """
@@ -24,6 +24,7 @@ from codecs import lookup as codecs_lookup
 
 import evennia
 from django.conf import settings
+from evennia.locks.lockhandler import invalidate_lock_cache
 from evennia.utils import create, logger, search, utils
 
 COMMAND_DEFAULT_CLASS = utils.class_from_module(settings.COMMAND_DEFAULT_CLASS)
@@ -1007,12 +1008,14 @@ class CmdQuell(COMMAND_DEFAULT_CLASS):
                 self.msg(f"Already using normal Account permissions {permstr}.")
             else:
                 account.attributes.remove("_quell")
+                invalidate_lock_cache()
                 self.msg(f"Account permissions {permstr} restored.")
         else:
             if account.attributes.get("_quell"):
                 self.msg(f"Already quelling Account {permstr} permissions.")
                 return
             account.attributes.add("_quell", True)
+            invalidate_lock_cache()
             puppet = self.session.puppet if self.session else None
             if puppet:
                 cpermstr = "(%s)" % ", ".join(puppet.permissions.all())
@@ -8,7 +8,7 @@ import typing
 import evennia
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Max, Min, Q
+from django.db.models import Max, Min, Q, QuerySet
 from evennia import InterruptCommand
 from evennia.commands.cmdhandler import generate_cmdset_providers, get_and_merge_cmdsets
 from evennia.locks.lockhandler import LockException
@@ -3411,8 +3411,13 @@ class ScriptEvMore(EvMore):
 
     def init_pages(self, scripts):
         """Prepare the script list pagination"""
-        script_pages = Paginator(scripts, max(1, int(self.height / 2)))
-        super().init_pages(script_pages)
+        if isinstance(scripts, QuerySet):
+            # fetched one page at a time, with room for two lines per script
+            self.height = max(1, int(self.height / 2))
+            super().init_pages(scripts)
+        else:
+            script_pages = Paginator(scripts, max(1, int(self.height / 2)))
+            super().init_pages(script_pages)
 
     def page_formatter(self, scripts):
         """Takes a page of scripts and formats the output
@@ -17,11 +17,17 @@ import subprocess
 import twisted
 from django.conf import settings
 from evennia.accounts.models import AccountDB
+from evennia.comms.models import ChannelDB
+from evennia.objects.models import ObjectDB
+from evennia.scripts.models import ScriptDB
 from evennia.scripts.taskhandler import TaskHandlerTask
+from evennia.typeclasses.keyindex import get_key_index
+from evennia.typeclasses.tagindex import get_tag_index
 from evennia.utils import gametime, logger, search, utils
 from evennia.utils.eveditor import EvEditor
 from evennia.utils.evmenu import ask_yes_no
 from evennia.utils.evtable import EvTable
+from evennia.utils.executors import all_executors
 from evennia.utils.utils import class_from_module, iter_to_str
 
 COMMAND_DEFAULT_CLASS = class_from_module(settings.COMMAND_DEFAULT_CLASS)
@@ -766,6 +772,9 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
     Switches:
         mem - return only a string of the current memory usage
         flushmem - flush the idmapper cache
+        reindex - rebuild the search key and tag indexes (if SEARCH_KEY_INDEX
+          and/or SEARCH_TAG_INDEX are set)
+        checkindex - compare the tag index with the database
 
     This command shows server load statistics and dynamic memory
     usage. It also allows to flush the cache of accessed database
@@ -791,11 +800,17 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
     caches may not show you a lower Residual/Virtual memory footprint,
     the released memory will instead be re-used by the program.
 
+    If the |wsearch key index|n or |wtag index|n are active, their sizes
+    are also shown. The |wreindex|n switch rebuilds them from the database,
+    which is needed if the database was changed from outside the server.
+    The |wcheckindex|n switch lists the differences between the tag index
+    and the database, if any.
+
     """
 
     key = "@server"
     aliases = ["@serverload"]
-    switch_options = ("mem", "flushmem")
+    switch_options = ("mem", "flushmem", "reindex", "checkindex")
     locks = "cmd:perm(list) or perm(Developer)"
     help_category = "System"
 
@@ -818,6 +833,49 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
             self.msg(string.format(idmapper=(prev - now), gc=nflushed))
             return
 
+        if "reindex" in self.switches:
+            if not (settings.SEARCH_KEY_INDEX or settings.SEARCH_TAG_INDEX):
+                self.msg(
+                    "The search key index is not active (see settings.SEARCH_KEY_INDEX "
+                    "and SEARCH_TAG_INDEX)."
+                )
+                return
+            if settings.SEARCH_KEY_INDEX:
+                for model in (ObjectDB, AccountDB):
+                    get_key_index(model).build()
+                self.msg("Rebuilt the search key index.")
+            if settings.SEARCH_TAG_INDEX:
+                for model in (ObjectDB, AccountDB, ScriptDB, ChannelDB):
+                    get_tag_index(model).build()
+                self.msg("Rebuilt the tag index.")
+            return
+
+        if "checkindex" in self.switches:
+            if not settings.SEARCH_TAG_INDEX:
+                self.msg("The tag index is not active (see settings.SEARCH_TAG_INDEX).")
+                return
+            string = ""
+            for model in (ObjectDB, AccountDB, ScriptDB, ChannelDB):
+                missing, extra = get_tag_index(model).check()
+                for prefix, entries in (("missing", missing), ("extra", extra)):
+                    for dbid, tagtype, key, category in entries:
+                        string += "\n %s: %s #%i: %s (category: %s, tagtype: %s)" % (
+                            prefix,
+                            model.__name__,
+                            dbid,
+                            key,
+                            category,
+                            tagtype,
+                        )
+            if string:
+                self.msg(
+                    "|rThe tag index differs from the database:|n%s\n"
+                    "Use server/reindex to rebuild it." % string
+                )
+            else:
+                self.msg("The tag index matches the database.")
+            return
+
         # display active processes
 
         os_windows = os.name == "nt"
@@ -929,12 +987,87 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
             key=lambda tup: tup[1],
             reverse=True,
         )
-        memtable = self.styled_table("entity name", "number", "idmapper %", align="l")
+        cachestats = _IDMAPPER.cache_stats()
+        memtable = self.styled_table(
+            "entity name", "number", "idmapper %", "hits", "misses", "evicted", align="l"
+        )
         for tup in sorted_cache:
-            memtable.add_row(tup[0], "%i" % tup[1], "%.2f" % (float(tup[1]) / total_num * 100))
+            stats = cachestats.get(tup[0], {})
+            memtable.add_row(
+                tup[0],
+                "%i" % tup[1],
+                "%.2f" % (float(tup[1]) / total_num * 100),
+                "%i" % stats.get("hits", 0),
+                "%i" % stats.get("misses", 0),
+                "%i" % stats.get("evictions", 0),
+            )
 
         string += "\n|w Entity idmapper cache:|n %i items\n%s" % (total_num, memtable)
 
+        if settings.IDMAPPER_WRITE_BEHIND:
+            metrics = _IDMAPPER.WRITE_BEHIND_QUEUE.metrics()
+            wbtable = self.styled_table("property", "statistic", align="l")
+            wbtable.add_row(
+                "Queue depth (max)", "%i (%i)" % (metrics["depth"], metrics["max_depth"])
+            )
+            wbtable.add_row("Flushes / saves", "%i / %i" % (metrics["flushes"], metrics["saves"]))
+            wbtable.add_row("Coalesced saves", "%i" % metrics["coalesced"])
+            wbtable.add_row(
+                "Flush time (last/max)",
+                "%.1fms / %.1fms"
+                % (metrics["last_flush_time"] * 1000, metrics["max_flush_time"] * 1000),
+            )
+            string += "\n|w Write-behind save queue:|n\n%s" % wbtable
+
+        if settings.SEARCH_KEY_INDEX:
+            indextable = self.styled_table("index", "entities", "words", "memory", align="l")
+            for model in (ObjectDB, AccountDB):
+                index, name = get_key_index(model), model.__name__
+                if index.built:
+                    stats = index.stats()
+                    indextable.add_row(
+                        name,
+                        "%i" % stats["entities"],
+                        "%i" % stats["words"],
+                        "%.1f MB" % (stats["memory"] / (1000.0 * 1000)),
+                    )
+                else:
+                    indextable.add_row(name, "(not built)", "", "")
+            string += "\n|w Search key index:|n\n%s" % indextable
+
+        if settings.SEARCH_TAG_INDEX:
+            indextable = self.styled_table("index", "entities", "tags", "memory", align="l")
+            for model in (ObjectDB, AccountDB, ScriptDB, ChannelDB):
+                index, name = get_tag_index(model), model.__name__
+                if index.built:
+                    stats = index.stats()
+                    indextable.add_row(
+                        name,
+                        "%i" % stats["entities"],
+                        "%i" % stats["tags"],
+                        "%.1f MB" % (stats["memory"] / (1000.0 * 1000)),
+                    )
+                else:
+                    indextable.add_row(name, "(not built)", "", "")
+            string += "\n|w Tag index:|n\n%s" % indextable
+
+        executors = all_executors()
+        if executors:
+            pooltable = self.styled_table(
+                "pool", "running", "queued (max)", "done", "failed", "rejected", align="l"
+            )
+            for name, executor in sorted(executors.items()):
+                stats = executor.stats()
+                pooltable.add_row(
+                    name,
+                    "%i/%i" % (stats["running"], stats["maxthreads"]),
+                    "%i (%i)" % (stats["queued"], stats["max_queued"]),
+                    "%i" % stats["completed"],
+                    "%i" % stats["failed"],
+                    "%i" % stats["rejected"],
+                )
+            string += "\n|w Executor pools:|n\n%s" % pooltable
+
         # return to caller
         self.msg(string)
 
@@ -950,6 +1083,11 @@ class CmdTickers(COMMAND_DEFAULT_CLASS):
     using the TickerHandler. This is merely a convenience function for
     inspecting the current status.
 
+    The load of each interval is also shown: |woverruns|n counts ticks that
+    came before the previous tick had called all its subscribers, and |wlag|n
+    is how late (last/max) the subscribers were called. Overruns are handled
+    according to settings.TICKER_OVERLOAD_POLICY.
+
     """
 
     key = "@tickers"
@@ -976,7 +1114,19 @@ class CmdTickers(COMMAND_DEFAULT_CLASS):
                 sub[4] or "[Unset]",
                 "*" if sub[5] else "-",
             )
-        self.msg("|wActive tickers|n:\n" + str(table))
+        loadtable = self.styled_table(
+            "interval (s)", "subscribers", "ticks", "overruns", "skipped/merged", "lag (s)"
+        )
+        for interval, metrics in sorted(TICKER_HANDLER.metrics().items()):
+            loadtable.add_row(
+                interval,
+                metrics["subscribers"],
+                metrics["ticks"],
+                metrics["overruns"],
+                "%i/%i" % (metrics["skipped"], metrics["merged"]),
+                "%.2f/%.2f" % (metrics["lag"], metrics["max_lag"]),
+            )
+        self.msg("|wActive tickers|n:\n" + str(table) + "\n|wTicker load|n:\n" + str(loadtable))
 
 
 class CmdTasks(COMMAND_DEFAULT_CLASS):
@@ -369,9 +369,45 @@ class TestSystem(BaseEvenniaCommandTest):
     def test_about(self):
         self.call(system.CmdAbout(), "", None)
 
+    def test_tickers(self):
+        from evennia.scripts.tickerhandler import Ticker, TickerHandler
+
+        handler, ticker = TickerHandler(), Ticker(10)
+        ticker.task.clock = task.Clock()
+        ticker.add((None, None, "path.to.func", 10, "", False), _callback=Mock(), _obj=None)
+        handler.ticker_pool.tickers[10] = ticker
+        with patch("evennia.scripts.tickerhandler.TICKER_HANDLER", handler):
+            self.call(system.CmdTickers(), "", "Active tickers:")
+            self.assertIn("Ticker load", self.call(system.CmdTickers(), ""))
+        ticker.stop()
+
     def test_server_load(self):
         self.call(system.CmdServerLoad(), "", "Server CPU and Memory load:")
 
+    def test_server_reindex(self):
+        self.call(system.CmdServerLoad(), "/reindex", "The search key index is not active")
+        with (
+            override_settings(SEARCH_KEY_INDEX=True),
+            patch("evennia.typeclasses.keyindex._KEY_INDEXES", new_callable=dict),
+        ):
+            self.call(system.CmdServerLoad(), "/reindex", "Rebuilt the search key index.")
+
+    def test_server_checkindex(self):
+        self.call(system.CmdServerLoad(), "/checkindex", "The tag index is not active")
+        with (
+            override_settings(SEARCH_TAG_INDEX=True),
+            patch("evennia.typeclasses.tagindex._TAG_INDEXES", new_callable=dict),
+        ):
+            self.call(system.CmdServerLoad(), "/reindex", "Rebuilt the tag index.")
+            self.call(system.CmdServerLoad(), "/checkindex", "The tag index matches the database.")
+            self.obj1.db_tags.add(ObjectDB.objects.create_tag(key="unindexed"))
+            self.call(
+                system.CmdServerLoad(),
+                "/checkindex",
+                "The tag index differs from the database:\n missing: ObjectDB #%i: unindexed"
+                % self.obj1.id,
+            )
+
 
 _TASK_HANDLER = None
 
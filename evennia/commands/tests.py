@@ -5,7 +5,7 @@ Unit testing for the Command system itself.
 
 from django.test import override_settings
 from evennia.commands import cmdparser
-from evennia.commands.cmdset import CmdSet
+from evennia.commands.cmdset import CmdSet, CmdSetMergeCache
 from evennia.commands.command import Command
 from evennia.utils.test_resources import BaseEvenniaTest, TestCase
 
@@ -989,6 +989,7 @@ class TestOptionTransferReplace(TestCase):
 
 
 import sys
+from unittest import mock
 
 from evennia.commands import cmdhandler
 from twisted.trial.unittest import TestCase as TwistedTestCase
@@ -1137,6 +1138,57 @@ class TestGetAndMergeCmdSets(TwistedTestCase, BaseEvenniaTest):
         deferred.addCallback(_callback)
         return deferred
 
+    def test_merge_cache(self):
+        self.set_cmdsets(self.obj1, self.cmdset_a, self.cmdset_b)
+        providers = cmdhandler.generate_cmdset_providers(self.obj1)[1]
+
+        merged = []
+        deferred = cmdhandler.get_and_merge_cmdsets(self.obj1, providers, "object", "")
+        deferred.addCallback(merged.append)
+        deferred = cmdhandler.get_and_merge_cmdsets(self.obj1, providers, "object", "")
+        deferred.addCallback(merged.append)
+        # the same cmdsets give the same (cached) merge result
+        self.assertIs(merged[0], merged[1])
+
+        # changing the stack invalidates the merge
+        self.obj1.cmdset.add(self.cmdset_c)
+        deferred = cmdhandler.get_and_merge_cmdsets(self.obj1, providers, "object", "")
+        deferred.addCallback(merged.append)
+        self.assertIsNot(merged[2], merged[0])
+        self.assertIn(self.cmdset_c, merged[2].merged_from)
+
+        # adding a command directly to a cmdset also changes the merge
+        class CmdE(Command):
+            key = "e"
+
+        self.cmdset_c.add(CmdE)
+        deferred = cmdhandler.get_and_merge_cmdsets(self.obj1, providers, "object", "")
+        deferred.addCallback(merged.append)
+        self.assertIsNot(merged[3], merged[2])
+        self.assertIn("e", [cmd.key for cmd in merged[3].commands])
+
+    def test_contents_get_override(self):
+        """An overridden contents_get decides which objects provide cmdsets"""
+        self.set_cmdsets(self.obj2, self.cmdset_a)
+        room_class = type(self.room1)
+        providers = cmdhandler.generate_cmdset_providers(self.char1)[1]
+
+        def _get_keys():
+            merged = []
+            deferred = cmdhandler.get_and_merge_cmdsets(self.char1, providers, "object", "")
+            deferred.addCallback(merged.append)
+            return [cmd.key for cmd in merged[0].commands]
+
+        self.assertIn("a", _get_keys())
+
+        def _contents_get(room, exclude=None, content_type=None):
+            # hide obj2 in the room
+            return [obj for obj in room.contents_cache.get(exclude=exclude) if obj != self.obj2]
+
+        with mock.patch.object(room_class, "contents_get", _contents_get):
+            self.assertNotIn("a", _get_keys())
+        self.assertIn("a", _get_keys())
+
     def test_command_replace_different_aliases(self):
         cmdset_ee = _CmdSetEe_Ef()
         self.assertEqual(len(cmdset_ee.commands), 1)
@@ -1276,6 +1328,60 @@ class TestCmdSet(BaseEvenniaTest):
         self.assertIsInstance(result, _CmdTest2)
 
 
+class TestCmdSetMergeCache(TestCase):
+    """
+    Test the LRU cache of cmdset merges.
+    """
+
+    def setUp(self):
+        self.cache = CmdSetMergeCache(maxsize=2)
+        self.cmdset_a = _CmdSetA()
+        self.cmdset_b = _CmdSetB()
+        self.cmdset_c = _CmdSetC()
+
+    def test_get_add(self):
+        key = self.cache.get_key([self.cmdset_a, self.cmdset_b])
+        self.assertIsNone(self.cache.get(key))
+        merged = self.cmdset_a + self.cmdset_b
+        self.cache.add(key, merged)
+        self.assertIs(self.cache.get(key), merged)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_changes(self):
+        key = self.cache.get_key([self.cmdset_a, self.cmdset_b])
+        self.assertEqual(key, self.cache.get_key([self.cmdset_a, self.cmdset_b]))
+        self.assertNotEqual(key, self.cache.get_key([self.cmdset_b, self.cmdset_a]))
+        self.assertNotEqual(key, self.cache.get_key([_CmdSetA(), self.cmdset_b]))
+        self.cmdset_a.priority = 5
+        self.assertNotEqual(key, self.cache.get_key([self.cmdset_a, self.cmdset_b]))
+        key = self.cache.get_key([self.cmdset_a, self.cmdset_b])
+        self.cmdset_a.remove("a")
+        self.assertNotEqual(key, self.cache.get_key([self.cmdset_a, self.cmdset_b]))
+
+    def test_lru_eviction(self):
+        key_ab = self.cache.get_key([self.cmdset_a, self.cmdset_b])
+        key_bc = self.cache.get_key([self.cmdset_b, self.cmdset_c])
+        key_ac = self.cache.get_key([self.cmdset_a, self.cmdset_c])
+        self.cache.add(key_ab, CmdSet())
+        self.cache.add(key_bc, CmdSet())
+        self.cache.get(key_ab)
+        self.cache.add(key_ac, CmdSet())
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(key_bc))
+        self.assertIsNotNone(self.cache.get(key_ab))
+
+    def test_invalidate(self):
+        key_ab = self.cache.get_key([self.cmdset_a, self.cmdset_b])
+        key_bc = self.cache.get_key([self.cmdset_b, self.cmdset_c])
+        self.cache.add(key_ab, CmdSet())
+        self.cache.add(key_bc, CmdSet())
+        self.cache.invalidate([self.cmdset_a])
+        self.assertIsNone(self.cache.get(key_ab))
+        self.assertIsNotNone(self.cache.get(key_bc))
+        self.cache.invalidate([self.cmdset_b])
+        self.assertEqual(len(self.cache), 0)
+
+
 class _CmdG(Command):
     key = "smile"
     aliases = ["smile at", "grin", "grin at"]
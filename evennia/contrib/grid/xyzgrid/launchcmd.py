@@ -101,6 +101,12 @@ spawn
     spawn all new rooms/exits (and may take a good while!). For updating, rooms may be
     removed/spawned if a map changed since the last spawn.
 
+spawn changed
+
+    spawns/updates only the regions of each map that changed since the map was last
+    spawned in full. This is much faster than a full spawn when making small changes
+    to a big map. Maps that were never spawned in full are spawned completely.
+
 spawn "(X,Y,Z|mapname)"
 
     spawns/updates only a part of the grid. Remember the quotes around the coordinate (this
@@ -111,6 +117,7 @@ spawn "(X,Y,Z|mapname)"
 Examples:
 
     evennia xyzgrid spawn                  - spawn all
+    evennia xyzgrid spawn changed          - spawn only what changed since last spawn
     evennia xyzgrid "(*, *, mymap1)"       - spawn everything of map/zcoord mymap1
     evennia xyzgrid "(12, 5, mymap1)"      - spawn only coordinate (12, 5) on map/zcoord mymap1
 """
@@ -304,6 +311,11 @@ def _option_spawn(*suboptions):
 
     grid.log = _log
 
+    changed_only = False
+    if suboptions and suboptions[0] == "changed":
+        changed_only = True
+        suboptions = suboptions[1:]
+
     if suboptions:
         opts = "".join(suboptions).strip("()")
         # coordinate tuple
@@ -318,7 +330,12 @@ def _option_spawn(*suboptions):
     else:
         x, y, z = "*", "*", "*"
 
-    if x == y == z == "*":
+    if changed_only:
+        inp = input(
+            "This will (re)spawn the parts of the grid that changed since it was last spawned.\n"
+            "Do you want to continue? [Y]/N? "
+        )
+    elif x == y == z == "*":
         inp = input(
             "This will (re)spawn the entire grid. If it was built before, it may spawn \n"
             "new rooms or delete rooms that no longer matches the grid.\nDo you want to "
@@ -334,7 +351,7 @@ def _option_spawn(*suboptions):
         return
 
     print("Starting spawn ...")
-    grid.spawn(xyz=(x, y, z))
+    grid.spawn(xyz=(x, y, z), changed_only=changed_only)
     print(
         "... spawn complete!\nIt's recommended to reload the server to refresh caches if this "
         "modified an existing grid."
@@ -9,6 +9,7 @@ from unittest import mock
 
 from django.test import TestCase
 from parameterized import parameterized
+from twisted.internet import task
 
 from evennia.utils.test_resources import BaseEvenniaCommandTest, BaseEvenniaTest
 
@@ -317,6 +318,30 @@ MAP11_DISPLAY = r"""
     #-#
 """.strip()
 
+MAP13 = r"""
+
+ + 0 1 2 3
+
+ 1 #-#-#-#
+   |     |
+ 0 #-#-#-#
+
+ + 0 1 2 3
+
+"""
+
+MAP13_CHANGED = r"""
+
+ + 0 1 2 3
+
+ 1 #-#-#
+   |
+ 0 #-#-#-#
+
+ + 0 1 2 3
+
+"""
+
 MAP12a = r"""
 
 + 0 1
@@ -449,6 +474,34 @@ class TestMap1(_MapTest):
             ],
         )
 
+    def test_pathfinding_routes_cache(self):
+        """Routes are solved per start node and the least recently used are dropped"""
+        self.map.pathfinding_cache_size = 2
+        self.map.calculate_path_matrix(force=True)
+        self.assertEqual(self.map.pathfinding_graph.nnz, 8)
+        self.assertFalse(self.map.pathfinding_routes)
+
+        self.map.get_shortest_path((0, 0), (1, 1))
+        self.map.get_shortest_path((1, 0), (0, 1))
+        self.map.get_shortest_path((0, 0), (1, 0))
+        self.assertEqual(list(self.map.pathfinding_routes), [1, 0])
+        self.map.get_shortest_path((0, 1), (1, 1))
+        self.assertEqual(list(self.map.pathfinding_routes), [0, 2])
+
+        distances, predecessors = self.map.get_pathfinding_routes(0)
+        self.assertEqual(list(distances), [0, 1, 1, 2])
+        self.assertEqual(predecessors[0], -9999)
+
+    def test_pathfinding_baked(self):
+        """An unchanged map re-uses the baked graph instead of rebuilding it"""
+        self.map.calculate_path_matrix(force=True)
+        with mock.patch.object(xymap, "csr_matrix", wraps=xymap.csr_matrix) as mock_csr_matrix:
+            self.map.calculate_path_matrix()
+            mock_csr_matrix.assert_not_called()
+            self.map.mapstring += " "
+            self.map.calculate_path_matrix()
+            mock_csr_matrix.assert_called_once()
+
     @parameterized.expand(
         [
             ((0, 0), "| \n#-", [["|", " "], ["#", "-"]]),
@@ -1209,6 +1262,106 @@ class TestMap11(_MapTest):
         self.assertEqual(xyzroom.XYZExit.objects.all().count(), 6)
 
 
+class TestMap13(_MapTest):
+    """
+    Test parsing and spawning a map in regions (chunks).
+
+    """
+
+    map_data = {"map": MAP13, "zcoord": "map13"}
+
+    def setUp(self):
+        patcher = mock.patch.object(xymap.XYMap, "chunk_size", 2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_iter_parse(self):
+        steps = list(self.map.iter_parse(batch_size=2))
+        self.assertEqual(
+            steps,
+            [
+                ("nodes", 2, 3),
+                ("nodes", 3, 3),
+                ("links", 2, 8),
+                ("links", 4, 8),
+                ("links", 6, 8),
+                ("links", 8, 8),
+                ("prototypes", 2, 8),
+                ("prototypes", 4, 8),
+                ("prototypes", 6, 8),
+                ("prototypes", 8, 8),
+            ],
+        )
+        self.assertEqual(len(self.map.node_index_map), 8)
+        south_node = self.map.get_node_from_coord((3, 1)).links["s"]
+        self.assertEqual((south_node.X, south_node.Y), (3, 0))
+
+    def test_chunks(self):
+        chunk_nodes = self.map.get_chunk_nodes()
+        self.assertEqual(list(chunk_nodes), [(0, 0), (1, 0)])
+        self.assertEqual(
+            [(node.X, node.Y) for node in chunk_nodes[(1, 0)]], [(2, 0), (3, 0), (2, 1), (3, 1)]
+        )
+        self.assertEqual(list(self.map.get_chunk_nodes(chunks=[(1, 0)])), [(1, 0)])
+        self.assertEqual(len(self.map.get_chunk_hashes()), 2)
+
+    def test_spawn_changed_only(self):
+        self.assertIsNone(self.grid.get_changed_chunks("map13"))
+        self.grid.spawn()
+        self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 8)
+        self.assertEqual(self.grid.get_changed_chunks("map13"), set())
+
+        self.grid.add_maps({"map": MAP13_CHANGED, "zcoord": "map13"})
+        self.grid.reload()
+        self.assertEqual(self.grid.get_changed_chunks("map13"), {(1, 0)})
+
+        with mock.patch.object(xymap_legend.MapNode, "spawn", autospec=True) as mock_spawn:
+            self.grid.spawn(changed_only=True)
+            self.assertEqual(
+                sorted((call.args[0].X, call.args[0].Y) for call in mock_spawn.call_args_list),
+                [(2, 0), (2, 1), (3, 0)],
+            )
+        self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 7)
+        self.assertEqual(self.grid.get_changed_chunks("map13"), set())
+
+    def test_spawn_batched(self):
+        clock = task.Clock()
+        # do one step per tick
+        cooperator = task.Cooperator(
+            terminationPredicateFactory=lambda: lambda: True,
+            scheduler=lambda func: clock.callLater(1, func),
+        )
+        with mock.patch.object(xyzgrid.task, "cooperate", cooperator.cooperate):
+            deferred = self.grid.spawn_batched()
+        # one step per chunk for rooms, then for exits
+        for _ in range(4):
+            self.assertFalse(deferred.called)
+            clock.advance(1)
+        clock.advance(1)
+        self.assertTrue(deferred.called)
+        self.assertEqual(xyzroom.XYZRoom.objects.all().count(), 8)
+        self.assertEqual(xyzroom.XYZExit.objects.all().count(), 16)
+
+    def test_reload_batched(self):
+        clock = task.Clock()
+        cooperator = task.Cooperator(
+            terminationPredicateFactory=lambda: lambda: True,
+            scheduler=lambda func: clock.callLater(1, func),
+        )
+        with mock.patch.object(xyzgrid.task, "cooperate", cooperator.cooperate):
+            deferred = self.grid.reload_batched(batch_size=2)
+        # the map is parsed over several ticks
+        clock.advance(1)
+        self.assertFalse(deferred.called)
+        self.assertFalse(self.grid.ndb.loaded)
+        for _ in range(20):
+            clock.advance(1)
+        self.assertTrue(deferred.called)
+        self.assertTrue(self.grid.ndb.loaded)
+        self.assertEqual(len(self.grid.get_map("map13").node_index_map), 8)
+
+
 class TestMapStressTest(TestCase):
     """
     Performance test of map patfinder and visualizer.
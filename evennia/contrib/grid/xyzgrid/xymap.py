@@ -93,14 +93,14 @@ See `./example.py` for a full grid example.
 ----
 """
 
+import hashlib
 import pickle
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from os import mkdir
 from os.path import isdir, isfile
 from os.path import join as pathjoin
 
 try:
-    from numpy import zeros
     from scipy.sparse import csr_matrix
     from scipy.sparse.csgraph import dijkstra
 except ImportError as err:
@@ -177,6 +177,11 @@ class XYMap:
 
     mapcorner_symbol = "+"
     max_pathfinding_length = 500
+    # how many start-nodes to keep solved pathfinding routes for
+    pathfinding_cache_size = 100
+    # the size (in nodes along X and Y) of the square regions the map is divided into when
+    # spawning in batches and when checking which parts of the map changed
+    chunk_size = 20
     empty_symbol = " "
     # we normally only accept one single character for the legend key
     legend_key_exceptions = "\\"
@@ -244,8 +249,9 @@ class XYMap:
 
         # Dijkstra algorithm variables
         self.node_index_map = None
-        self.dist_matrix = None
-        self.pathfinding_routes = None
+        self.pathfinding_graph = None
+        # {start_node_index: (distances, predecessors)}, least recently used first
+        self.pathfinding_routes = OrderedDict()
 
         self.pathfinder_baked_filename = None
         if Z:
@@ -388,6 +394,27 @@ class XYMap:
             the string. The `XYgrid` is used to denote the game-world coordinates
             (which doesn't include the links)
 
+        """
+        for _ in self.iter_parse(batch_size=None):
+            pass
+
+    def iter_parse(self, batch_size=1000):
+        """
+        Parse the map in steps. This works like `parse`, but is a generator that
+        yields after every `batch_size` map-lines/nodes processed, so the parsing of a
+        very big map can be spread out (like over several reactor ticks with
+        `twisted.internet.task.cooperate`). The map is not usable until the generator
+        is exhausted.
+
+        Args:
+            batch_size (int, optional): How many map string-lines (when reading the map)
+                or nodes (when linking nodes and loading prototypes) to handle per step.
+                If `None`, only yield once per stage.
+
+        Yields:
+            tuple: `(stage, ndone, ntotal)` for progress reporting, where `stage` is one of
+            `"nodes"`, `"links"` and `"prototypes"`.
+
         """
         mapcorner_symbol = self.mapcorner_symbol
         # this allows for string-based [x][y] mapping with arbitrary objects
@@ -445,7 +472,11 @@ class XYMap:
         node_index = -1
 
         # first pass: read string-grid (left-right, bottom-up) and parse all grid points
-        for iy, line in enumerate(reversed(maplines[topleft_y:origo_y])):
+        gridlines = maplines[topleft_y:origo_y]
+        nlines = len(gridlines)
+        for iy, line in enumerate(reversed(gridlines)):
+            if batch_size and iy and not iy % batch_size:
+                yield ("nodes", iy, nlines)
             even_iy = iy % 2 == 0
             for ix, char in enumerate(line[origo_x:]):
                 # from now on, coordinates are on the xygrid.
@@ -493,6 +524,8 @@ class XYMap:
                 # store the symbol mapping for transition lookups
                 symbol_map[char].append(xygrid[ix][iy])
 
+        yield ("nodes", nlines, nlines)
+
         # store before building links
         self.max_x, self.max_y = max_x, max_y
         self.max_X, self.max_Y = max_X, max_Y
@@ -500,10 +533,17 @@ class XYMap:
         self.XYgrid = XYgrid
         self.node_index_map = node_index_map
         self.symbol_map = symbol_map
+        # the old pathfinding solution is no longer valid
+        self.pathfinding_graph = None
+        self.pathfinding_routes.clear()
 
         # build all links
-        for node in node_index_map.values():
+        nnodes = len(node_index_map)
+        for inode, node in enumerate(node_index_map.values()):
+            if batch_size and inode and not inode % batch_size:
+                yield ("links", inode, nnodes)
             node.build_links()
+        yield ("links", nnodes, nnodes)
 
         # build display map
         display_map = [[" "] * (max_x + 1) for _ in range(max_y + 1)]
@@ -511,7 +551,9 @@ class XYMap:
             for iy, node_or_link in ydct.items():
                 display_map[iy][ix] = node_or_link.get_display_symbol()
 
-        for node in node_index_map.values():
+        for inode, node in enumerate(node_index_map.values()):
+            if batch_size and inode and not inode % batch_size:
+                yield ("prototypes", inode, nnodes)
             # override node-prototypes, ignore if no prototype
             # is defined (some nodes should not be spawned)
             if node.prototype:
@@ -541,6 +583,7 @@ class XYMap:
 
         # store
         self.display_map = display_map
+        yield ("prototypes", nnodes, nnodes)
 
     def _get_topology_around_coord(self, xy, dist=2):
         """
@@ -599,58 +642,195 @@ class XYMap:
 
     def calculate_path_matrix(self, force=False):
         """
-        Solve the pathfinding problem using Dijkstra's algorithm. This will try to
-        load the solution from disk if possible.
+        Build the sparse graph of weighted links between nodes used for pathfinding. This will
+        try to load the graph from disk if possible. The shortest routes are then solved
+        lazily from each start node as they are needed (see `get_pathfinding_routes`).
 
         Args:
             force (bool, optional): If the cache should always be rebuilt.
 
         """
-        if not force and self.pathfinder_baked_filename and isfile(self.pathfinder_baked_filename):
-            # check if the solution for this grid was already solved previously.
+        self.pathfinding_routes.clear()
 
-            mapstr, dist_matrix, pathfinding_routes = "", None, None
+        if not force and self.pathfinder_baked_filename and isfile(self.pathfinder_baked_filename):
+            # check if the graph for this grid was already built previously.
+            data = None
             with open(self.pathfinder_baked_filename, "rb") as fil:
                 try:
-                    mapstr, dist_matrix, pathfinding_routes = pickle.load(fil)
+                    data = pickle.load(fil)
                 except Exception:
                     logger.log_trace()
-            if (
-                mapstr == self.mapstring
-                and dist_matrix is not None
-                and pathfinding_routes is not None
-            ):
-                # this is important - it means the map hasn't changed so
-                # we can re-use the stored data!
-                self.dist_matrix = dist_matrix
-                self.pathfinding_routes = pathfinding_routes
-
-        # build a matrix representing the map graph, with 0s as impassable areas
-
+            # older versions of the cache store the full solution, which is not used anymore
+            if isinstance(data, tuple) and len(data) == 2:
+                mapstr, pathfinding_graph = data
+                if mapstr == self.mapstring and pathfinding_graph is not None:
+                    # this is important - it means the map hasn't changed so
+                    # we can re-use the stored data!
+                    self.pathfinding_graph = pathfinding_graph
+                    return
+
+        # build a sparse matrix representing the map graph, directly from the node's
+        # links. Nodes without links between them have no entry.
         nnodes = len(self.node_index_map)
-        pathfinding_graph = zeros((nnodes, nnodes))
+        weights, from_nodes, to_nodes = [], [], []
         for inode, node in self.node_index_map.items():
-            pathfinding_graph[inode, :] = node.linkweights(nnodes)
+            for to_node, weight in node.weights.items():
+                if weight:
+                    weights.append(weight)
+                    from_nodes.append(inode)
+                    to_nodes.append(to_node)
+        self.pathfinding_graph = csr_matrix(
+            (weights, (from_nodes, to_nodes)), shape=(nnodes, nnodes), dtype=float
+        )
+
+        if self.pathfinder_baked_filename:
+            # try to cache the results
+            with open(self.pathfinder_baked_filename, "wb") as fil:
+                pickle.dump((self.mapstring, self.pathfinding_graph), fil, protocol=4)
+
+    def get_pathfinding_routes(self, istartnode):
+        """
+        Get the shortest routes from one node to all other nodes, using Dijkstra's algorithm.
+        The most recently used solutions are cached (see `pathfinding_cache_size`).
+
+        Args:
+            istartnode (int): The node-index of the node to start from.
+
+        Returns:
+            tuple: Two arrays `(distances, predecessors)`, indexed by node-index. The
+            predecessor of each node on the shortest route from the start node is -9999 for
+            the start node itself and for nodes that can't be reached.
+
+        """
+        routes = self.pathfinding_routes.get(istartnode)
+        if routes is not None:
+            self.pathfinding_routes.move_to_end(istartnode)
+            return routes
 
-        # create a sparse matrix to represent link relationships from each node
-        pathfinding_matrix = csr_matrix(pathfinding_graph)
+        if self.pathfinding_graph is None:
+            self.calculate_path_matrix()
 
-        # solve using Dijkstra's algorithm
-        self.dist_matrix, self.pathfinding_routes = dijkstra(
-            pathfinding_matrix,
+        # solve using Dijkstra's algorithm, from this node only
+        routes = self.pathfinding_routes[istartnode] = dijkstra(
+            self.pathfinding_graph,
             directed=True,
+            indices=istartnode,
             return_predecessors=True,
             limit=self.max_pathfinding_length,
         )
+        while len(self.pathfinding_routes) > self.pathfinding_cache_size:
+            self.pathfinding_routes.popitem(last=False)
+        return routes
 
-        if self.pathfinder_baked_filename:
-            # try to cache the results
-            with open(self.pathfinder_baked_filename, "wb") as fil:
-                pickle.dump(
-                    (self.mapstring, self.dist_matrix, self.pathfinding_routes), fil, protocol=4
+    def get_chunk(self, xy):
+        """
+        Get the chunk (square region of the map) a coordinate belongs to.
+
+        Args:
+            xy (tuple): An (X,Y) coordinate on the XYgrid.
+
+        Returns:
+            tuple: The `(cX, cY)` chunk coordinate, where the chunk covers
+            `chunk_size` nodes along each axis.
+
+        """
+        return (xy[0] // self.chunk_size, xy[1] // self.chunk_size)
+
+    def get_chunk_nodes(self, xy=("*", "*"), chunks=None):
+        """
+        Get the nodes of this map, grouped by chunk.
+
+        Args:
+            xy (tuple, optional): An (X,Y) coordinate of node(s). `'*'` acts as a wildcard.
+            chunks (iterable, optional): Only include nodes in these chunks.
+
+        Returns:
+            dict: `{(cX, cY): [node, ...], ...}`, with chunks and their nodes sorted by
+            (Y, X) coordinate.
+
+        """
+        x, y = xy
+        wildcard = "*"
+        chunks = set(chunks) if chunks is not None else None
+        chunk_nodes = defaultdict(list)
+        for node in sorted(self.node_index_map.values(), key=lambda n: (n.Y, n.X)):
+            if (x in (wildcard, node.X)) and (y in (wildcard, node.Y)):
+                chunk = self.get_chunk((node.X, node.Y))
+                if chunks is None or chunk in chunks:
+                    chunk_nodes[chunk].append(node)
+        return dict(sorted(chunk_nodes.items(), key=lambda tup: (tup[0][1], tup[0][0])))
+
+    def get_chunk_hashes(self):
+        """
+        Get a hash for every chunk of the map, representing everything that would be
+        spawned from it (nodes, their prototypes and their links/exits). Comparing these
+        between versions of a map tells which regions of it changed.
+
+        Returns:
+            dict: `{(cX, cY): hexdigest, ...}`.
+
+        """
+
+        def _proto(prototype):
+            # the prototype_key is added on spawn, so it must not affect the hash
+            if not prototype:
+                return None
+            return repr({key: val for key, val in prototype.items() if key != "prototype_key"})
+
+        chunk_hashes = {}
+        for chunk, nodes in self.get_chunk_nodes().items():
+            chunk_data = [
+                (
+                    node.X,
+                    node.Y,
+                    node.symbol,
+                    _proto(node.prototype),
+                    [
+                        (
+                            direction,
+                            end_node.X,
+                            end_node.Y,
+                            end_node.Z,
+                            _proto(getattr(node.first_links.get(direction), "prototype", None)),
+                        )
+                        for direction, end_node in sorted(node.links.items())
+                    ],
                 )
+                for node in nodes
+            ]
+            chunk_hashes[chunk] = hashlib.sha1(repr(chunk_data).encode("utf-8")).hexdigest()
+        return chunk_hashes
 
-    def spawn_nodes(self, xy=("*", "*")):
+    def delete_unmapped_rooms(self, xy=("*", "*"), chunks=None):
+        """
+        Delete in-game rooms for this map that no longer have a node on the map.
+
+        Args:
+            xy (tuple, optional): An (X,Y) coordinate of room(s). `'*'` acts as a wildcard.
+            chunks (iterable, optional): Only consider rooms in these chunks.
+
+        Returns:
+            int: The number of rooms deleted.
+
+        """
+        global _XYZROOMCLASS
+        if not _XYZROOMCLASS:
+            from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom as _XYZROOMCLASS
+        x, y = xy
+        chunks = set(chunks) if chunks is not None else None
+        map_coords = set((node.X, node.Y) for node in self.node_index_map.values())
+        ndeleted = 0
+        for existing_room in _XYZROOMCLASS.objects.filter_xyz(xyz=(x, y, self.Z)):
+            roomX, roomY, _ = existing_room.xyz
+            if (roomX, roomY) not in map_coords and (
+                chunks is None or self.get_chunk((roomX, roomY)) in chunks
+            ):
+                self.log(f"  deleting room at {existing_room.xyz} (not found on map).")
+                existing_room.delete()
+                ndeleted += 1
+        return ndeleted
+
+    def spawn_nodes(self, xy=("*", "*"), chunks=None):
         """
         Convert the nodes of this XYMap into actual in-world rooms by spawning their
         related prototypes in the correct coordinate positions. This must be done *first*
@@ -659,6 +839,7 @@ class XYMap:
 
         Args:
             xy (tuple, optional): An (X,Y) coordinate of node(s). `'*'` acts as a wildcard.
+            chunks (iterable, optional): Only spawn nodes in these chunks (see `get_chunk`).
 
         Examples:
             - `xy=(1, 3) - spawn (1,3) coordinate only.
@@ -669,27 +850,13 @@ class XYMap:
             list: A list of nodes that were spawned.
 
         """
-        global _XYZROOMCLASS
-        if not _XYZROOMCLASS:
-            from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom as _XYZROOMCLASS
-        x, y = xy
-        wildcard = "*"
-        spawned = []
-
-        # find existing nodes, in case some rooms need to be removed
-        map_coords = [
-            (node.X, node.Y)
-            for node in sorted(self.node_index_map.values(), key=lambda n: (n.Y, n.X))
-        ]
-        for existing_room in _XYZROOMCLASS.objects.filter_xyz(xyz=(x, y, self.Z)):
-            roomX, roomY, _ = existing_room.xyz
-            if (roomX, roomY) not in map_coords:
-                self.log(f"  deleting room at {existing_room.xyz} (not found on map).")
-                existing_room.delete()
+        # remove rooms no longer on the map
+        self.delete_unmapped_rooms(xy=xy, chunks=chunks)
 
         # (re)build nodes (will not build already existing rooms)
-        for node in sorted(self.node_index_map.values(), key=lambda n: (n.Y, n.X)):
-            if (x in (wildcard, node.X)) and (y in (wildcard, node.Y)):
+        spawned = []
+        for nodes in self.get_chunk_nodes(xy=xy, chunks=chunks).values():
+            for node in nodes:
                 node.spawn()
                 spawned.append(node)
         return spawned
@@ -797,20 +964,17 @@ class XYMap:
                 f"{endnode}. They must both be MapNodes (not Links)"
             )
 
-        if self.pathfinding_routes is None:
-            self.calculate_path_matrix()
-
-        pathfinding_routes = self.pathfinding_routes
+        _, predecessors = self.get_pathfinding_routes(istartnode)
         node_index_map = self.node_index_map
 
         path = [endnode]
         directions = []
 
-        while pathfinding_routes[istartnode, inextnode] != -9999:
+        while predecessors[inextnode] != -9999:
             # the -9999 is set by algorithm for unreachable nodes or if trying
             # to go a node we are already at (the start node in this case since
             # we are working backwards).
-            inextnode = pathfinding_routes[istartnode, inextnode]
+            inextnode = predecessors[inextnode]
             nextnode = node_index_map[inextnode]
             shortest_route_to = nextnode.shortest_route_to_node[path[-1].node_index]
 
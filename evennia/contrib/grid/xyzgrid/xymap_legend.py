@@ -9,13 +9,6 @@ usually shows as an Exit, but the length of the link has no in-game equivalent.
 
 """
 
-try:
-    from numpy import zeros
-except ImportError as err:
-    raise ImportError(
-        f"{err}\nThe XYZgrid contrib requires the SciPy package. Install with `pip install scipy'."
-    )
-
 import uuid
 from collections import defaultdict
 
@@ -226,27 +219,6 @@ class MapNode:
                     if weight < shortest_route:
                         self.shortest_route_to_node[node_index] = (first_step_name, steps, weight)
 
-    def linkweights(self, nnodes):
-        """
-        Retrieve all the weights for the direct links to all other nodes. This is
-        used for the efficient generation of shortest-paths.
-
-        Args:
-            nnodes (int): The total number of nodes
-
-        Returns:
-            scipy.array: Array of weights of the direct links to other nodes.
-                The weight will be 0 for nodes not directly connected to one another.
-
-        Notes:
-            A node can at most have 8 connections (the cardinal directions).
-
-        """
-        link_graph = zeros(nnodes)
-        for node_index, weight in self.weights.items():
-            link_graph[node_index] = weight
-        return link_graph
-
     def get_display_symbol(self):
         """
         Hook to override for customizing how the display_symbol is determined.
@@ -17,6 +17,8 @@ The grid has three main functions:
 
 """
 
+from twisted.internet import task
+
 from evennia.scripts.scripts import DefaultScript
 from evennia.utils import logger
 from evennia.utils.utils import variable_from_module
@@ -133,12 +135,14 @@ class XYZGrid(DefaultScript):
             mapdata["module_path"] = module_path
         return map_data_list
 
-    def reload(self):
+    def _reload_steps(self, batch_size=None):
         """
-        Reload and rebuild the grid. This is done on a server reload.
+        Generator doing the reloading, parsing the maps `batch_size` map-lines/nodes at a
+        time (see `XYMap.iter_parse`). See `reload`.
 
         """
         self.log("(Re)loading grid ...")
+        self.ndb.loaded = False
         self.ndb.grid = {}
         nmaps = 0
         loaded_mapdata = {}
@@ -170,11 +174,20 @@ class XYZGrid(DefaultScript):
                 changed.append(zcoord)
 
             xymap = XYMap(dict(new_mapdata), Z=zcoord, xyzgrid=self)
-            xymap.parse()
+            for _ in xymap.iter_parse(batch_size=batch_size):
+                yield
             xymap.calculate_path_matrix()
             self.ndb.grid[zcoord] = xymap
             nmaps += 1
 
+            if zcoord in changed:
+                changed_chunks = self.get_changed_chunks(zcoord)
+                if changed_chunks:
+                    self.log(
+                        f" {len(changed_chunks)} region(s) of Z='{zcoord}' differ from what was "
+                        "last spawned. Spawn with `changed_only=True` to update only those."
+                    )
+
         # re-store changed data
         for zcoord in changed:
             self.db.map_data[zcoord] = loaded_mapdata[zcoord]
@@ -183,6 +196,31 @@ class XYZGrid(DefaultScript):
         self.log(f"Loaded and linked {nmaps} map(s).")
         self.ndb.loaded = True
 
+    def reload(self):
+        """
+        Reload and rebuild the grid. This is done on a server reload.
+
+        """
+        for _ in self._reload_steps():
+            pass
+
+    def reload_batched(self, batch_size=1000):
+        """
+        Reload like `reload`, but parse the maps in steps spread out over reactor ticks, so
+        a running server is not blocked while parsing a big grid.
+
+        Args:
+            batch_size (int, optional): How many map-lines/nodes to parse per step.
+
+        Returns:
+            Deferred: Fires when reloading is complete.
+
+        Notes:
+            The grid is not usable until reloading has finished.
+
+        """
+        return task.cooperate(self._reload_steps(batch_size=batch_size)).whenDone()
+
     def add_maps(self, *mapdatas):
         """
         Add map or maps to the grid.
@@ -219,6 +257,8 @@ class XYZGrid(DefaultScript):
         for zcoord in zcoords:
             if zcoord in self.db.map_data:
                 self.db.map_data.pop(zcoord)
+            if self.db.spawned_chunks and zcoord in self.db.spawned_chunks:
+                self.db.spawned_chunks.pop(zcoord)
             if remove_objects:
                 # we can't batch-delete because we want to run the .delete
                 # method that also wipes exits and moves content to save locations
@@ -236,7 +276,84 @@ class XYZGrid(DefaultScript):
             self.remove_map(*(zcoord for zcoord in self.db.map_data), remove_objects=True)
         super().delete()
 
-    def spawn(self, xyz=("*", "*", "*"), directions=None):
+    def get_changed_chunks(self, zcoord):
+        """
+        Find the regions ('chunks', see `XYMap.get_chunk`) of a map that changed since the
+        map was last fully spawned.
+
+        Args:
+            zcoord (str): The name/zcoord of the xymap.
+
+        Returns:
+            set or None: The `(cX, cY)` chunks that changed, were added or removed. This is
+            `None` if the map was never fully spawned (meaning all of it needs spawning).
+
+        """
+        spawned_hashes = (self.db.spawned_chunks or {}).get(zcoord)
+        if spawned_hashes is None:
+            return None
+        chunk_hashes = self.get_map(zcoord).get_chunk_hashes()
+        return set(
+            chunk
+            for chunk in set(chunk_hashes).union(spawned_hashes)
+            if chunk_hashes.get(chunk) != spawned_hashes.get(chunk)
+        )
+
+    def _spawn_steps(self, xyz=("*", "*", "*"), directions=None, changed_only=False):
+        """
+        Generator doing the spawning, one chunk of nodes at a time. See `spawn`.
+
+        """
+        x, y, z = xyz
+        wildcard = "*"
+
+        if z == wildcard:
+            xymaps = self.grid
+        elif self.ndb.grid and z in self.ndb.grid:
+            xymaps = {z: self.grid[z]}
+        else:
+            raise RuntimeError(f"The 'z' coordinate/name '{z}' is not found on the grid.")
+
+        # figure out what to spawn and remove rooms no longer on the maps
+        chunk_nodes = {}
+        for zcoord, xymap in xymaps.items():
+            chunks = self.get_changed_chunks(zcoord) if changed_only else None
+            if chunks is not None:
+                self.log(f"{len(chunks)} region(s) of Z='{zcoord}' changed since last spawn.")
+            xymap.delete_unmapped_rooms(xy=(x, y), chunks=chunks)
+            chunk_nodes[zcoord] = xymap.get_chunk_nodes(xy=(x, y), chunks=chunks)
+        nnodes = sum(len(nodes) for chunks in chunk_nodes.values() for nodes in chunks.values())
+
+        # first build all nodes/rooms
+        ndone = 0
+        for zcoord, chunks in chunk_nodes.items():
+            self.log(f"spawning/updating nodes for Z='{zcoord}' ...")
+            for nodes in chunks.values():
+                for node in nodes:
+                    node.spawn()
+                ndone += len(nodes)
+                self.log(f" ... {ndone}/{nnodes} nodes done.")
+                yield
+
+        # next build all links between nodes (including between maps)
+        ndone = 0
+        for zcoord, chunks in chunk_nodes.items():
+            self.log(f"spawning/updating links for Z='{zcoord}' ...")
+            xymap = xymaps[zcoord]
+            for nodes in chunks.values():
+                xymap.spawn_links(xy=(x, y), nodes=nodes, directions=directions)
+                ndone += len(nodes)
+                self.log(f" ... links of {ndone}/{nnodes} nodes done.")
+                yield
+
+        if x == y == wildcard and not directions:
+            # remember what was spawned, to be able to only update changes later
+            spawned_chunks = self.db.spawned_chunks or {}
+            for zcoord, xymap in xymaps.items():
+                spawned_chunks[zcoord] = xymap.get_chunk_hashes()
+            self.db.spawned_chunks = spawned_chunks
+
+    def spawn(self, xyz=("*", "*", "*"), directions=None, changed_only=False):
         """
         Create/recreate/update the in-game grid based on the stored Maps or for a specific Map
         or coordinate.
@@ -246,6 +363,9 @@ class XYZGrid(DefaultScript):
                 acts as a wildcard.
             directions (list, optional): A list of cardinal directions ('n', 'ne' etc).
                 Spawn exits only the given direction. If unset, all needed directions are spawned.
+            changed_only (bool, optional): Only spawn the regions of each map that changed
+                since the map was last fully spawned (see `get_changed_chunks`). Maps never
+                fully spawned are spawned in full.
 
         Examples:
             - `xyz=('*', '*', '*')` (default) - spawn/update all maps.
@@ -256,25 +376,41 @@ class XYZGrid(DefaultScript):
                 out of the specific node on map 'foo'.
 
         """
-        x, y, z = xyz
-        wildcard = "*"
+        for _ in self._spawn_steps(xyz=xyz, directions=directions, changed_only=changed_only):
+            pass
 
-        if z == wildcard:
-            xymaps = self.grid
-        elif self.ndb.grid and z in self.ndb.grid:
-            xymaps = {z: self.grid[z]}
-        else:
-            raise RuntimeError(f"The 'z' coordinate/name '{z}' is not found on the grid.")
+    def spawn_batched(
+        self, xyz=("*", "*", "*"), directions=None, changed_only=False, batch_size=1000
+    ):
+        """
+        Spawn like `spawn`, but one region (`XYMap.chunk_size` nodes square) at a time,
+        spread out over reactor ticks so a running server is not blocked while building a
+        big grid. If the grid is not loaded, it's first parsed in steps the same way (see
+        `reload_batched`). Progress is reported to the grid's log.
 
-        # first build all nodes/rooms
-        for zcoord, xymap in xymaps.items():
-            self.log(f"spawning/updating nodes for Z='{zcoord}' ...")
-            xymap.spawn_nodes(xy=(x, y))
+        Args:
+            xyz (tuple, optional): An (X,Y,Z) coordinate, where Z is the name of the map. `'*'`
+                acts as a wildcard.
+            directions (list, optional): A list of cardinal directions ('n', 'ne' etc).
+            changed_only (bool, optional): Only spawn the regions changed since the last
+                full spawn.
+            batch_size (int, optional): How many map-lines/nodes to parse per step, if
+                the grid needs to be loaded first.
 
-        # next build all links between nodes (including between maps)
-        for zcoord, xymap in xymaps.items():
-            self.log(f"spawning/updating links for Z='{zcoord}' ...")
-            xymap.spawn_links(xy=(x, y), directions=directions)
+        Returns:
+            Deferred: Fires when spawning is complete.
+
+        Notes:
+            The grid should not be reloaded or changed until spawning has finished.
+
+        """
+
+        def _steps():
+            if not self.ndb.loaded:
+                yield from self._reload_steps(batch_size=batch_size)
+            yield from self._spawn_steps(xyz=xyz, directions=directions, changed_only=changed_only)
+
+        return task.cooperate(_steps()).whenDone()
 
 
 def get_xyzgrid(print_errors=True):
@@ -4,6 +4,9 @@ command test-suite).
 
 """
 
+import os
+import tempfile
+from collections import OrderedDict
 from unittest import mock
 from parameterized import parameterized
 
@@ -194,3 +197,71 @@ class HelpUtils(TestCase):
         entries, _ = help_utils.help_search_with_index(search_term, self.candidate_entries)
 
         self.assertEqual(entries, expected_entry, error_msg)
+
+    def test_index_matches_lunr(self):
+        """
+        The index built re-using cached terms must be the same as one built with
+        lunr's own `Builder.add` (this relies on lunr internals, so guards against
+        lunr upgrades).
+
+        """
+        lunr_search = help_utils.LunrSearch()
+        fields = [
+            {"field_name": "key", "boost": 10},
+            {"field_name": "aliases", "boost": 7},
+            {"field_name": "text", "boost": 1},
+        ]
+        documents = [entry.search_index_entry for entry in self.candidate_entries]
+
+        builder = lunr_search.get_default_builder()
+        builder.pipeline.reset()
+        builder.pipeline.add(*lunr_search.custom_builder_pipeline)
+        builder.ref("key")
+        for field in fields:
+            builder.field(**field)
+        for document in documents:
+            builder.add(document)
+        expected = builder.build().serialize()
+
+        with mock.patch("evennia.help.utils._HELP_TERM_CACHE", {}):
+            # both without and with the terms cached
+            for _ in range(2):
+                self.assertEqual(lunr_search.index("key", fields, documents).serialize(), expected)
+
+    @mock.patch("evennia.help.utils._HELP_INDEX_CACHE", new_callable=OrderedDict)
+    @mock.patch("evennia.help.utils._HELP_INDEX_CACHE_LOADED", True)
+    def test_cached_index(self, mock_cache):
+        """Test that the search index is re-used for the same entries"""
+        lunr_search = help_utils.LunrSearch()
+        with mock.patch.object(lunr_search, "index", wraps=lunr_search.index) as mock_index:
+            for _ in range(2):
+                entries, _ = help_utils.help_search_with_index("inv*", self.candidate_entries)
+                self.assertEqual(entries, [self.candidate_entries[1]])
+            mock_index.assert_called_once()
+            self.assertEqual(len(mock_cache), 1)
+
+            # changing an entry builds a new index
+            self.candidate_entries[1].key = "inventories"
+            entries, _ = help_utils.help_search_with_index("inventories", self.candidate_entries)
+            self.assertEqual(entries, [self.candidate_entries[1]])
+            self.assertEqual(mock_index.call_count, 2)
+            self.assertEqual(len(mock_cache), 2)
+
+    @mock.patch("evennia.help.utils._HELP_INDEX_CACHE", new_callable=OrderedDict)
+    @mock.patch("evennia.help.utils._HELP_INDEX_CACHE_LOADED", True)
+    def test_save_load_index_cache(self, mock_cache):
+        """Test saving the search index cache to disk and loading it back"""
+        help_utils.help_search_with_index("inv*", self.candidate_entries)
+        self.assertEqual(len(mock_cache), 1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_file = os.path.join(tmpdir, "help_index.pickle")
+            with mock.patch("evennia.help.utils._HELP_INDEX_CACHE_FILE", cache_file):
+                help_utils.save_help_index_cache()
+                mock_cache.clear()
+                help_utils.load_help_index_cache()
+        self.assertEqual(len(mock_cache), 1)
+        lunr_search = help_utils.LunrSearch()
+        with mock.patch.object(lunr_search, "index") as mock_index:
+            entries, _ = help_utils.help_search_with_index("inv*", self.candidate_entries)
+            mock_index.assert_not_called()
+        self.assertEqual(entries, [self.candidate_entries[1]])
@@ -6,7 +6,13 @@ This is used primarily by the default `help` command.
 
 """
 
+import hashlib
+import pickle
 import re
+from collections import OrderedDict
+from os import mkdir
+from os.path import isdir, isfile
+from os.path import join as pathjoin
 
 from django.conf import settings
 from lunr.stemmer import stemmer
@@ -18,6 +24,15 @@ _RE_HELP_SUBTOPIC_PARSE = re.compile(r"^(?P<nesting>\#{2,6})\s*?(?P<name>.*?)$",
 
 MAX_SUBTOPIC_NESTING = 5
 
+# cache of lunr indices, keyed on a digest of the indexed documents
+_HELP_INDEX_CACHE = OrderedDict()
+_HELP_INDEX_CACHE_SIZE = settings.HELP_INDEX_CACHE_SIZE
+_HELP_INDEX_CACHE_FILE = pathjoin(settings.CACHE_DIR, "help_index.pickle")
+_HELP_INDEX_CACHE_LOADED = False
+# cache of the indexed terms of a field value, {(field_name, value): [term, ...]}
+_HELP_TERM_CACHE = {}
+_HELP_TERM_CACHE_SIZE = 50000
+
 
 def wildcard_stemmer(token, i, tokens):
     """
@@ -84,8 +99,11 @@ class LunrSearch:
         from lunr import lunr
         from lunr import stop_word_filter
         from lunr.exceptions import QueryParseError
+        from lunr.field_ref import FieldRef
+        from lunr.index import Index
         from lunr.stemmer import stemmer
         from lunr.pipeline import Pipeline
+        from lunr.tokenizer import Tokenizer
 
         # Store imported modules as instance attributes
         self.get_default_builder = get_default_builder
@@ -93,6 +111,9 @@ class LunrSearch:
         self.stop_word_filter = stop_word_filter
         self.QueryParseError = QueryParseError
         self.default_stemmer = stemmer
+        self.FieldRef = FieldRef
+        self.Index = Index
+        self.Tokenizer = Tokenizer
 
         self._setup_stop_words_filter()
         self.custom_builder_pipeline = (self.custom_stop_words_filter, wildcard_stemmer)
@@ -133,7 +154,158 @@ class LunrSearch:
         builder.pipeline.reset()
         builder.pipeline.add(*self.custom_builder_pipeline)
 
-        return self.lunr(ref, fields, documents, builder=builder)
+        builder.ref(ref)
+        for field in fields:
+            builder.field(**field)
+        for document in documents:
+            self._add_document(builder, document)
+        return builder.build()
+
+    def _add_document(self, builder, doc):
+        """
+        Add a document to the index being built. This does the same as
+        `builder.add`, but re-uses the terms of field values that were indexed
+        before, so re-indexing mostly the same documents is fast.
+
+        Args:
+            builder (lunr.Builder): The builder to add the document to.
+            doc (dict): The document to add.
+
+        Notes:
+            This uses the internals of `lunr.Builder`, which is why the lunr
+            version is pinned. The tests check the result against `builder.add`.
+
+        """
+        if builder.metadata_whitelist:
+            # we only cache the terms, not their metadata
+            builder.add(doc)
+            return
+
+        doc_ref = str(doc[builder._ref])
+        builder._documents[doc_ref] = {}
+        builder.document_count += 1
+
+        for field_name, field in builder._fields.items():
+            field_value = doc[field_name] if field.extractor is None else field.extractor(doc)
+            cache_key = (field_name, field_value)
+            terms = _HELP_TERM_CACHE.get(cache_key)
+            if terms is None:
+                terms = [
+                    str(term)
+                    for term in builder.pipeline.run(self.Tokenizer(field_value), field_name)
+                ]
+                if len(_HELP_TERM_CACHE) >= _HELP_TERM_CACHE_SIZE:
+                    _HELP_TERM_CACHE.clear()
+                _HELP_TERM_CACHE[cache_key] = terms
+
+            field_ref = str(self.FieldRef(doc_ref, field_name))
+            field_terms = {}
+            builder.field_term_frequencies[field_ref] = field_terms
+            builder.field_lengths[field_ref] = len(terms)
+
+            for term in terms:
+                field_terms[term] = field_terms.get(term, 0) + 1
+                posting = builder.inverted_index.get(term)
+                if posting is None:
+                    posting = {_field_name: {} for _field_name in builder._fields}
+                    posting["_index"] = builder.term_index
+                    builder.term_index += 1
+                    builder.inverted_index[term] = posting
+                if doc_ref not in posting[field_name]:
+                    posting[field_name][doc_ref] = {}
+
+    def cached_index(self, ref, fields, documents):
+        """
+        Get a Lunr searchable index, re-using a cached one if an index was
+        already built for the same documents.
+
+        Args:
+            ref (str): Unique identifier field within a document
+            fields (list): A list of Lunr field mappings
+              ``{"field_name": str, "boost": int}``.
+            documents (list[dict]): This is the body of possible entities to search.
+              Each dict should have all keys in the `fields` arg.
+        Returns: A lunr.Index object
+
+        Notes:
+            The cache size is set by `settings.HELP_INDEX_CACHE_SIZE`. Indices are
+            cached by the contents of the documents, so a changed help entry or a
+            different set of visible entries means a new index is built, while the
+            one for the previous set remains in the cache until it is pushed out
+            by newer ones.
+
+        """
+        if not _HELP_INDEX_CACHE_SIZE:
+            return self.index(ref, fields, documents)
+
+        if not _HELP_INDEX_CACHE_LOADED:
+            load_help_index_cache()
+
+        field_names = [field["field_name"] for field in fields]
+        digest = hashlib.sha1(repr((ref, fields)).encode("utf-8"))
+        for document in documents:
+            digest.update(
+                "\x00".join(str(document[name]) for name in [ref] + field_names).encode(
+                    "utf-8", errors="replace"
+                )
+            )
+            digest.update(b"\x01")
+        cache_key = digest.hexdigest()
+
+        search_index = _HELP_INDEX_CACHE.get(cache_key)
+        if search_index is None:
+            search_index = self.index(ref, fields, documents)
+            _HELP_INDEX_CACHE[cache_key] = search_index
+            while len(_HELP_INDEX_CACHE) > _HELP_INDEX_CACHE_SIZE:
+                _HELP_INDEX_CACHE.popitem(last=False)
+        else:
+            _HELP_INDEX_CACHE.move_to_end(cache_key)
+        return search_index
+
+
+def load_help_index_cache():
+    """
+    Load the help index cache saved to disk by `save_help_index_cache`. This
+    is called automatically on the first help search.
+
+    """
+    global _HELP_INDEX_CACHE_LOADED
+    _HELP_INDEX_CACHE_LOADED = True
+    if not isfile(_HELP_INDEX_CACHE_FILE):
+        return
+    Index = LunrSearch().Index
+    try:
+        with open(_HELP_INDEX_CACHE_FILE, "rb") as fil:
+            serialized = pickle.load(fil)
+        for cache_key, serialized_index in serialized.items():
+            if cache_key not in _HELP_INDEX_CACHE:
+                _HELP_INDEX_CACHE[cache_key] = Index.load(serialized_index)
+                _HELP_INDEX_CACHE.move_to_end(cache_key, last=False)
+    except Exception:
+        # a broken or outdated cache file; it will be rebuilt
+        from evennia.utils import logger
+
+        logger.log_trace(f"Could not load help index cache {_HELP_INDEX_CACHE_FILE}.")
+    while len(_HELP_INDEX_CACHE) > _HELP_INDEX_CACHE_SIZE:
+        _HELP_INDEX_CACHE.popitem(last=False)
+
+
+def save_help_index_cache():
+    """
+    Save the cached help indices to disk, so the first help searches
+    after a reload/restart don't have to rebuild them. This is called
+    when the server shuts down or reloads.
+
+    """
+    if not (_HELP_INDEX_CACHE_SIZE and _HELP_INDEX_CACHE):
+        return
+    if not isdir(settings.CACHE_DIR):
+        mkdir(settings.CACHE_DIR)
+    serialized = {
+        cache_key: search_index.serialize() for cache_key, search_index in _HELP_INDEX_CACHE.items()
+    }
+    with open(_HELP_INDEX_CACHE_FILE, "wb") as fil:
+        pickle.dump(serialized, fil, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields=None):
@@ -171,7 +343,7 @@ def help_search_with_index(query, candidate_entries, suggestion_maxnum=5, fields
 
     lunr_search = LunrSearch()
 
-    search_index = lunr_search.index(ref="key", fields=fields, documents=indx)
+    search_index = lunr_search.cached_index(ref="key", fields=fields, documents=indx)
 
     try:
         matches = search_index.search(query)[:suggestion_maxnum]
@@ -112,10 +112,12 @@ from django.utils.translation import gettext as _
 import evennia
 from evennia.utils import logger, utils
 
-__all__ = ("LockHandler", "LockException")
+__all__ = ("LockHandler", "LockException", "invalidate_lock_cache")
 
 WARNING_LOG = settings.LOCKWARNING_LOG_FILE
 _LOCK_HANDLER = None
+_LOCK_RESULT_CACHE = settings.LOCK_RESULT_CACHE
+_LOCK_RESULT_CACHE_SIZE = settings.LOCK_RESULT_CACHE_SIZE
 
 
 #
@@ -138,6 +140,15 @@ class LockException(Exception):
 #
 
 _LOCKFUNCS = {}
+# lockfuncs with a constant result, {func: result}
+_STATIC_LOCKFUNCS = {}
+# lockfuncs whose results may be cached by the lock result cache
+_CACHEABLE_LOCKFUNCS = set()
+# parsed and compiled lock definitions, {rhs: (evalstring, lock_funcs, compiled)}
+_COMPILED_LOCKS = {}
+_COMPILED_LOCKS_MAXSIZE = 10000
+# bumped to invalidate all cached lock results
+_LOCK_CACHE_GENERATION = 0
 
 
 def _cache_lockfuncs():
@@ -145,10 +156,70 @@ def _cache_lockfuncs():
     Updates the cache.
 
     """
-    global _LOCKFUNCS
+    global _LOCKFUNCS, _STATIC_LOCKFUNCS, _CACHEABLE_LOCKFUNCS, _COMPILED_LOCKS
     _LOCKFUNCS = {}
     for modulepath in settings.LOCK_FUNC_MODULES:
         _LOCKFUNCS.update(utils.callables_from_module(modulepath))
+    _COMPILED_LOCKS = {}
+    _CACHEABLE_LOCKFUNCS = set(
+        _LOCKFUNCS[funcname]
+        for funcname in settings.LOCK_RESULT_CACHE_FUNCS
+        if funcname in _LOCKFUNCS
+    )
+
+    from evennia.locks import lockfuncs
+
+    _STATIC_LOCKFUNCS = {
+        lockfuncs.true: True,
+        lockfuncs.all: True,
+        lockfuncs.false: False,
+        lockfuncs.none: False,
+    }
+
+
+def invalidate_lock_cache():
+    """
+    Invalidate all cached lock results (see `settings.LOCK_RESULT_CACHE`).
+    This is called automatically when Tags or Permissions change, when an
+    Account puppets/unpuppets and when quelling with the quell command. Call it
+    manually if you change something else the cacheable lock functions depend
+    on, such as an Account's `is_superuser` or `_quell` Attribute.
+
+    """
+    global _LOCK_CACHE_GENERATION
+    _LOCK_CACHE_GENERATION += 1
+
+
+def _compile_lock(evalstring, lock_funcs):
+    """
+    Compile a parsed lock definition into a Python function.
+
+    Args:
+        evalstring (str): The lock's combination of `and`/`or`/`not`, with `%s`
+            marking where each lock function goes.
+        lock_funcs (tuple): The `(func, args, kwargs)` of each lock function, in order.
+
+    Returns:
+        callable: A function `compiled(accessing_obj, accessed_obj, **kwargs)`
+            returning the result of the lock. The kwargs are passed on to every
+            lock function.
+
+    Notes:
+        The lock functions are called lazily, so `and`/`or` short-circuit and
+        not all lock functions are necessarily called.
+
+    """
+    namespace = {"_bool": bool}
+    calls = []
+    for num, (func, args, kwargs) in enumerate(lock_funcs):
+        namespace[f"_f{num}"] = func
+        namespace[f"_a{num}"] = tuple(args)
+        namespace[f"_k{num}"] = kwargs
+        calls.append(f"_bool(_f{num}(_accessing, _accessed, *_a{num}, **_k{num}, **_kwargs))")
+    # the evalstring only contains %s, and, or and not at this point
+    return eval(
+        "lambda _accessing, _accessed, **_kwargs: " + evalstring % tuple(calls), namespace, {}
+    )
 
 
 #
@@ -188,6 +259,10 @@ class LockHandler:
             _cache_lockfuncs()
         self.obj = obj
         self.locks = {}
+        self._static_results = {}
+        self._cacheable = {}
+        self._result_cache = {}
+        self._result_cache_generation = _LOCK_CACHE_GENERATION
         try:
             self.reset()
         except LockException as err:
@@ -196,10 +271,97 @@ class LockHandler:
     def __str__(self):
         return ";".join(self.locks[key][2] for key in sorted(self.locks))
 
+    def __getstate__(self):
+        """
+        The compiled locks can't be pickled, so they are dropped (together with
+        the cached results) and recompiled on unpickling.
+
+        """
+        state = self.__dict__.copy()
+        state["locks"] = {
+            access_type: (evalstring, lock_funcs, raw_lockstring, None)
+            for access_type, (evalstring, lock_funcs, raw_lockstring, _) in self.locks.items()
+        }
+        state["_result_cache"] = {}
+        return state
+
+    def __setstate__(self, state):
+        """
+        Recompile the locks after unpickling.
+
+        """
+        state["locks"] = {
+            access_type: (
+                evalstring,
+                lock_funcs,
+                raw_lockstring,
+                _compile_lock(evalstring, lock_funcs),
+            )
+            for access_type, (evalstring, lock_funcs, raw_lockstring, _) in state["locks"].items()
+        }
+        self.__dict__.update(state)
+
     def _log_error(self, message):
         "Try to log errors back to object"
         raise LockException(message)
 
+    def _parse_lock_definition(self, rhs, raw_lockstring, elist):
+        """
+        Helper function. Parse and compile the right-hand side of a single
+        lock definition, such as `perm(Builder) AND NOT attr(foo)`.
+
+        Args:
+            rhs (str): The lock definition, without the access type.
+            raw_lockstring (str): The full lock definition, for error reporting.
+            elist (list): Errors will be appended to this list.
+
+        Returns:
+            tuple or None: `(evalstring, lock_funcs, compiled)`, or `None` if the
+                definition had errors.
+
+        """
+        # parse the lock functions and separators
+        funclist = _RE_FUNCS.findall(rhs)
+        evalstring = rhs
+        for pattern in ("AND", "OR", "NOT"):
+            evalstring = re.sub(r"\b%s\b" % pattern, pattern.lower(), evalstring)
+        lock_funcs = []
+        for funcstring in funclist:
+            funcname, rest = (part.strip().strip(")") for part in funcstring.split("(", 1))
+            func = _LOCKFUNCS.get(funcname, None)
+            if not callable(func):
+                elist.append(
+                    _("Lock: lock-function '{lockfunc}' is not available.").format(
+                        lockfunc=funcstring
+                    )
+                )
+                continue
+            args = list(arg.strip() for arg in rest.split(",") if arg and "=" not in arg)
+            kwargs = dict(
+                [
+                    (part.strip() for part in arg.split("=", 1))
+                    for arg in rest.split(",")
+                    if arg and "=" in arg
+                ]
+            )
+            lock_funcs.append((func, args, kwargs))
+            evalstring = evalstring.replace(funcstring, "%s")
+        if len(lock_funcs) < len(funclist):
+            return None
+        lock_funcs = tuple(lock_funcs)
+        try:
+            # purge the eval string of any superfluous items, then compile it
+            evalstring = " ".join(_RE_OK.findall(evalstring))
+            compiled = _compile_lock(evalstring, lock_funcs)
+        except Exception:
+            elist.append(
+                _("Lock: definition '{lock_string}' has syntax errors.").format(
+                    lock_string=raw_lockstring
+                )
+            )
+            return None
+        return evalstring, lock_funcs, compiled
+
     def _parse_lockstring(self, storage_lockstring):
         """
         Helper function. This is normally only called when the
@@ -211,6 +373,10 @@ class LockHandler:
         Args:
             storage_locksring (str): The lockstring to parse.
 
+        Returns:
+            dict: `{access_type: (evalstring, lock_funcs, raw_lockstring, compiled), ...}`,
+                where `compiled` is the lock compiled into a Python function.
+
         """
         locks = {}
         if not storage_lockstring:
@@ -221,52 +387,23 @@ class LockHandler:
         for raw_lockstring in storage_lockstring.split(";"):
             if not raw_lockstring:
                 continue
-            lock_funcs = []
             try:
                 access_type, rhs = (part.strip() for part in raw_lockstring.split(":", 1))
             except ValueError:
                 logger.log_trace()
                 return locks
 
-            # parse the lock functions and separators
-            funclist = _RE_FUNCS.findall(rhs)
-            evalstring = rhs
-            for pattern in ("AND", "OR", "NOT"):
-                evalstring = re.sub(r"\b%s\b" % pattern, pattern.lower(), evalstring)
-            nfuncs = len(funclist)
-            for funcstring in funclist:
-                funcname, rest = (part.strip().strip(")") for part in funcstring.split("(", 1))
-                func = _LOCKFUNCS.get(funcname, None)
-                if not callable(func):
-                    elist.append(
-                        _("Lock: lock-function '{lockfunc}' is not available.").format(
-                            lockfunc=funcstring
-                        )
-                    )
+            if rhs in _COMPILED_LOCKS:
+                # this lock definition was already parsed and compiled
+                evalstring, lock_funcs, compiled = _COMPILED_LOCKS[rhs]
+            else:
+                parsed = self._parse_lock_definition(rhs, raw_lockstring, elist)
+                if not parsed:
                     continue
-                args = list(arg.strip() for arg in rest.split(",") if arg and "=" not in arg)
-                kwargs = dict(
-                    [
-                        (part.strip() for part in arg.split("=", 1))
-                        for arg in rest.split(",")
-                        if arg and "=" in arg
-                    ]
-                )
-                lock_funcs.append((func, args, kwargs))
-                evalstring = evalstring.replace(funcstring, "%s")
-            if len(lock_funcs) < nfuncs:
-                continue
-            try:
-                # purge the eval string of any superfluous items, then test it
-                evalstring = " ".join(_RE_OK.findall(evalstring))
-                eval(evalstring % tuple(True for func in funclist), {}, {})
-            except Exception:
-                elist.append(
-                    _("Lock: definition '{lock_string}' has syntax errors.").format(
-                        lock_string=raw_lockstring
-                    )
-                )
-                continue
+                evalstring, lock_funcs, compiled = parsed
+                if len(_COMPILED_LOCKS) >= _COMPILED_LOCKS_MAXSIZE:
+                    _COMPILED_LOCKS.clear()
+                _COMPILED_LOCKS[rhs] = parsed
             if access_type in locks:
                 duplicates += 1
                 wlist.append(
@@ -280,7 +417,7 @@ class LockHandler:
                         )
                     )
                 )
-            locks[access_type] = (evalstring, tuple(lock_funcs), raw_lockstring)
+            locks[access_type] = (evalstring, lock_funcs, raw_lockstring, compiled)
         if wlist and WARNING_LOG:
             # a warning text was set, it's not an error, so only report
             logger.log_file("\n".join(wlist), WARNING_LOG)
@@ -296,6 +433,9 @@ class LockHandler:
 
         """
         self.locks = self._parse_lockstring(storage_lockstring)
+        self._static_results = {}
+        self._cacheable = {}
+        self._result_cache = {}
 
     def _save_locks(self):
         """
@@ -473,6 +613,9 @@ class LockHandler:
         """
         if access_type in self.locks:
             del self.locks[access_type]
+            self._static_results.pop(access_type, None)
+            self._cacheable.pop(access_type, None)
+            self._result_cache = {}
             self._save_locks()
             return True
         return False
@@ -485,6 +628,9 @@ class LockHandler:
 
         """
         self.locks = {}
+        self._static_results = {}
+        self._cacheable = {}
+        self._result_cache = {}
         self.lock_storage = ""
         self._save_locks()
 
@@ -539,12 +685,18 @@ class LockHandler:
 
             Parsing the lockstring, we (during cache) extract the valid
             lock functions and store their function objects in the right
-            order along with their args/kwargs. These are now executed in
-            sequence, creating a list of True/False values. This is put
-            into the evalstring, which is a string of AND/OR/NOT entries
-            separated by placeholders where each function result should
-            go. We just put those results in and evaluate the string to
-            get a final, combined True/False value for the lockstring.
+            order along with their args/kwargs. The AND/OR/NOT entries
+            between them are then compiled, together with the calls to
+            the lock functions, into a Python function. Compiled locks are
+            shared between all handlers with the same lock definition.
+            Calling it executes the lock functions in order (skipping those
+            that can't affect the result) to get a final, combined
+            True/False value for the lockstring.
+
+            If `settings.LOCK_RESULT_CACHE` is set, the results of locks
+            only using the lock functions in `settings.LOCK_RESULT_CACHE_FUNCS`
+            are cached per accessing object until the lock changes or
+            `invalidate_lock_cache` is called.
 
             The important bit with this solution is that the full
             lockstring is never blindly evaluated, and thus there (should
@@ -577,21 +729,91 @@ class LockHandler:
         # no superuser or bypass -> normal lock operation
         if access_type in self.locks:
             # we have a lock, test it.
-            evalstring, func_tup, raw_string = self.locks[access_type]
-            # execute all lock funcs in the correct order, producing a tuple of True/False results.
-            true_false = tuple(
-                bool(tup[0](accessing_obj, self.obj, *tup[1], access_type=access_type, **tup[2]))
-                for tup in func_tup
-            )
-            # the True/False tuple goes into evalstring, which combines them
+            evalstring, func_tup, raw_string, compiled = self.locks[access_type]
+            if _LOCK_RESULT_CACHE and self._is_cacheable(access_type, func_tup):
+                return self._check_cached(accessing_obj, access_type, compiled)
+            # the compiled lock calls the lock funcs and combines their results
             # with AND/OR/NOT in order to get the final result.
-            return eval(evalstring % true_false)
+            return compiled(accessing_obj, self.obj, access_type=access_type)
         else:
             return default
 
+    def _is_cacheable(self, access_type, func_tup):
+        """
+        Check if the result of a lock may be cached by the lock result cache.
+
+        """
+        try:
+            return self._cacheable[access_type]
+        except KeyError:
+            cacheable = self._cacheable[access_type] = all(
+                tup[0] in _CACHEABLE_LOCKFUNCS for tup in func_tup
+            )
+            return cacheable
+
+    def _check_cached(self, accessing_obj, access_type, compiled):
+        """
+        Check a lock, using and updating the lock result cache.
+
+        Args:
+            accessing_obj (object): The object seeking access.
+            access_type (str): The type of access wanted.
+            compiled (callable): The compiled lock.
+
+        Returns:
+            bool: The result of the lock.
+
+        """
+        if self._result_cache_generation != _LOCK_CACHE_GENERATION:
+            # something has changed since the results were cached
+            self._result_cache = {}
+            self._result_cache_generation = _LOCK_CACHE_GENERATION
+        if not hasattr(accessing_obj, "__dbclass__") or not accessing_obj.pk:
+            # only typeclassed entities (not e.g. sessions or commands) are cached
+            return compiled(accessing_obj, self.obj, access_type=access_type)
+        cachekey = (accessing_obj, access_type)
+        try:
+            return self._result_cache[cachekey]
+        except KeyError:
+            pass
+        result = compiled(accessing_obj, self.obj, access_type=access_type)
+        if len(self._result_cache) >= _LOCK_RESULT_CACHE_SIZE:
+            self._result_cache = {}
+        self._result_cache[cachekey] = result
+        return result
+
+    def get_static_result(self, access_type):
+        """
+        Get the result of a lock that gives the same result no matter who is
+        accessing, such as `call:true()` or `get:false()`. The result is cached
+        until the lock changes.
+
+        Args:
+            access_type (str): The type of access to check.
+
+        Returns:
+            bool or None: The result of the lock, or `None` if there is no such
+                lock or its result depends on the accessing object.
+
+        Notes:
+            This does not consider superuser bypass.
+
+        """
+        try:
+            return self._static_results[access_type]
+        except KeyError:
+            pass
+        result = None
+        if access_type in self.locks:
+            evalstring, func_tup, raw_string, compiled = self.locks[access_type]
+            if all(tup[0] in _STATIC_LOCKFUNCS for tup in func_tup):
+                result = compiled(None, self.obj)
+        self._static_results[access_type] = result
+        return result
+
     def _eval_access_type(self, accessing_obj, locks, access_type):
         """
-        Helper method for evaluating the access type using eval().
+        Helper method for evaluating the access type using its compiled lock.
 
         Args:
             accessing_obj (object): Object seeking access.
@@ -599,9 +821,7 @@ class LockHandler:
             access_type (str): An access-type key to evaluate.
 
         """
-        evalstring, func_tup, raw_string = locks[access_type]
-        true_false = tuple(tup[0](accessing_obj, self.obj, *tup[1], **tup[2]) for tup in func_tup)
-        return eval(evalstring % true_false)
+        return locks[access_type][3](accessing_obj, self.obj)
 
     def check_lockstring(
         self, accessing_obj, lockstring, no_superuser_bypass=False, default=False, access_type=None
@@ -15,8 +15,11 @@ try:
 except ImportError:
     from django.test import TestCase, override_settings
 
+import pickle
+from unittest import mock
+
 from evennia import settings_default
-from evennia.locks import lockfuncs
+from evennia.locks import lockfuncs, lockhandler
 from evennia.utils.create import create_object
 
 # ------------------------------------------------------------
@@ -41,6 +44,68 @@ class TestLockCheck(BaseEvenniaTest):
         self.assertEqual(False, self.obj1.locks.check(self.obj2, "get"))
         self.assertEqual(True, self.obj1.locks.check(self.obj2, "not_exist", default=True))
 
+    def test_static_result(self):
+        self.obj1.locks.add("call:true();get:false();puppet:not all();edit:perm(Admin)")
+        self.assertEqual(True, self.obj1.locks.get_static_result("call"))
+        self.assertEqual(False, self.obj1.locks.get_static_result("get"))
+        self.assertEqual(False, self.obj1.locks.get_static_result("puppet"))
+        self.assertEqual(None, self.obj1.locks.get_static_result("edit"))
+        self.assertEqual(None, self.obj1.locks.get_static_result("not_exist"))
+        # changing the lock resets the result
+        self.obj1.locks.add("call:false()")
+        self.assertEqual(False, self.obj1.locks.get_static_result("call"))
+        self.obj1.locks.remove("get")
+        self.assertEqual(None, self.obj1.locks.get_static_result("get"))
+
+    def test_compiled(self):
+        self.obj1.locks.add(
+            "edit:not false() and (false() or true());get:NOT id(%s) OR false()" % self.obj2.dbid
+        )
+        self.assertEqual(True, self.obj1.locks.check(self.obj2, "edit"))
+        self.assertEqual(False, self.obj1.locks.check(self.obj2, "get"))
+        self.assertEqual(True, self.obj1.locks.check(self.obj1, "get"))
+        # identical lock definitions share the compiled lock
+        self.obj2.locks.add("edit:not false() and (false() or true())")
+        self.assertIs(self.obj1.locks.locks["edit"][3], self.obj2.locks.locks["edit"][3])
+
+    def test_compiled_short_circuit(self):
+        self.obj1.locks.add("get:true() or attr(foo)")
+        with mock.patch("evennia.locks.lockfuncs.attr") as mock_attr:
+            self.assertEqual(True, self.obj1.locks.check(self.obj2, "get"))
+            mock_attr.assert_not_called()
+
+    def test_compiled_pickle(self):
+        self.obj1.locks.add("get:not false() and id(%s)" % self.obj2.dbid)
+        state = self.obj1.locks.__getstate__()
+        state["locks"] = pickle.loads(pickle.dumps(state["locks"]))
+        locks = lockhandler.LockHandler.__new__(lockhandler.LockHandler)
+        locks.__setstate__(state)
+        self.assertEqual(str(self.obj1.locks), str(locks))
+        self.assertEqual(True, locks.check(self.obj2, "get"))
+        self.assertEqual(False, locks.check(self.obj1, "get"))
+
+    @mock.patch("evennia.locks.lockhandler._LOCK_RESULT_CACHE", True)
+    def test_result_cache(self):
+        self.obj1.locks.add("edit:perm(Builder);get:attr(foo)")
+        self.assertEqual(False, self.obj1.locks.check(self.obj2, "edit"))
+        self.assertIn((self.obj2, "edit"), self.obj1.locks._result_cache)
+        # permission change invalidates
+        self.obj2.permissions.add("Builder")
+        self.assertEqual(True, self.obj1.locks.check(self.obj2, "edit"))
+        # lock change invalidates
+        self.obj1.locks.add("edit:perm(Developer)")
+        self.assertEqual(False, self.obj1.locks.check(self.obj2, "edit"))
+        # locks using non-cacheable lockfuncs are not cached
+        self.assertEqual(False, self.obj1.locks.check(self.obj2, "get"))
+        self.assertNotIn((self.obj2, "get"), self.obj1.locks._result_cache)
+        self.obj2.db.foo = True
+        self.assertEqual(True, self.obj1.locks.check(self.obj2, "get"))
+        # manual invalidation
+        self.assertIn((self.obj2, "edit"), self.obj1.locks._result_cache)
+        lockhandler.invalidate_lock_cache()
+        self.obj1.locks.check(self.obj2, "edit")
+        self.assertEqual(len(self.obj1.locks._result_cache), 1)
+
 
 class TestLockfuncs(BaseEvenniaTest):
     def setUp(self):
@@ -9,6 +9,8 @@ from django.db.models import Q
 from django.db.models.fields import exceptions
 
 from evennia.server import signals
+from evennia.typeclasses.keyindex import get_key_index
+from evennia.typeclasses.tags import fill_tag_caches
 from evennia.typeclasses.managers import TypeclassManager, TypedObjectManager
 from evennia.utils.utils import (
     class_from_module,
@@ -25,6 +27,9 @@ _GA = object.__getattribute__
 _ATTR = None
 
 _MULTIMATCH_REGEX = re.compile(settings.SEARCH_MULTIMATCH_REGEX, re.I + re.U)
+# with more matches than this, it's faster to let the database do the search
+# than to look up the matches found with the key index
+_KEY_INDEX_MAX_MATCHES = 1000
 
 # Try to use a custom way to parse id-tagged multimatches.
 
@@ -50,6 +55,7 @@ class ObjectDBManager(TypedObjectManager):
     get_objs_with_db_property
     get_objs_with_db_property_match
     get_objs_with_key_or_alias
+    get_cached_objs_with_key_or_alias
     get_contents
     search_object (interface to many of the above methods,
                    equivalent to evennia.search_object)
@@ -299,6 +305,18 @@ class ObjectDBManager(TypedObjectManager):
             # Exit early.
             return self.none()
 
+        if candidates is None:
+            # a global search - use the key index if available
+            index = get_key_index(self.model._meta.concrete_model)
+            if index:
+                ids = index.search(
+                    ostring,
+                    match="exact" if exact else "words",
+                    typeclasses=make_iter(typeclasses) if typeclasses else None,
+                )
+                if ids is not None and len(ids) <= _KEY_INDEX_MAX_MATCHES:
+                    return self.filter(id__in=ids).order_by("id")
+
         # build query objects
         candidates_id = [_GA(obj, "id") for obj in make_iter(candidates) if obj]
         cand_restriction = candidates is not None and Q(pk__in=candidates_id) or Q()
@@ -341,6 +359,62 @@ class ObjectDBManager(TypedObjectManager):
             .order_by("id")
         )
 
+    def get_cached_objs_with_key_or_alias(self, ostring, candidates, exact=True, typeclasses=None):
+        """
+        In-memory version of `get_objs_with_key_or_alias`, matching among
+        candidates without querying the database (except to cache the aliases
+        of candidates whose aliases were not cached yet).
+
+        Args:
+            ostring (str): A search criterion.
+            candidates (list): Only match among these candidates.
+            exact (bool, optional): Require exact match of ostring
+                (still case-insensitive). If `False`, will do fuzzy matching with a regex filter.
+            typeclasses (list): Only match objects with typeclasses having these path strings.
+
+        Returns:
+            list: 0, 1 or more matches, ordered by id.
+
+        """
+        if not isinstance(ostring, str):
+            if hasattr(ostring, "key"):
+                ostring = ostring.key
+            else:
+                return []
+        candidates = {_GA(obj, "id"): obj for obj in make_iter(candidates) if obj}
+        if typeclasses:
+            typeclasses = make_iter(typeclasses)
+            candidates = {
+                dbid: obj
+                for dbid, obj in candidates.items()
+                if obj.db_typeclass_path in typeclasses
+            }
+        if not candidates:
+            return []
+
+        fill_tag_caches([obj.aliases for obj in candidates.values()])
+
+        if exact:
+            ostring = ostring.lower()
+
+            def _is_match(name):
+                return name.lower() == ostring
+
+        else:
+            # same partial-match regex as used for the database search
+            search_regex = re.compile(
+                r".* ".join(r"\b" + re.escape(word) for word in ostring.split()) + r".*", re.I
+            )
+
+            def _is_match(name):
+                return search_regex.search(name) is not None
+
+        return [
+            obj
+            for _, obj in sorted(candidates.items())
+            if _is_match(obj.db_key) or any(_is_match(alias) for alias in obj.aliases.all())
+        ]
+
     # main search methods and helper functions
 
     def search_object(
@@ -352,10 +426,12 @@ class ObjectDBManager(TypedObjectManager):
         exact=True,
         use_dbref=True,
         tags=None,
+        in_memory=False,
     ):
         """
         Search as an object globally or in a list of candidates and
-        return results. Always returns a QuerySet of Objects.
+        return results. Returns a QuerySet of Objects, or a list if
+        the search was done in-memory (see `in_memory`).
 
         Args:
             searchdata (str or Object): The entity to match for. This is
@@ -389,16 +465,32 @@ class ObjectDBManager(TypedObjectManager):
             tags (list): A list of tuples `(tagkey, tagcategory)` where the
                 matched object must have _all_ tags in order to be considered
                 a match.
+            in_memory (bool): If set and searching key/aliases among `candidates`
+                (without `tags`), match the candidates in memory instead of querying
+                the database. The candidates (and their aliases) are usually already
+                cached, so this is much faster. The result is then a list.
 
         Returns:
-            matches (QuerySet): Matching objects
+            matches (QuerySet or list): Matching objects. This is a list if
+                the search was done in-memory.
 
         """
+        in_memory = (
+            in_memory
+            and candidates is not None
+            and not attribute_name
+            and not tags
+            and settings.TYPECLASS_AGGRESSIVE_CACHE
+        )
 
         def _searcher(searchdata, candidates, typeclass, exact=False):
             """
             Helper method for searching objects.
             """
+            if in_memory:
+                return self.get_cached_objs_with_key_or_alias(
+                    searchdata, candidates, exact=exact, typeclasses=typeclass
+                )
             if attribute_name:
                 # attribute/property search (always exact).
                 matches = self.get_objs_with_db_property_value(
@@ -425,7 +517,7 @@ class ObjectDBManager(TypedObjectManager):
         if candidates is not None:
             if not candidates:
                 # candidates is an empty list. This should mean no matches can ever be acquired.
-                return self.none()
+                return [] if in_memory else self.none()
             # Convenience check to make sure candidates are really dbobjs
             candidates = [cand for cand in make_iter(candidates) if cand]
 
@@ -436,9 +528,9 @@ class ObjectDBManager(TypedObjectManager):
             if dbref_match:
                 dmatch = dbref_match[0]
                 if not candidates or dmatch in candidates:
-                    return dbref_match
+                    return [dmatch] if in_memory else dbref_match
                 else:
-                    return self.none()
+                    return [] if in_memory else self.none()
 
         if typeclass:
             # typeclass may be a string, a typeclass, or a list
@@ -480,12 +572,15 @@ class ObjectDBManager(TypedObjectManager):
         # deal with result
         if match_number is not None:
             if 0 <= match_number < len(matches):
-                # limit to one match (we still want a queryset back)
-                # NOTE: still haven't found a way to avoid a second lookup
-                matches = self.filter(id=matches[match_number].id)
+                if in_memory:
+                    matches = [matches[match_number]]
+                else:
+                    # limit to one match (we still want a queryset back)
+                    # NOTE: still haven't found a way to avoid a second lookup
+                    matches = self.filter(id=matches[match_number].id)
             else:
                 # a number was given outside of range. This means a no-match.
-                matches = self.none()
+                matches = [] if in_memory else self.none()
 
         # return a QuerySet (possibly empty)
         return matches
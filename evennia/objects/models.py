@@ -25,6 +25,34 @@ from evennia.typeclasses.models import TypedObject
 from evennia.utils import logger
 from evennia.utils.utils import dbref, lazy_property, make_iter
 
+_AT_CMDSET_GET = None
+
+
+def _carries_cmdsets(obj, cmdsethandler=None):
+    """
+    Check if an object may provide cmdsets to others (in the same location).
+    This is the case if it has any cmdsets except the empty default one, or if
+    it has a customized `at_cmdset_get` hook (which may add cmdsets on the fly).
+
+    Args:
+        obj (Object): The object to check.
+        cmdsethandler (CmdSetHandler, optional): The object's cmdset handler,
+            if already available.
+
+    Returns:
+        bool: If the object may provide cmdsets.
+
+    """
+    global _AT_CMDSET_GET
+    if not _AT_CMDSET_GET:
+        from evennia.objects.objects import DefaultObject
+
+        _AT_CMDSET_GET = DefaultObject.at_cmdset_get
+    if getattr(type(obj), "at_cmdset_get", _AT_CMDSET_GET) is not _AT_CMDSET_GET:
+        return True
+    cmdsethandler = cmdsethandler or obj.cmdset
+    return any(cmdset.key != "_EMPTY_CMDSET" for cmdset in cmdsethandler.cmdset_stack)
+
 
 class ContentsHandler:
     """
@@ -51,6 +79,8 @@ class ContentsHandler:
         self._pkcache = {}
         self._idcache = obj.__class__.__instance_cache__
         self._typecache = defaultdict(dict)
+        # the contents carrying cmdsets, built on demand
+        self._cmdset_pkcache = None
         self.init()
 
     def load(self):
@@ -70,6 +100,7 @@ class ContentsHandler:
         objects = self.load()
         self._typecache = defaultdict(dict)
         self._pkcache = {obj.pk: True for obj in objects}
+        self._cmdset_pkcache = None
         for obj in objects:
             try:
                 ctypes = obj._content_types
@@ -115,6 +146,48 @@ class ContentsHandler:
                 logger.log_err("contents cache failed for %s." % self.obj.key)
                 return self.load()
 
+    def get_cmdset_carriers(self, exclude=None):
+        """
+        Return the contents that may provide cmdsets to other objects in this
+        location; that is, objects with cmdsets or with a customized
+        `at_cmdset_get` hook. This is used by the cmdhandler to avoid checking
+        every object in the location for every command.
+
+        Args:
+            exclude (Object or list of Object): object(s) to ignore
+
+        Returns:
+            objects (list): the cmdset-carrying Objects inside this location
+
+        """
+        if self._cmdset_pkcache is None:
+            self._cmdset_pkcache = {obj.pk: True for obj in self.get() if _carries_cmdsets(obj)}
+        pks = self._cmdset_pkcache.keys()
+        if exclude:
+            pks = set(pks) - {excl.pk for excl in make_iter(exclude)}
+        try:
+            return [self._idcache[pk] for pk in pks]
+        except KeyError:
+            # an object was flushed from the idmapper cache; rebuild
+            self.init()
+            return [obj for obj in self.get(exclude=exclude) if _carries_cmdsets(obj)]
+
+    def update_cmdset_carrier(self, obj, cmdsethandler=None):
+        """
+        Re-check if an object in this location carries cmdsets. This is called
+        when the cmdsets of the object change.
+
+        Args:
+            obj (Object): The object to check.
+            cmdsethandler (CmdSetHandler, optional): The object's cmdset handler.
+
+        """
+        if self._cmdset_pkcache is not None and obj.pk in self._pkcache:
+            if _carries_cmdsets(obj, cmdsethandler=cmdsethandler):
+                self._cmdset_pkcache[obj.pk] = True
+            else:
+                self._cmdset_pkcache.pop(obj.pk, None)
+
     def add(self, obj):
         """
         Add a new object to this location
@@ -126,6 +199,8 @@ class ContentsHandler:
         self._pkcache[obj.pk] = obj
         for ctype in obj._content_types:
             self._typecache[ctype][obj.pk] = True
+        if self._cmdset_pkcache is not None and _carries_cmdsets(obj):
+            self._cmdset_pkcache[obj.pk] = True
 
     def remove(self, obj):
         """
@@ -139,6 +214,8 @@ class ContentsHandler:
         for ctype in obj._content_types:
             if obj.pk in self._typecache[ctype]:
                 self._typecache[ctype].pop(obj.pk, None)
+        if self._cmdset_pkcache is not None:
+            self._cmdset_pkcache.pop(obj.pk, None)
 
     def clear(self):
         """
@@ -147,6 +224,7 @@ class ContentsHandler:
         """
         self._pkcache = {}
         self._typecache = defaultdict(dict)
+        self._cmdset_pkcache = None
         self.init()
 
 
@@ -9,6 +9,7 @@ entities.
 import time
 import typing
 from collections import defaultdict
+from contextlib import nullcontext
 
 import evennia
 import inflect
@@ -21,7 +22,7 @@ from evennia.objects.models import ObjectDB
 from evennia.scripts.scripthandler import ScriptHandler
 from evennia.server.signals import SIGNAL_EXIT_TRAVERSED
 from evennia.typeclasses.attributes import ModelAttributeBackend, NickHandler
-from evennia.typeclasses.models import TypeclassBase
+from evennia.typeclasses.models import TypeclassBase, prefetch_handlers
 from evennia.utils import ansi, create, funcparser, logger, search
 from evennia.utils.utils import (
     class_from_module,
@@ -50,6 +51,17 @@ _SESSID_MAX = 16 if _MULTISESSION_MODE in (1, 3) else 1
 _MSG_CONTENTS_PARSER = funcparser.FuncParser(funcparser.ACTOR_STANCE_CALLABLES)
 
 
+def _batched_data_out():
+    """
+    Get a context manager sending all messages to the Portal in one batch, if
+    the session handler supports it.
+
+    """
+    if hasattr(evennia.SESSION_HANDLER, "batched_data_out"):
+        return evennia.SESSION_HANDLER.batched_data_out()
+    return nullcontext()
+
+
 class ObjectSessionHandler:
     """
     Handles the get/setting of the sessid comma-separated integer field
@@ -640,6 +652,9 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
         Returns:
             queryset or iterable: The result of the search.
 
+        Notes:
+            Searches among candidates are done in-memory, without querying the database.
+
         """
 
         return ObjectDB.objects.search_object(
@@ -650,6 +665,7 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
             exact=exact,
             use_dbref=use_dbref,
             tags=tags,
+            in_memory=True,
         )
 
     def get_stacked_results(self, results, **kwargs):
@@ -1128,6 +1144,12 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
             - player1 will see: 'Player1 attacks The Second girl.'
             - player2 will see: 'The First girl attacks Player2'
 
+            The message is only parsed once for every group of receivers that
+            see the same display names (and are/aren't the same objects in the
+            `mapping`), so inline functions with random results (like `$random()`)
+            will give the same result for all receivers in such a group. The
+            messages to all receivers are sent to the Portal in one batch.
+
         """
         # we also accept an outcommand on the form (message, {kwargs})
         is_outcmd = text and is_iter(text)
@@ -1143,21 +1165,21 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
         if exclude:
             exclude = make_iter(exclude)
             contents = [obj for obj in contents if obj not in exclude]
+        # display names may check the receivers' permissions and other tags
+        prefetch_handlers(contents, attributes=False)
 
-        for receiver in contents:
-            # actor-stance replacements
-            outmessage = _MSG_CONTENTS_PARSER.parse(
-                inmessage,
-                raise_errors=raise_funcparse_errors,
-                return_string=True,
-                caller=you,
-                receiver=receiver,
-                mapping=mapping,
-            )
+        # only run the funcparser if there is something for it to parse
+        needs_parsing = (
+            _MSG_CONTENTS_PARSER.start_char in inmessage
+            or _MSG_CONTENTS_PARSER.escape_char in inmessage
+        )
+        # receivers seeing the same display-names, and being the same objects in
+        # the mapping, will see the same message, so each variant is rendered once
+        variants = {}
 
-            # director-stance replacements
-            outmessage = outmessage.format_map(
-                {
+        with _batched_data_out():
+            for receiver in contents:
+                display_names = {
                     key: (
                         obj.get_display_name(looker=receiver)
                         if hasattr(obj, "get_display_name")
@@ -1165,9 +1187,28 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
                     )
                     for key, obj in mapping.items()
                 }
-            )
-
-            receiver.msg(text=(outmessage, outkwargs), from_obj=from_obj, **kwargs)
+                variant = (
+                    tuple(display_names.values()),
+                    tuple(obj == receiver for obj in mapping.values()),
+                )
+                try:
+                    outmessage = variants[variant]
+                except KeyError:
+                    outmessage = inmessage
+                    if needs_parsing:
+                        # actor-stance replacements
+                        outmessage = _MSG_CONTENTS_PARSER.parse(
+                            outmessage,
+                            raise_errors=raise_funcparse_errors,
+                            return_string=True,
+                            caller=you,
+                            receiver=receiver,
+                            mapping=mapping,
+                        )
+                    # director-stance replacements
+                    outmessage = variants[variant] = outmessage.format_map(display_names)
+
+                receiver.msg(text=(outmessage, outkwargs), from_obj=from_obj, **kwargs)
 
     def move_to(
         self,
@@ -1902,6 +1943,9 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
         if not looker:
             return ""
 
+        # load what the display helpers may look up on the contents all at once
+        prefetch_handlers(self.contents)
+
         # populate the appearance_template string.
         return self.format_appearance(
             self.appearance_template.format(
@@ -2597,6 +2641,7 @@ class DefaultObject(ObjectDB, metaclass=TypeclassBase):
         def _filter_visible(obj_list):
             return [obj for obj in self.filter_visible(obj_list, looker, **kwargs) if obj != looker]
 
+        prefetch_handlers(self.contents)
         return {
             "exits": _filter_visible(self.contents_get(content_type="exit")),
             "characters": _filter_visible(self.contents_get(content_type="character")),
@@ -1,5 +1,7 @@
 from unittest import skip
+from unittest.mock import MagicMock, patch
 
+from evennia.objects import objects
 from evennia.objects.objects import DefaultCharacter, DefaultExit, DefaultObject, DefaultRoom
 from evennia.objects.models import ObjectDB
 from evennia.typeclasses.attributes import AttributeProperty
@@ -229,6 +231,43 @@ class DefaultObjectTest(BaseEvenniaTest):
             pattern,
         )
 
+    def test_msg_contents(self):
+        receivers = (self.exit, self.obj1, self.obj2, self.char1, self.char2)
+        for receiver in receivers:
+            receiver.msg = MagicMock()
+
+        with patch(
+            "evennia.objects.objects._MSG_CONTENTS_PARSER.parse",
+            wraps=objects._MSG_CONTENTS_PARSER.parse,
+        ) as mock_parse:
+            self.room1.msg_contents(
+                "$You() $conj(wave) at {target}.",
+                from_obj=self.char1,
+                mapping={"target": self.char2},
+            )
+            # only parsed once per variant: char1, char2 and everyone else
+            self.assertEqual(mock_parse.call_count, 3)
+
+        for receiver in receivers:
+            you = (
+                "You wave"
+                if receiver == self.char1
+                else f"{self.char1.get_display_name(looker=receiver)} waves"
+            )
+            receiver.msg.assert_called_with(
+                text=(f"{you} at {self.char2.get_display_name(looker=receiver)}.", {}),
+                from_obj=self.char1,
+            )
+
+    def test_msg_contents_no_parsing(self):
+        self.obj1.msg = MagicMock()
+        with patch("evennia.objects.objects._MSG_CONTENTS_PARSER.parse") as mock_parse:
+            self.room1.msg_contents("Hello {target}!", mapping={"target": self.obj2})
+            mock_parse.assert_not_called()
+        self.obj1.msg.assert_called_with(
+            text=(f"Hello {self.obj2.get_display_name(looker=self.obj1)}!", {}), from_obj=None
+        )
+
     def test_get_name_without_article(self):
         self.assertEqual(self.obj1.get_numbered_name(1, self.char1, return_string=True), "an Obj")
         self.assertEqual(
@@ -325,6 +364,78 @@ class TestObjectManager(BaseEvenniaTest):
         query = ObjectDB.objects.get_objs_with_key_or_alias("sw b", exact=False)
         self.assertEqual(list(query), [])
 
+    def test_get_cached_objs_with_key_or_alias(self):
+        """
+        The in-memory matching should give the same results as the database query.
+        """
+        self.obj1.key = "big sword"
+        self.obj2.key = "shiny sword"
+        self.char1.aliases.add("test alias")
+        candidates = list(ObjectDB.objects.all())
+        manager = ObjectDB.objects
+
+        for ostring, exact, typeclasses in (
+            ("Char", True, None),
+            ("char", True, "evennia.objects.objects.DefaultObject"),
+            ("test ALIAS", True, None),
+            ("", True, None),
+            ("", False, None),
+            ("", False, "evennia.objects.objects.DefaultCharacter"),
+            ("sw", False, None),
+            ("wor", False, None),
+            ("b sw", False, None),
+            ("sw b", False, None),
+            ("test al", False, None),
+        ):
+            self.assertEqual(
+                manager.get_cached_objs_with_key_or_alias(
+                    ostring, candidates, exact=exact, typeclasses=typeclasses
+                ),
+                list(
+                    manager.get_objs_with_key_or_alias(
+                        ostring, exact=exact, candidates=candidates, typeclasses=typeclasses
+                    )
+                ),
+                f"mismatch for {ostring} (exact={exact}, typeclasses={typeclasses})",
+            )
+
+        # with the aliases cached, no database queries are needed
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                manager.get_cached_objs_with_key_or_alias("sword", [self.obj2, self.obj1]),
+                [],
+            )
+            self.assertEqual(
+                manager.get_cached_objs_with_key_or_alias(
+                    "sword", [self.obj2, self.obj1, self.obj1], exact=False
+                ),
+                [self.obj1, self.obj2],
+            )
+
+    def test_search_object_in_memory(self):
+        self.obj1.key = "sword"
+        self.obj2.key = "sword"
+        candidates = [self.obj1, self.obj2, self.char1]
+        manager = ObjectDB.objects
+        manager.get_cached_objs_with_key_or_alias("", candidates)  # cache aliases
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                manager.search_object("sword", candidates=candidates, in_memory=True),
+                [self.obj1, self.obj2],
+            )
+            self.assertEqual(
+                manager.search_object("sword-2", candidates=candidates, in_memory=True),
+                [self.obj2],
+            )
+            self.assertEqual(
+                manager.search_object("sword-3", candidates=candidates, in_memory=True), []
+            )
+            self.assertEqual(
+                manager.search_object("ch", candidates=candidates, exact=False, in_memory=True),
+                [self.char1],
+            )
+            self.assertEqual(manager.search_object("sword", candidates=[], in_memory=True), [])
+
     def test_search_object(self):
         self.char1.tags.add("test tag")
         self.obj1.tags.add("test tag")
@@ -445,6 +556,39 @@ class TestContentHandler(BaseEvenniaTest):
         self.obj2.move_to(self.room2)
         self.assertEqual(self.room2.contents, [self.obj1, self.obj2])
 
+    def test_cmdset_carriers(self):
+        """Only objects with cmdsets (or dynamic ones, like exits) are carriers"""
+        carriers = {self.exit, self.char1, self.char2}
+        from evennia.commands.cmdset import CmdSet
+        from evennia.commands.command import Command
+
+        class CmdTest(Command):
+            key = "test"
+
+        class CmdSetTest(CmdSet):
+            key = "TestCmdSet"
+
+            def at_cmdset_creation(self):
+                self.add(CmdTest)
+
+        contents_cache = self.room1.contents_cache
+        self.assertEqual(set(contents_cache.get_cmdset_carriers()), carriers)
+
+        # adding/removing cmdsets updates the cache
+        self.obj1.cmdset.add(CmdSetTest)
+        self.assertEqual(set(contents_cache.get_cmdset_carriers()), carriers | {self.obj1})
+        self.assertEqual(set(contents_cache.get_cmdset_carriers(exclude=self.obj1)), carriers)
+        self.obj1.cmdset.remove(CmdSetTest)
+        self.assertEqual(set(contents_cache.get_cmdset_carriers()), carriers)
+
+        # moving updates the cache
+        self.obj2.cmdset.add(CmdSetTest)
+        self.obj2.move_to(self.room2, quiet=True)
+        self.assertEqual(set(contents_cache.get_cmdset_carriers()), carriers)
+        self.assertEqual(self.room2.contents_cache.get_cmdset_carriers(), [self.obj2])
+        self.obj2.move_to(self.room1, quiet=True)
+        self.assertEqual(set(contents_cache.get_cmdset_carriers()), carriers | {self.obj2})
+
 
 class SubAttributeProperty(AttributeProperty):
     pass
@@ -524,6 +524,36 @@ class OnDemandHandler:
         # filter by category (treat no-category as its own category)
         return {keytuple: task for keytuple, task in self.tasks.items() if keytuple[1] == category}
 
+    def get_due(self, seconds=0, category=None, all_on_none=True):
+        """
+        Get the on-demand tasks that will reach a new stage within a given time, such
+        as to handle them together. This does not check the tasks, so no stage
+        functions are called. Tasks without stages or not yet started are skipped.
+
+        Args:
+            seconds (int or float, optional): Time from now.
+            category (str, optional): The category of the tasks.
+            all_on_none (bool, optional): Determines what to check if `category` is `None`.
+                If `True`, check all tasks, if `False`, only tasks with no category.
+
+        Returns:
+            list: A list `[(dt, task), ...]`, where `dt` is the time (in seconds) until
+            the task reaches its next stage, sorted with the first-due task first.
+
+        """
+        now = OnDemandTask.runtime()
+        due = []
+        for task in self.all(category=category, all_on_none=all_on_none).values():
+            if not task.stages or task.start_time is None:
+                continue
+            task_dt = now - task.start_time
+            next_dts = [dt for dt in task.stages if dt > task_dt]
+            if next_dts:
+                dt = min(next_dts) - task_dt
+                if dt <= seconds:
+                    due.append((dt, task))
+        return sorted(due, key=lambda tup: tup[0])
+
     def clear(self, category=None, all_on_none=True):
         """
         Clear all on-demand tasks.
@@ -1,8 +1,14 @@
 """
 Module containing the task handler for Evennia deferred tasks, persistent or not.
+
+Each persistent task is stored in its own `ServerConfig` entry, so adding or
+removing a task only writes that task. The tasks are also indexed by their due
+time, used to find stale tasks and by `TaskHandler.get_due` to find the tasks
+due within a given time.
 """
 
 from datetime import datetime, timedelta
+from heapq import heapify, heappop, heappush
 from pickle import PickleError
 
 from evennia.server.models import ServerConfig
@@ -13,6 +19,10 @@ from twisted.internet.defer import CancelledError as DefCancelledError
 from twisted.internet.task import deferLater
 
 TASK_HANDLER = None
+# each persistent task is stored as ServerConfig "delayed_task_<task_id>"
+_TASK_SAVE_PREFIX = "delayed_task_"
+# all persistent tasks used to be stored together under this ServerConfig key
+_TASK_SAVE_NAME_OLD = "delayed_tasks"
 
 
 def handle_error(*args, **kwargs):
@@ -220,7 +230,12 @@ class TaskHandler:
 
     def __init__(self):
         self.tasks = {}
+        # the serialized persistent tasks, as stored in the database
         self.to_save = {}
+        # a heap of (date, task_id) of all tasks. Removed tasks are only dropped
+        # from this when they reach the top.
+        self._due = []
+        self._next_id = 1
         self.clock = reactor
         # number of seconds before an uncalled canceled task is removed from TaskHandler
         self.stale_timeout = 60
@@ -233,35 +248,46 @@ class TaskHandler:
         It populates `self.tasks` according to the ServerConfig.
 
         """
-        to_save = False
-        value = ServerConfig.objects.conf("delayed_tasks", default=dict)
-        if isinstance(value, str):
-            tasks = dbunserialize(value)
-        else:
-            tasks = value
-
-        # At this point, `tasks` contains a dictionary of still-serialized tasks
-        for task_id, value in tasks.items():
+        to_remove = []
+        stored = {
+            int(conf.db_key[len(_TASK_SAVE_PREFIX) :]): conf.value
+            for conf in ServerConfig.objects.filter(db_key__startswith=_TASK_SAVE_PREFIX)
+        }
+        # convert tasks stored the old way, all in one entry
+        old_tasks = ServerConfig.objects.conf(_TASK_SAVE_NAME_OLD, default=dict)
+        if isinstance(old_tasks, str):
+            old_tasks = dbunserialize(old_tasks)
+        for task_id, value in old_tasks.items():
+            ServerConfig.objects.conf(_TASK_SAVE_PREFIX + str(task_id), value)
+            stored[task_id] = value
+        if old_tasks:
+            ServerConfig.objects.conf(_TASK_SAVE_NAME_OLD, delete=True)
+
+        # At this point, `stored` contains a dictionary of still-serialized tasks
+        for task_id, value in stored.items():
             date, callback, args, kwargs = dbunserialize(value)
+            self.to_save[task_id] = value
             if isinstance(callback, tuple):
                 # `callback` can be an object and name for instance methods
                 obj, method = callback
                 if obj is None:
-                    to_save = True
+                    to_remove.append(task_id)
                     continue
 
                 try:
                     callback = getattr(obj, method)
                 except Exception as e:
                     log_err(f"TaskHandler: Unable to load task {task_id} (disabling it): {e}")
-                    to_save = True
+                    to_remove.append(task_id)
                     continue
             self.tasks[task_id] = (date, callback, args, kwargs, True, None)
+            self._due.append((date, task_id))
+        heapify(self._due)
 
+        for task_id in to_remove:
+            self.remove(task_id)
         if self.stale_timeout > 0:  # cleanup stale tasks.
             self.clean_stale_tasks()
-        if to_save:
-            self.save()
 
     def clean_stale_tasks(self):
         """remove uncalled but canceled from task handler.
@@ -271,51 +297,100 @@ class TaskHandler:
         To adjust this time use TASK_HANDLER.stale_timeout.
 
         """
-        clean_ids = []
-        for task_id, (date, callback, args, kwargs, persistent, _) in self.tasks.items():
-            if not self.active(task_id):
-                stale_date = date + timedelta(seconds=self.stale_timeout)
-                # if a now time is provided use it (intended for unit testing)
-                now = self._now if self._now else datetime.now()
-                # the task was canceled more than stale_timeout seconds ago
-                if now > stale_date:
-                    clean_ids.append(task_id)
-        for task_id in clean_ids:
-            self.remove(task_id)
+        # if a now time is provided use it (intended for unit testing)
+        now = self._now if self._now else datetime.now()
+        # tasks due before this have been uncalled for more than stale_timeout seconds
+        stale_date = now - timedelta(seconds=self.stale_timeout)
+        keep = []
+        while self._due and self._due[0][0] < stale_date:
+            date, task_id = entry = heappop(self._due)
+            task = self.tasks.get(task_id)
+            if not task or task[0] != date:
+                # removed task
+                continue
+            if self.active(task_id):
+                # not canceled, just late (like when paused)
+                keep.append(entry)
+            else:
+                self.remove(task_id)
+        for entry in keep:
+            heappush(self._due, entry)
         return True
 
-    def save(self):
+    def get_due(self, seconds=0):
+        """
+        Get the active tasks that are due within a given time, such as to
+        handle them together.
+
+        Args:
+            seconds (int or float, optional): Time from now. Tasks that are
+                overdue but not yet called are also included.
+
+        Returns:
+            list: The `TaskHandlerTask`s, sorted by when they are due.
+
+        """
+        now = self._now if self._now else datetime.now()
+        limit = now + timedelta(seconds=seconds)
+        entries = []
+        due = []
+        while self._due and self._due[0][0] <= limit:
+            date, task_id = entry = heappop(self._due)
+            task = self.tasks.get(task_id)
+            if not task or task[0] != date:
+                # removed task
+                continue
+            entries.append(entry)
+            if self.active(task_id):
+                due.append(TaskHandlerTask(task_id))
+        for entry in entries:
+            heappush(self._due, entry)
+        return due
+
+    def _save_task(self, task_id):
         """
-        Save the tasks in ServerConfig.
+        Store a persistent task in the database.
+
+        Args:
+            task_id (int): The task to store.
 
+        Raises:
+            ValueError: If the callback cannot be stored.
+
+        """
+        date, callback, args, kwargs, persistent, _ = self.tasks[task_id]
+        safe_callback = callback
+        if getattr(callback, "__self__", None):
+            # `callback` is an instance method
+            obj = callback.__self__
+            name = callback.__name__
+            safe_callback = (obj, name)
+
+        # Check if callback can be pickled. args and kwargs have been checked
+        try:
+            dbserialize(safe_callback)
+        except (TypeError, AttributeError, PickleError) as err:
+            raise ValueError(
+                "the specified callback {callback} cannot be pickled. "
+                "It must be a top-level function in a module or an "
+                "instance method ({err}).".format(callback=callback, err=err)
+            )
+
+        self.to_save[task_id] = dbserialize((date, safe_callback, args, kwargs))
+        ServerConfig.objects.conf(_TASK_SAVE_PREFIX + str(task_id), self.to_save[task_id])
+
+    def save(self):
         """
+        Save the persistent tasks not yet stored in ServerConfig. Tasks
+        are normally stored as they are added, so this is rarely needed.
 
+        """
         for task_id, (date, callback, args, kwargs, persistent, _) in self.tasks.items():
             if task_id in self.to_save:
                 continue
             if not persistent:
                 continue
-
-            safe_callback = callback
-            if getattr(callback, "__self__", None):
-                # `callback` is an instance method
-                obj = callback.__self__
-                name = callback.__name__
-                safe_callback = (obj, name)
-
-            # Check if callback can be pickled. args and kwargs have been checked
-            try:
-                dbserialize(safe_callback)
-            except (TypeError, AttributeError, PickleError) as err:
-                raise ValueError(
-                    "the specified callback {callback} cannot be pickled. "
-                    "It must be a top-level function in a module or an "
-                    "instance method ({err}).".format(callback=callback, err=err)
-                )
-
-            self.to_save[task_id] = dbserialize((date, safe_callback, args, kwargs))
-
-        ServerConfig.objects.conf("delayed_tasks", self.to_save)
+            self._save_task(task_id)
 
     def add(self, timedelay, callback, *args, **kwargs):
         """
@@ -350,10 +425,10 @@ class TaskHandler:
         delta = timedelta(seconds=timedelay)
         comp_time = now + delta
         # get an open task id
-        used_ids = list(self.tasks.keys())
-        task_id = 1
-        while task_id in used_ids:
+        task_id = self._next_id
+        while task_id in self.tasks:
             task_id += 1
+        self._next_id = task_id + 1
 
         # record the task to the tasks dictionary
         persistent = kwargs.get("persistent", False)
@@ -389,9 +464,19 @@ class TaskHandler:
                     safe_kwargs[key] = value
 
             self.tasks[task_id] = (comp_time, callback, safe_args, safe_kwargs, persistent, None)
-            self.save()
+            try:
+                self._save_task(task_id)
+            except ValueError:
+                del self.tasks[task_id]
+                raise
         else:  # this is a non-persitent task
             self.tasks[task_id] = (comp_time, callback, args, kwargs, persistent, None)
+        if len(self._due) > 2 * len(self.tasks) + 100:
+            # drop the entries of removed tasks
+            self._due = [(task[0], tid) for tid, task in self.tasks.items()]
+            heapify(self._due)
+        else:
+            heappush(self._due, (comp_time, task_id))
 
         # defer the task
         callback = self.do_task
@@ -497,7 +582,7 @@ class TaskHandler:
         # remove the task from the persistent dictionary and ServerConfig
         if task_id in self.to_save:
             del self.to_save[task_id]
-            self.save()  # remove from ServerConfig.objects
+            ServerConfig.objects.conf(_TASK_SAVE_PREFIX + str(task_id), delete=True)
         # delete the instance of the deferred
         if d:
             del d
@@ -520,10 +605,12 @@ class TaskHandler:
                 if cancel:
                     self.cancel(task_id)
             self.tasks = {}
-        if self.to_save:
-            self.to_save = {}
+        self.to_save = {}
+        self._due = []
+        self._next_id = 1
         if save:
-            self.save()
+            ServerConfig.objects.filter(db_key__startswith=_TASK_SAVE_PREFIX).delete()
+            ServerConfig.objects.conf(_TASK_SAVE_NAME_OLD, delete=True)
         return True
 
     def call_task(self, task_id):
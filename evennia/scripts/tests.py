@@ -13,11 +13,12 @@ from evennia.scripts.models import ObjectDoesNotExist, ScriptDB
 from evennia.scripts.monitorhandler import MonitorHandler
 from evennia.scripts.ondemandhandler import OnDemandHandler, OnDemandTask
 from evennia.scripts.scripts import DoNothing, ExtendedLoopingCall
-from evennia.scripts.tickerhandler import TickerHandler
+from evennia.scripts.tickerhandler import Ticker, TickerHandler
 from evennia.utils.create import create_script
 from evennia.utils.dbserialize import dbserialize
 from evennia.utils.test_resources import BaseEvenniaTest, EvenniaTest
 from parameterized import parameterized
+from twisted.internet import task
 
 
 class TestScript(BaseEvenniaTest):
@@ -46,6 +47,92 @@ class TestTickerHandler(TestCase):
             th.remove(callback=1)
 
 
+class TestTicker(TestCase):
+    """Test the time-sliced Ticker"""
+
+    def setUp(self):
+        self.clock = task.Clock()
+        self.calls = []
+        with mock.patch("evennia.scripts.tickerhandler._TICKER_SLICES", 5):
+            self.ticker = Ticker(10)
+        self.ticker.task.clock = self.clock
+        self.store_keys = [(None, None, f"path.func{num}", 10, "", False) for num in range(20)]
+        for store_key in self.store_keys:
+            self.ticker.add(store_key, store_key, _callback=self.calls.append, _obj=None)
+
+    def tearDown(self):
+        self.ticker.stop()
+
+    def _slice(self, islice):
+        return [key for key in self.store_keys if self.ticker._get_slice(key) == islice]
+
+    def test_time_slices(self):
+        self.clock.advance(10)
+        self.assertEqual(self.calls, self._slice(0))
+        for islice in range(1, 5):
+            self.clock.advance(2)
+            self.assertEqual(
+                self.calls, [key for num in range(islice + 1) for key in self._slice(num)]
+            )
+        self.assertEqual(sorted(self.calls), sorted(self.store_keys))
+        self.assertEqual(self.ticker.metrics["calls"], 20)
+        self.assertEqual(self.ticker.metrics["overruns"], 0)
+
+    def test_single_slice(self):
+        """By default all subscribers are called at the start of the interval"""
+        calls = []
+        ticker = Ticker(10)
+        ticker.task.clock = self.clock
+        for store_key in self.store_keys:
+            ticker.add(store_key, store_key, _callback=calls.append, _obj=None)
+        self.clock.advance(10)
+        self.assertEqual(sorted(calls), sorted(self.store_keys))
+        ticker.stop()
+
+    def test_time_budget(self):
+        self.ticker.time_budget = 0
+        self.ticker._callback()
+        # one call per reactor turn
+        self.assertEqual(len(self.calls), 1)
+        self.clock.advance(0)
+        self.assertEqual(self.calls, self._slice(0))
+
+    def test_lag(self):
+        self.ticker._callback()
+        self.clock.advance(5)
+        self.assertEqual(self.ticker.metrics["lag"], 1)
+        self.assertEqual(self.ticker.metrics["max_lag"], 3)
+
+    def test_remove_during_tick(self):
+        self.ticker._callback()
+        removed = self._slice(3)[0]
+        self.ticker.remove(removed)
+        self.clock.advance(9)
+        self.assertNotIn(removed, self.calls)
+        self.assertEqual(len(self.calls), 19)
+
+    @parameterized.expand(
+        [
+            ("queue", 2, 2, 0, 0),
+            ("merge", 2, 1, 0, 4),
+            ("skip", 1, 1, 1, 0),
+        ]
+    )
+    def test_overload_policy(self, policy, ncalls_first, ncalls_other, nskipped, nmerged):
+        self.ticker.overload_policy = policy
+        self.ticker._callback()
+        # next tick before the first one is done
+        self.ticker._callback()
+        self.clock.advance(9)
+        first = self._slice(0)[0]
+        other = self._slice(4)[0]
+        self.assertEqual(self.calls.count(first), ncalls_first)
+        self.assertEqual(self.calls.count(other), ncalls_other)
+        self.assertEqual(self.ticker.metrics["overruns"], 1)
+        self.assertEqual(self.ticker.metrics["skipped"], nskipped)
+        self.assertEqual(self.ticker.metrics["merged"], nmerged)
+
+
 class TestScriptDBManager(TestCase):
     """Test the ScriptDBManger class"""
 
@@ -637,6 +724,23 @@ class TestOnDemandHandler(EvenniaTest):
         self.assertEqual(self.handler.get_stage("rose", "flower"), "dead")
         self.assertEqual(self.handler.get_stage("daffodil", "flower"), "dead")
 
+    @mock.patch("evennia.scripts.ondemandhandler.OnDemandTask.runtime")
+    def test_get_due(self, mock_runtime):
+        mock_runtime.return_value = 0
+        self.handler.batch_add(self.task1, self.task2, self.task3)
+        for task in (self.task1, self.task2):
+            task.start_time = 0
+
+        mock_runtime.return_value = 40
+        self.assertEqual(self.handler.get_due(5), [])
+        self.assertEqual(self.handler.get_due(10), [(10, self.task2)])
+        self.assertEqual(self.handler.get_due(60), [(10, self.task2), (60, self.task1)])
+        self.assertEqual(self.handler.get_due(60, category=None, all_on_none=False), [])
+
+        mock_runtime.return_value = 1000
+        # past the last stage
+        self.assertEqual(self.handler.get_due(1000), [])
+
     @mock.patch("evennia.scripts.ondemandhandler.OnDemandTask.runtime")
     def test_set_dt(self, mock_runtime):
         START_TIME = 0
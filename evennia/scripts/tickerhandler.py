@@ -67,9 +67,13 @@ call the handler's `save()` and `restore()` methods when the server reboots.
 """
 
 import inspect
+import time
+from collections import Counter, deque
+from zlib import crc32
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from twisted.internet.defer import inlineCallbacks
+from twisted.internet.defer import Deferred
 
 from evennia.scripts.scripts import ExtendedLoopingCall
 from evennia.server.models import ServerConfig
@@ -80,6 +84,10 @@ from evennia.utils.logger import log_err, log_trace
 _GA = object.__getattribute__
 _SA = object.__setattr__
 
+_TICKER_SLICES = settings.TICKER_SLICES
+_TICKER_TIME_BUDGET = settings.TICKER_TIME_BUDGET
+_TICKER_OVERLOAD_POLICY = settings.TICKER_OVERLOAD_POLICY
+
 
 _ERROR_ADD_TICKER = """TickerHandler: Tried to add an invalid ticker:
 {store_key}
@@ -98,60 +106,121 @@ class Ticker(object):
     Represents a repeatedly running task that calls
     hooks repeatedly. Overload `_callback` to change the
     way it operates.
+
+    The subscribers are spread over `slices` time slices of the interval (each
+    subscriber always lands in the same slice) and are called in batches
+    taking at most `time_budget` seconds per reactor turn, so a ticker with
+    many subscribers doesn't stall the server at every tick. If a tick comes
+    before the previous one has called all its subscribers, this is counted as
+    an overrun and handled according to `overload_policy` (see
+    `settings.TICKER_OVERLOAD_POLICY`).
+
     """
 
-    @inlineCallbacks
     def _callback(self):
         """
         This will be called repeatedly every `self.interval` seconds.
         `self.subscriptions` contain tuples of (obj, args, kwargs) for
-        each subscribing object.
+        each subscribing object. This schedules the time slices of the
+        subscribers to be called over the coming interval.
 
         If overloading, this callback is expected to handle all
         subscriptions when it is triggered. It should not return
         anything and should not traceback on poorly designed hooks.
-        The callback should ideally work under @inlineCallbacks so it
-        can yield appropriately.
-
-        The _hook_key, which is passed down through the handler via
-        kwargs is used here to identify which hook method to call.
-
-        """
-        self._to_add = []
-        self._to_remove = []
-        self._is_ticking = True
-        for store_key, (args, kwargs) in self.subscriptions.items():
-            callback = yield kwargs.pop("_callback", "at_tick")
-            obj = yield kwargs.pop("_obj", None)
-            try:
-                if callable(callback):
-                    # call directly
-                    yield callback(*args, **kwargs)
-                    continue
-                # try object method
-                if not obj or not obj.pk:
-                    # object was deleted between calls
-                    self._to_remove.append(store_key)
-                    continue
-                else:
-                    yield _GA(obj, callback)(*args, **kwargs)
-            except ObjectDoesNotExist:
-                log_trace("Removing ticker.")
-                self._to_remove.append(store_key)
-            except Exception:
-                log_trace()
-            finally:
-                # make sure to re-store
-                kwargs["_callback"] = callback
-                kwargs["_obj"] = obj
-        # cleanup - we do this here to avoid changing the subscription dict while it loops
-        self._is_ticking = False
-        for store_key in self._to_remove:
+
+        """
+        metrics = self.metrics
+        metrics["ticks"] += 1
+        if self._pending or self._current is not None:
+            # the previous tick is still calling its subscribers
+            metrics["overruns"] += 1
+            if self.overload_policy == "skip":
+                metrics["skipped"] += 1
+                return
+        now = self.task.clock.seconds()
+        slice_interval = self.interval / self.slices
+        for islice, bucket in enumerate(self._buckets):
+            if not bucket:
+                continue
+            if self.overload_policy == "merge" and self._pending_slices[islice]:
+                # these subscribers are still waiting for the previous tick
+                metrics["merged"] += 1
+                continue
+            self._pending.append((now + islice * slice_interval, islice))
+            self._pending_slices[islice] += 1
+        if not self._process_call:
+            self._process()
+
+    def _process(self):
+        """
+        Call the subscribers of all time slices that are due, until the time
+        budget for this reactor turn is used up.
+
+        """
+        self._process_call = None
+        clock = self.task.clock
+        metrics = self.metrics
+        deadline = time.perf_counter() + self.time_budget
+        while True:
+            if self._current is None:
+                if not self._pending:
+                    return
+                due, islice = self._pending[0]
+                now = clock.seconds()
+                if due > now:
+                    self._process_call = clock.callLater(due - now, self._process)
+                    return
+                self._pending.popleft()
+                self._pending_slices[islice] -= 1
+                lag = now - due
+                metrics["lag"] = lag
+                metrics["max_lag"] = max(metrics["max_lag"], lag)
+                # iterate over a copy, so subscriptions can change meanwhile
+                self._current = iter(list(self._buckets[islice]))
+            for store_key in self._current:
+                self._call(store_key)
+                if time.perf_counter() >= deadline:
+                    # let the server do other things before continuing
+                    self._process_call = clock.callLater(0, self._process)
+                    return
+            self._current = None
+
+    def _call(self, store_key):
+        """
+        Call one subscriber.
+
+        Args:
+            store_key (tuple): The subscription to call.
+
+        """
+        subscription = self.subscriptions.get(store_key)
+        if not subscription:
+            # removed since its time slice started
+            return
+        args, kwargs = subscription
+        # the _hook_key, which is passed down through the handler via
+        # kwargs, is used here to identify which hook method to call.
+        callback = kwargs.get("_callback", "at_tick")
+        obj = kwargs.get("_obj", None)
+        kwargs = {key: val for key, val in kwargs.items() if key not in ("_callback", "_obj")}
+        self.metrics["calls"] += 1
+        try:
+            if callable(callback):
+                # call directly
+                ret = callback(*args, **kwargs)
+            elif not obj or not obj.pk:
+                # object was deleted between calls
+                self.remove(store_key)
+                return
+            else:
+                ret = _GA(obj, callback)(*args, **kwargs)
+            if isinstance(ret, Deferred):
+                ret.addErrback(lambda failure: log_trace(failure.getErrorMessage()))
+        except ObjectDoesNotExist:
+            log_trace("Removing ticker.")
             self.remove(store_key)
-        for store_key, (args, kwargs) in self._to_add:
-            self.add(store_key, *args, **kwargs)
-        self._to_remove = []
-        self._to_add = []
+        except Exception:
+            log_trace()
 
     def __init__(self, interval):
         """
@@ -163,12 +232,36 @@ class Ticker(object):
         """
         self.interval = interval
         self.subscriptions = {}
-        self._is_ticking = False
-        self._to_remove = []
-        self._to_add = []
+        self.slices = max(1, int(_TICKER_SLICES))
+        self.time_budget = _TICKER_TIME_BUDGET
+        self.overload_policy = _TICKER_OVERLOAD_POLICY
+        self.metrics = {
+            "ticks": 0,
+            "calls": 0,
+            "overruns": 0,
+            "skipped": 0,
+            "merged": 0,
+            "lag": 0.0,
+            "max_lag": 0.0,
+        }
+        # the store_keys in each time slice
+        self._buckets = [{} for _ in range(self.slices)]
+        # (due_time, slice) waiting to be called, and how often each slice waits
+        self._pending = deque()
+        self._pending_slices = Counter()
+        # the subscribers left to call in the current slice
+        self._current = None
+        self._process_call = None
         # set up a twisted asynchronous repeat call
         self.task = ExtendedLoopingCall(self._callback)
 
+    def _get_slice(self, store_key):
+        """
+        Get the time slice of a subscriber.
+
+        """
+        return crc32(repr(store_key).encode("utf-8")) % self.slices
+
     def validate(self, start_delay=None):
         """
         Start/stop the task depending on how many subscribers we have
@@ -182,6 +275,11 @@ class Ticker(object):
         if self.task.running:
             if not subs:
                 self.task.stop()
+                if self._process_call and self._process_call.active():
+                    self._process_call.cancel()
+                self._process_call = self._current = None
+                self._pending.clear()
+                self._pending_slices.clear()
         elif subs:
             self.task.start(self.interval, now=False, start_delay=start_delay)
 
@@ -198,14 +296,10 @@ class Ticker(object):
                 `interval`.
 
         """
-        if self._is_ticking:
-            # protects the subscription dict from
-            # updating while it is looping
-            self._to_add.append((store_key, (args, kwargs)))
-        else:
-            start_delay = kwargs.pop("_start_delay", None)
-            self.subscriptions[store_key] = (args, kwargs)
-            self.validate(start_delay=start_delay)
+        start_delay = kwargs.pop("_start_delay", None)
+        self.subscriptions[store_key] = (args, kwargs)
+        self._buckets[self._get_slice(store_key)][store_key] = None
+        self.validate(start_delay=start_delay)
 
     def remove(self, store_key):
         """
@@ -215,13 +309,9 @@ class Ticker(object):
             store_key (str): Unique store key.
 
         """
-        if self._is_ticking:
-            # this protects the subscription dict from
-            # updating while it is looping
-            self._to_remove.append(store_key)
-        else:
-            self.subscriptions.pop(store_key, False)
-            self.validate()
+        self.subscriptions.pop(store_key, False)
+        self._buckets[self._get_slice(store_key)].pop(store_key, None)
+        self.validate()
 
     def stop(self):
         """
@@ -229,6 +319,7 @@ class Ticker(object):
 
         """
         self.subscriptions = {}
+        self._buckets = [{} for _ in range(self.slices)]
         self.validate()
 
 
@@ -620,6 +711,23 @@ class TickerHandler(object):
                 return {interval: ticker.subscriptions}
             return None
 
+    def metrics(self):
+        """
+        Get the load metrics of all ticker intervals.
+
+        Returns:
+            dict: `{interval: metrics, ...}`, where `metrics` is a dict with keys
+                `subscribers`, `ticks`, `calls`, `overruns` (ticks coming before the
+                previous tick was done), `skipped` (ticks dropped due to overruns),
+                `merged` (time slices not re-queued due to overruns), and `lag` and
+                `max_lag` (the last and max seconds a time slice was called late).
+
+        """
+        return dict(
+            (interval, dict(ticker.metrics, subscribers=len(ticker.subscriptions)))
+            for interval, ticker in self.ticker_pool.tickers.items()
+        )
+
     def all_display(self):
         """
         Get all tickers on an easily displayable form.
@@ -7,7 +7,7 @@ Portal. This module sets up the Client-side communication.
 import os
 
 from django.conf import settings
-from twisted.internet import protocol
+from twisted.internet import protocol, reactor
 
 import evennia
 from evennia.server.portal import amp
@@ -102,6 +102,16 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
 
     """
 
+    compression = settings.AMP_COMPRESSION
+    compression_level = settings.AMP_COMPRESSION_LEVEL
+    compression_min_size = settings.AMP_COMPRESSION_MIN_SIZE
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # messages to sessions waiting to be sent to the Portal at the end of the tick
+        self.outbuffer = []
+        self.outbuffer_task = None
+
     # sending AMP data
 
     def connectionMade(self):
@@ -115,11 +125,59 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
         # first thing we do is to request the Portal to sync all sessions
         # back with the Server side. We also need the startup mode (reload, reset, shutdown)
         self.send_AdminServer2Portal(
-            amp.DUMMYSESSION, operation=amp.PSYNC, spid=os.getpid(), info_dict=info_dict
+            amp.DUMMYSESSION,
+            operation=amp.PSYNC,
+            spid=os.getpid(),
+            info_dict=info_dict,
+            capabilities=self.capabilities,
         )
         # run the intial setup if needed
         self.factory.server.run_initial_setup()
 
+    def connectionLost(self, reason):
+        """
+        Called when the connection to the Portal is lost.
+
+        """
+        if self.outbuffer_task and self.outbuffer_task.active():
+            self.outbuffer_task.cancel()
+        self.outbuffer_task = None
+        self.outbuffer = []
+        super().connectionLost(reason)
+
+    def flush_outbuffer(self):
+        """
+        Send all messages waiting in the outbuffer to the Portal. Several messages
+        are sent as one `MsgServer2PortalBatch`. This is called automatically at
+        the end of the reactor tick the messages were queued in, as well as before
+        anything else is sent to the Portal (to keep the order of messages).
+
+        """
+        if self.outbuffer_task and self.outbuffer_task.active():
+            self.outbuffer_task.cancel()
+        self.outbuffer_task = None
+        if not self.outbuffer:
+            return
+        messages, self.outbuffer = self.outbuffer, []
+        if len(messages) == 1:
+            sessid, kwargs = messages[0]
+            return self.data_to_portal(amp.MsgServer2Portal, sessid, **kwargs)
+        return self.callRemote(
+            amp.MsgServer2PortalBatch, packed_data=amp.dumps(messages)
+        ).addErrback(self.errback, amp.MsgServer2PortalBatch.key)
+
+    def _buffer_messages(self, messages):
+        """
+        Queue messages to sessions, to be sent at the end of the current reactor tick.
+
+        Args:
+            messages (list): A list of `(sessid, kwargs)`.
+
+        """
+        self.outbuffer.extend(messages)
+        if not self.outbuffer_task:
+            self.outbuffer_task = reactor.callLater(0, self.flush_outbuffer)
+
     def data_to_portal(self, command, sessid, **kwargs):
         """
         Send data across the wire to the Portal
@@ -138,6 +196,8 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
 
         """
         # print("server data_to_portal: {}, {}, {}".format(command, sessid, kwargs))
+        # make sure earlier messages are sent first
+        self.flush_outbuffer()
         return self.callRemote(command, packed_data=amp.dumps((sessid, kwargs))).addErrback(
             self.errback, command.key
         )
@@ -151,9 +211,43 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
             session (Session): Unique Session.
             kwargs (any, optiona): Extra data.
 
+        Returns:
+            deferred (deferred or None): A deferred with an errback, or `None`
+                if the message was queued to be sent with others.
+
+        Notes:
+            If `settings.AMP_COALESCE_OUTPUT` is set, all messages sent within
+            the same reactor tick are sent to the Portal together.
+
         """
+        if settings.AMP_COALESCE_OUTPUT and "msg_batch" in self.peer_capabilities:
+            self._buffer_messages([(session.sessid, kwargs)])
+            return None
         return self.data_to_portal(amp.MsgServer2Portal, session.sessid, **kwargs)
 
+    def send_MsgServer2PortalBatch(self, messages):
+        """
+        Access method - executed on the Server for sending data to
+            many sessions on the Portal in one go.
+
+        Args:
+            messages (list): A list of tuples `(session, kwargs)`, in the
+                order they should be sent.
+
+        Notes:
+            Data will be sent across the wire pickled as a list of tuples
+            `[(sessid, kwargs), ...]`. If the Portal does not support this,
+            the messages are sent one by one.
+
+        """
+        if "msg_batch" not in self.peer_capabilities:
+            for session, kwargs in messages:
+                self.data_to_portal(amp.MsgServer2Portal, session.sessid, **kwargs)
+            return
+        self._buffer_messages([(session.sessid, kwargs) for session, kwargs in messages])
+        if not settings.AMP_COALESCE_OUTPUT:
+            self.flush_outbuffer()
+
     def send_AdminServer2Portal(self, session, operation="", **kwargs):
         """
         Administrative access method called by the Server to send an
@@ -233,6 +327,8 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
             evennia.EVENNIA_SERVER_SERVICE.run_init_hooks(server_restart_mode)
             evennia.SERVER_SESSION_HANDLER.portal_sessions_sync(kwargs.get("sessiondata"))
             evennia.SERVER_SESSION_HANDLER.portal_start_time = kwargs.get("portal_start_time")
+            # features supported by the Portal
+            self.peer_capabilities = tuple(kwargs.get("capabilities", ()))
 
         elif operation == amp.SRELOAD:  # server reload
             # shut down in reload mode
@@ -10,7 +10,6 @@ import time
 import zlib  # Used in Compressed class
 from collections import defaultdict, namedtuple
 from functools import wraps
-from io import BytesIO
 from itertools import count
 
 from twisted.internet.defer import Deferred, DeferredList
@@ -18,6 +17,11 @@ from twisted.protocols import amp
 
 from evennia.utils.utils import variable_from_module
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # delayed import
 _LOGGER = None
 
@@ -59,6 +63,9 @@ UNKNOWN_ERROR_CODE = b"UNKNOWN"
 _SENDBATCH = defaultdict(list)
 _MSGBUFFER = defaultdict(list)
 
+# marks an uncompressed Compressed-chunk (a zlib stream never starts with \x00)
+_RAW_CHUNK = b"\x00"
+
 # resources
 
 DUMMYSESSION = namedtuple("DummySession", ["sessid"])(0)
@@ -122,6 +129,141 @@ def catch_traceback(func):
     return decorator
 
 
+# Compression of data sent between Portal and Server
+
+
+class AMPCompressor:
+    """
+    Base class for the compression used for data sent between Portal and
+    Server. Each compressor's output must start with a unique prefix, so the
+    receiving side can tell which compressor was used.
+
+    """
+
+    # unique name of the compressor, used in the connection handshake
+    key = ""
+    # all compressed data starts with this
+    prefix = b""
+
+    def __init__(self, level=None):
+        """
+        Args:
+            level (int, optional): Compression level. Meaning depends on the compressor.
+
+        """
+        self.level = level
+
+    @classmethod
+    def is_available(cls):
+        """
+        Check if this compressor can be used (it may depend on an optional package).
+
+        Returns:
+            bool: If the compressor can be used.
+
+        """
+        return True
+
+    def compress(self, data):
+        """
+        Compress data.
+
+        Args:
+            data (bytes or memoryview): Data to compress.
+
+        Returns:
+            bytes: Compressed data.
+
+        """
+        raise NotImplementedError
+
+    def decompress(self, data):
+        """
+        Decompress data.
+
+        Args:
+            data (bytes): Data compressed by this compressor.
+
+        Returns:
+            bytes: The decompressed data.
+
+        """
+        raise NotImplementedError
+
+
+class ZlibCompressor(AMPCompressor):
+    """
+    Compress with zlib. This is always supported by both sides.
+
+    """
+
+    key = "zlib"
+    prefix = b"\x78"  # zlib header for the default window size
+
+    def compress(self, data):
+        return zlib.compress(data, 9 if self.level is None else self.level)
+
+    def decompress(self, data):
+        # zlib can decompress data of any compression level
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(AMPCompressor):
+    """
+    Compress with Zstandard. This requires the `zstandard` package (`pip install
+    zstandard`) on both sides.
+
+    """
+
+    key = "zstd"
+    prefix = b"\x28\xb5\x2f\xfd"  # zstd frame magic number
+
+    def __init__(self, level=None):
+        super().__init__(level)
+        self.compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    @classmethod
+    def is_available(cls):
+        return zstandard is not None
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def decompress(self, data):
+        return self.decompressor.decompress(data)
+
+
+# available compressors, in order of preference for decoding
+COMPRESSORS = {compressor.key: compressor for compressor in (ZlibCompressor, ZstdCompressor)}
+
+
+def get_capabilities(compressors=None):
+    """
+    Get the features this side of the AMP connection supports. These are
+    exchanged when the Server connects so each side knows what it can send
+    to the other.
+
+    Args:
+        compressors (dict, optional): The `{key: AMPCompressor class}` to report.
+            Only those available (installed) are included. Defaults to `COMPRESSORS`.
+
+    Returns:
+        tuple: The capabilities, as strings.
+
+    """
+    compressors = COMPRESSORS if compressors is None else compressors
+    return (
+        "raw_chunks",  # can receive uncompressed Compressed-chunks
+        "msg_batch",  # can receive MsgServer2PortalBatch
+    ) + tuple(
+        f"compression:{key}" for key, compressor in compressors.items() if compressor.is_available()
+    )
+
+
+CAPABILITIES = get_capabilities()
+
+
 # AMP Communication Command types
 
 
@@ -140,16 +282,14 @@ class Compressed(amp.String):
         put it back together here.
 
         """
-
-        value = BytesIO()
-        value.write(self.fromStringProto(strings.get(name), proto))
+        chunks = [self.fromStringProto(strings.get(name), proto)]
         for counter in count(2):
             # count from 2 upwards
             chunk = strings.get(b"%s.%d" % (name, counter))
             if chunk is None:
                 break
-            value.write(self.fromStringProto(chunk, proto))
-        objects[str(name, "utf-8")] = value.getvalue()
+            chunks.append(self.fromStringProto(chunk, proto))
+        objects[str(name, "utf-8")] = chunks[0] if len(chunks) == 1 else b"".join(chunks)
 
     def toBox(self, name, strings, objects, proto):
         """
@@ -157,19 +297,50 @@ class Compressed(amp.String):
         we break up too-long data snippets into multiple batches here.
 
         """
+        value = objects[str(name, "utf-8")]
+        if len(value) <= AMP_MAXLEN:
+            chunk = self.toStringProto(value, proto)
+            if len(chunk) <= AMP_MAXLEN:
+                strings[name] = chunk
+                return
 
-        # print("toBox: name={}, strings={}, objects={}, proto{}".format(name, strings, objects, proto))
+        # slice a memoryview so the chunks are not copied before compression
+        view = memoryview(value)
+        parts = [view[start : start + AMP_MAXLEN] for start in range(0, len(value), AMP_MAXLEN)]
+        chunks = []
+        while parts:
+            part = parts.pop(0)
+            chunk = self.toStringProto(part, proto)
+            if len(chunk) > AMP_MAXLEN and len(part) > 1:
+                # incompressible data grows when compressed; split it further
+                half = len(part) // 2
+                parts[:0] = [part[:half], part[half:]]
+                continue
+            chunks.append(chunk)
+        strings[name] = chunks[0]
+        for counter, chunk in enumerate(chunks[1:], start=2):
+            strings[b"%s.%d" % (name, counter)] = chunk
 
-        value = BytesIO(objects[str(name, "utf-8")])
-        strings[name] = self.toStringProto(value.read(AMP_MAXLEN), proto)
+    def toStringProto(self, inObject, proto):
+        """
+        Convert to send as a bytestring on the wire, compressed using the
+        compression settings of the protocol.
 
-        # print("toBox strings[name] = {}".format(strings[name]))
+        """
+        compress_chunk = getattr(proto, "compress_chunk", None)
+        if compress_chunk:
+            return compress_chunk(inObject)
+        return self.toString(bytes(inObject))
 
-        for counter in count(2):
-            chunk = value.read(AMP_MAXLEN)
-            if not chunk:
-                break
-            strings[b"%s.%d" % (name, counter)] = self.toStringProto(chunk, proto)
+    def fromStringProto(self, inString, proto):
+        """
+        Convert from the string-representation on the wire to Python.
+
+        """
+        decompress_chunk = getattr(proto, "decompress_chunk", None)
+        if decompress_chunk:
+            return decompress_chunk(inString)
+        return self.fromString(inString)
 
     def toString(self, inObject):
         """
@@ -185,6 +356,9 @@ class Compressed(amp.String):
         Convert (decompress) from the string-representation on the wire to Python.
 
         """
+        if inString[:1] == _RAW_CHUNK:
+            return super().fromString(inString[1:])
+        # zlib can decompress data of any compression level
         return super().fromString(zlib.decompress(inString))
 
 
@@ -224,6 +398,18 @@ class MsgServer2Portal(amp.Command):
     response = []
 
 
+class MsgServer2PortalBatch(amp.Command):
+    """
+    Message Server -> Portal, with messages to several sessions
+
+    """
+
+    key = "MsgServer2PortalBatch"
+    arguments = [(b"packed_data", Compressed())]
+    errors = {Exception: b"EXCEPTION"}
+    response = []
+
+
 class AdminPortal2Server(amp.Command):
     """
     Administration Portal -> Server
@@ -300,6 +486,13 @@ class AMPMultiConnectionProtocol(amp.AMP):
 
     """
 
+    # compression of outgoing data; the key of the compressor to use (or a
+    # python-path to an AMPCompressor class), its compression level and the size
+    # (in bytes) below which data is sent uncompressed (if the other side supports it)
+    compression = "zlib"
+    compression_level = 9
+    compression_min_size = 0
+
     # helper methods
 
     def __init__(self, *args, **kwargs):
@@ -313,9 +506,79 @@ class AMPMultiConnectionProtocol(amp.AMP):
         self.send_mode = True
         self.send_task = None
         self.multibatches = 0
+        # set by the handshake when the Server connects
+        self.peer_capabilities = ()
+        self._setup_compression()
         # later twisted amp has its own __init__
         super().__init__(*args, **kwargs)
 
+    def _setup_compression(self):
+        """
+        Set up the compressors used for outgoing and incoming data.
+
+        """
+        compressors = dict(COMPRESSORS)
+        compressor_class = compressors.get(self.compression)
+        if not compressor_class:
+            # a custom compressor
+            compressor_class = variable_from_module(*self.compression.rsplit(".", 1))
+            compressors[compressor_class.key] = compressor_class
+        if not compressor_class.is_available():
+            _get_logger().log_warn(
+                f"AMP compression '{compressor_class.key}' is not available. Using zlib."
+            )
+            compressor_class = ZlibCompressor
+        self.capabilities = get_capabilities(compressors)
+        self.compressor = compressor_class(self.compression_level)
+        self.fallback_compressor = ZlibCompressor(self.compression_level)
+        self.decompressors = [
+            compressor(self.compression_level)
+            for compressor in compressors.values()
+            if compressor.is_available()
+        ]
+
+    def compress_chunk(self, data):
+        """
+        Compress a chunk of data to send to the other side.
+
+        Args:
+            data (bytes or memoryview): The data to compress.
+
+        Returns:
+            bytes: The data to put on the wire.
+
+        """
+        raw_ok = "raw_chunks" in self.peer_capabilities
+        if raw_ok and len(data) < self.compression_min_size:
+            return _RAW_CHUNK + data
+        if f"compression:{self.compressor.key}" in self.peer_capabilities:
+            compressed = self.compressor.compress(data)
+        else:
+            # before the handshake, or if the other side doesn't support our compressor
+            compressed = self.fallback_compressor.compress(data)
+        if raw_ok and len(compressed) > len(data) and len(data) < AMP_MAXLEN:
+            # incompressible data
+            return _RAW_CHUNK + data
+        return compressed
+
+    def decompress_chunk(self, data):
+        """
+        Decompress a chunk of data received from the other side.
+
+        Args:
+            data (bytes): The data from the wire.
+
+        Returns:
+            bytes: The decompressed data.
+
+        """
+        if data[:1] == _RAW_CHUNK:
+            return data[1:]
+        for decompressor in self.decompressors:
+            if data.startswith(decompressor.prefix):
+                return decompressor.decompress(data)
+        return zlib.decompress(data)
+
     def _commandReceived(self, box):
         """
         This overrides the default Twisted AMP error handling which is not
@@ -92,6 +92,10 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
 
     """
 
+    compression = settings.AMP_COMPRESSION
+    compression_level = settings.AMP_COMPRESSION_LEVEL
+    compression_min_size = settings.AMP_COMPRESSION_MIN_SIZE
+
     def connectionLost(self, reason):
         """
         Set up a simple callback mechanism to let the amp-server wait for a connection to close.
@@ -393,6 +397,31 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
             logger.log_trace("packed_data len {}".format(len(packed_data)))
         return {}
 
+    @amp.MsgServer2PortalBatch.responder
+    @amp.catch_traceback
+    def portal_receive_server2portal_batch(self, packed_data):
+        """
+        Receives messages to many sessions arriving to Portal from Server.
+        This method is executed on the Portal.
+
+        Args:
+            packed_data (str): Pickled data `[(sessid, kwargs), ...]` coming over the wire.
+
+        """
+        try:
+            messages = self.data_in(packed_data)
+        except Exception:
+            logger.log_trace("packed_data len {}".format(len(packed_data)))
+            return {}
+        for sessid, kwargs in messages:
+            try:
+                session = evennia.PORTAL_SESSION_HANDLER.get(sessid, None)
+                if session:
+                    evennia.PORTAL_SESSION_HANDLER.data_out(session, **kwargs)
+            except Exception:
+                logger.log_trace()
+        return {}
+
     @amp.AdminServer2Portal.responder
     @amp.catch_traceback
     def portal_receive_adminserver2portal(self, packed_data):
@@ -459,6 +488,8 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
             # Server has (re-)connected and wants the session data from portal
             self.factory.portal.server_info_dict = kwargs.get("info_dict", {})
             self.factory.portal.server_process_id = kwargs.get("spid", None)
+            # features supported by the Server
+            self.peer_capabilities = tuple(kwargs.get("capabilities", ()))
             # this defaults to 'shutdown' or whatever value set in server_stop
             server_restart_mode = self.factory.portal.server_restart_mode
             # print("Server has connected. Sending session data to Server ... mode: {}".format(server_restart_mode))
@@ -470,6 +501,7 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
                 server_restart_mode=server_restart_mode,
                 sessiondata=sessdata,
                 portal_start_time=self.factory.portal.start_time,
+                capabilities=self.capabilities,
             )
             evennia.PORTAL_SESSION_HANDLER.at_server_connection()
             self.factory.portal.server_restart_mode = None
@@ -0,0 +1,120 @@
+"""
+Render cache
+
+When the same text is sent to many sessions (like a room `say`, a channel
+message or an announcement), each Portal protocol would convert it
+separately, even though all sessions with the same client settings (colors,
+MXP, screenreader etc) get the same result. The protocols instead render
+through `cached_render`, which remembers the result of each rendering
+function for the given arguments until the end of the current reactor tick.
+Since all messages from the Server arriving in one batch are sent out in the
+same tick, each distinct text and client setting is only rendered once.
+
+Rendering functions used with the cache must be module-level functions
+depending only on their (hashable) arguments. This is activated with
+`settings.PORTAL_RENDER_CACHE`.
+
+"""
+
+from django.conf import settings
+from twisted.internet import reactor
+
+_RENDER_CACHE = None
+
+
+class RenderCache:
+    """
+    Cache of rendered output, cleared at the end of each reactor tick.
+
+    """
+
+    def __init__(self, maxsize=1000):
+        """
+        Args:
+            maxsize (int, optional): The max number of results to keep within one tick.
+                Beyond that, results are rendered but not cached.
+
+        """
+        self.maxsize = maxsize
+        self.reactor = reactor
+        self._cache = {}
+        self._clear_call = None
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        Empty the cache.
+
+        """
+        self._cache = {}
+        self._clear_call = None
+
+    def render(self, func, *args):
+        """
+        Render, reusing the result of an earlier call with the same arguments
+        in this tick.
+
+        Args:
+            func (callable): The rendering function.
+            *args: The arguments to `func`. Must be hashable.
+
+        Returns:
+            any: The return of `func(*args)`.
+
+        """
+        key = (func, args)
+        try:
+            result = self._cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable argument
+            return func(*args)
+        else:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = func(*args)
+        if len(self._cache) < self.maxsize:
+            self._cache[key] = result
+            if self._clear_call is None:
+                self._clear_call = self.reactor.callLater(0, self.clear)
+        return result
+
+
+def get_render_cache():
+    """
+    Get the render cache, if it is active.
+
+    Returns:
+        RenderCache or None: The cache, or `None` if `settings.PORTAL_RENDER_CACHE`
+            is not set.
+
+    """
+    global _RENDER_CACHE
+    if not settings.PORTAL_RENDER_CACHE:
+        return None
+    if _RENDER_CACHE is None:
+        _RENDER_CACHE = RenderCache()
+    return _RENDER_CACHE
+
+
+def cached_render(func, *args):
+    """
+    Call a rendering function, reusing the result for the same arguments within
+    the current reactor tick if `settings.PORTAL_RENDER_CACHE` is set.
+
+    Args:
+        func (callable): The rendering function. It must only depend on its arguments.
+        *args: The arguments to `func`. Must be hashable to be cached.
+
+    Returns:
+        any: The return of `func(*args)`.
+
+    """
+    cache = get_render_cache()
+    if cache is None:
+        return func(*args)
+    return cache.render(func, *args)
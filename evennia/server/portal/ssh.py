@@ -44,6 +44,7 @@ from twisted.internet import defer, protocol
 from twisted.python import components
 
 from evennia.accounts.models import AccountDB
+from evennia.server.portal.rendercache import cached_render
 from evennia.utils import ansi
 from evennia.utils.utils import class_from_module, to_str
 
@@ -74,6 +75,32 @@ and put them here:
 _BASE_SESSION_CLASS = class_from_module(settings.BASE_SESSION_CLASS)
 
 
+def _render_text(text, raw, nocolor, xterm256, screenreader):
+    """
+    Convert text to send to an SSH client, for the client's settings (see
+    `SshProtocol.send_text`).
+
+    Returns:
+        str: The rendered text.
+
+    """
+    if screenreader:
+        # screenreader mode cleans up output
+        text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        # no processing
+        return text
+    # we need to make sure to kill the color at the end in order
+    # to match the webclient output.
+    return ansi.parse_ansi(
+        _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
+        strip_ansi=nocolor,
+        xterm256=xterm256,
+        mxp=False,
+    )
+
+
 # not used atm
 class SSHServerFactory(protocol.ServerFactory):
     """
@@ -314,25 +341,8 @@ class SshProtocol(Manhole, _BASE_SESSION_CLASS):
         # echo = options.get("echo", None)  # DEBUG
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
-
-        if raw:
-            # no processing
-            self.sendLine(text)
-            return
-        else:
-            # we need to make sure to kill the color at the end in order
-            # to match the webclient output.
-            linetosend = ansi.parse_ansi(
-                _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
-                strip_ansi=nocolor,
-                xterm256=xterm256,
-                mxp=False,
-            )
-            self.sendLine(linetosend)
+        # the same text is often sent to many sessions - render it once per client setup
+        self.sendLine(cached_render(_render_text, text, raw, nocolor, xterm256, screenreader))
 
     def send_prompt(self, *args, **kwargs):
         self.send_text(*args, **kwargs)
@@ -32,6 +32,7 @@ from evennia.server.portal import mssp, naws, suppress_ga, telnet_oob, ttype
 from evennia.server.portal.mccp import MCCP, Mccp, mccp_compress
 from evennia.server.portal.mxp import Mxp, mxp_parse
 from evennia.server.portal.naws import NAWS
+from evennia.server.portal.rendercache import cached_render
 from evennia.utils import ansi
 from evennia.utils.utils import class_from_module, to_bytes
 
@@ -62,6 +63,37 @@ _HTTP_WARNING = bytes(
 _BASE_SESSION_CLASS = class_from_module(settings.BASE_SESSION_CLASS)
 
 
+def _render_text(text, prompt, raw, nocolor, xterm256, truecolor, mxp, screenreader):
+    """
+    Convert text to send to a telnet client, for the client's settings (see
+    `TelnetProtocol.send_text`).
+
+    Returns:
+        str: The rendered text.
+
+    """
+    if screenreader:
+        # screenreader mode cleans up output
+        text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        # no processing
+        return text
+    # we need to make sure to kill the color at the end in order
+    # to match the webclient output.
+    text = ansi.parse_ansi(
+        _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
+        strip_ansi=nocolor,
+        xterm256=xterm256,
+        # mxp links are not parsed in prompts
+        mxp=mxp and not prompt,
+        truecolor=truecolor,
+    )
+    if mxp:
+        text = mxp_parse(text)
+    return text
+
+
 class TelnetServerFactory(protocol.ServerFactory):
     """
     This exists only to name this better in logs.
@@ -461,26 +493,16 @@ class TelnetProtocol(Telnet, StatefulTelnetProtocol, _BASE_SESSION_CLASS):
         echo = options.get("echo", None)
         mxp = options.get("mxp", flags.get("MXP", False))
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
+        send_prompt = bool(options.get("send_prompt"))
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = ansi.parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
+        # the same text is often sent to many sessions - render it once per client setup
+        text = cached_render(
+            _render_text, text, send_prompt, raw, nocolor, xterm256, truecolor, mxp, screenreader
+        )
 
-        if options.get("send_prompt"):
+        if send_prompt:
             # send a prompt instead.
-            prompt = text
-            if not raw:
-                # processing
-                prompt = ansi.parse_ansi(
-                    _RE_N.sub("", prompt) + ("||n" if prompt.endswith("|") else "|n"),
-                    strip_ansi=nocolor,
-                    xterm256=xterm256,
-                    truecolor=truecolor,
-                )
-                if mxp:
-                    prompt = mxp_parse(prompt)
-            prompt = to_bytes(prompt, self)
+            prompt = to_bytes(text, self)
             prompt = prompt.replace(IAC, IAC + IAC).replace(b"\n", b"\r\n")
             if not self.protocol_flags.get(
                 "NOPROMPTGOAHEAD", self.protocol_flags.get("NOGOAHEAD", True)
@@ -501,23 +523,7 @@ class TelnetProtocol(Telnet, StatefulTelnetProtocol, _BASE_SESSION_CLASS):
                     # by telling the client that WE WILL echo, the client can
                     # safely turn OFF its OWN echo.
                     self.transport.write(mccp_compress(self, IAC + WILL + ECHO))
-            if raw:
-                # no processing
-                self.sendLine(text)
-                return
-            else:
-                # we need to make sure to kill the color at the end in order
-                # to match the webclient output.
-                linetosend = ansi.parse_ansi(
-                    _RE_N.sub("", text) + ("||n" if text.endswith("|") else "|n"),
-                    strip_ansi=nocolor,
-                    xterm256=xterm256,
-                    mxp=mxp,
-                    truecolor=truecolor,
-                )
-                if mxp:
-                    linetosend = mxp_parse(linetosend)
-                self.sendLine(linetosend)
+            self.sendLine(text)
 
     def send_prompt(self, *args, **kwargs):
         """
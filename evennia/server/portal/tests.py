@@ -17,6 +17,7 @@ import mock
 from autobahn.twisted.websocket import WebSocketServerFactory
 from mock import MagicMock, Mock
 from twisted.conch.telnet import DO, DONT, IAC, NAWS, SB, SE, WILL
+from twisted.internet import task
 from twisted.internet.base import DelayedCall
 from twisted.test import proto_helpers
 from twisted.trial.unittest import TestCase as TwistedTestCase
@@ -38,6 +39,7 @@ from .mccp import MCCP
 from .mssp import MSSP
 from .mxp import MXP
 from .naws import DEFAULT_HEIGHT, DEFAULT_WIDTH
+from .rendercache import RenderCache
 from .suppress_ga import SUPPRESS_GA
 from .telnet import TelnetProtocol, TelnetServerFactory
 from .telnet_oob import MSDP, MSDP_VAL, MSDP_VAR
@@ -55,6 +57,9 @@ class TestAMPServer(TwistedTestCase):
         portal = Mock()
         factory = AMPServerFactory(portal)
         self.proto = factory.buildProtocol(("localhost", 0))
+        # the wire data below is compressed with the max compression level
+        self.proto.compression_level = 9
+        self.proto._setup_compression()
         self.transport = MagicMock()  # proto_helpers.StringTransport()
         self.transport.client = ["localhost"]
         self.transport.write = MagicMock()
@@ -334,3 +339,42 @@ class TestWebSocket(BaseEvenniaTest):
         msg = json.dumps(["logged_in", (), {}])
         self.proto.sessionhandler.data_out(self.proto, text=[["Excepting Alice"], {}])
         self.proto.sendLine.assert_called_with(json.dumps(["text", ["Excepting Alice"], {}]))
+
+    @mock.patch("evennia.server.portal.portalsessionhandler.reactor", new=MagicMock())
+    def test_data_out_extra_args(self):
+        self.proto.onOpen()
+        self.proto.sendLine = MagicMock()
+        self.proto.sessionhandler.data_out(
+            self.proto, text=[["|rRed|n <b>", 2], {"type": "say", "options": {"raw": True}}]
+        )
+        self.proto.sendLine.assert_called_with(
+            json.dumps(["text", ["|rRed|n &lt;b&gt;", 2], {"type": "say"}])
+        )
+
+
+class TestRenderCache(TestCase):
+    def setUp(self):
+        self.cache = RenderCache(maxsize=2)
+        self.cache.reactor = task.Clock()
+        self.render = Mock(side_effect=lambda text, flag: text.upper() if flag else text)
+
+    def test_render(self):
+        self.assertEqual(self.cache.render(self.render, "hello", True), "HELLO")
+        self.assertEqual(self.cache.render(self.render, "hello", True), "HELLO")
+        self.assertEqual(self.cache.render(self.render, "hello", False), "hello")
+        self.assertEqual(self.render.call_count, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+        # cleared at the end of the tick
+        self.cache.reactor.advance(0)
+        self.cache.render(self.render, "hello", True)
+        self.assertEqual(self.render.call_count, 3)
+
+    def test_uncached(self):
+        # unhashable arguments are not cached
+        self.assertEqual(self.cache.render(self.render, ["hello"], False), ["hello"])
+        self.cache.render(self.render, ["hello"], False)
+        self.assertEqual(self.render.call_count, 2)
+        # nor are results beyond maxsize
+        for text in ("a", "b", "c", "c"):
+            self.cache.render(self.render, text, False)
+        self.assertEqual(self.render.call_count, 6)
@@ -23,6 +23,7 @@ from autobahn.exception import Disconnected
 from autobahn.twisted.websocket import WebSocketServerProtocol
 from django.conf import settings
 
+from evennia.server.portal.rendercache import cached_render
 from evennia.utils.ansi import parse_ansi
 from evennia.utils.text2html import parse_html
 from evennia.utils.utils import class_from_module, mod_import
@@ -44,6 +45,27 @@ GOING_AWAY = WebSocketServerProtocol.CLOSE_STATUS_CODE_GOING_AWAY
 _BASE_SESSION_CLASS = class_from_module(settings.BASE_SESSION_CLASS)
 
 
+def _render_text(text, raw, client_raw, nocolor, screenreader):
+    """
+    Convert text to send to the webclient, for the client's settings (see
+    `WebSocketClient.send_text`).
+
+    Returns:
+        str: The rendered text, json-encoded.
+
+    """
+    if screenreader:
+        # screenreader mode cleans up output
+        text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        if not client_raw:
+            text = html.escape(text)  # escape html!
+    else:
+        text = parse_html(text, strip_ansi=nocolor)
+    return json.dumps(text)
+
+
 class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
     """
     Implements the server-side of the Websocket connection.
@@ -287,21 +309,20 @@ class WebSocketClient(WebSocketServerProtocol, _BASE_SESSION_CLASS):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
-        if raw:
-            if client_raw:
-                args[0] = text
-            else:
-                args[0] = html.escape(text)  # escape html!
-        else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+        # the same text is often sent to many sessions - render (and json-encode) it
+        # once per client setup
+        text = cached_render(_render_text, text, raw, client_raw, nocolor, screenreader)
 
         # send to client on required form [cmdname, args, kwargs]
-        self.sendLine(json.dumps([cmd, args, kwargs]))
+        self.sendLine(
+            "[%s, [%s], %s]"
+            % (
+                json.dumps(cmd),
+                ", ".join([text] + [json.dumps(arg) for arg in args[1:]]),
+                json.dumps(kwargs),
+            )
+        )
 
     def send_prompt(self, *args, **kwargs):
         kwargs["options"].update({"send_prompt": True})
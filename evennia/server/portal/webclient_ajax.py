@@ -29,6 +29,7 @@ from twisted.internet.task import LoopingCall
 from twisted.web import resource, server
 
 from evennia.server import session
+from evennia.server.portal.rendercache import cached_render
 from evennia.utils import utils
 from evennia.utils.ansi import parse_ansi
 from evennia.utils.text2html import parse_html
@@ -42,6 +43,24 @@ _SERVERNAME = settings.SERVERNAME
 _KEEPALIVE = 30  # how often to check keepalive
 
 
+def _render_text(text, raw, nocolor, screenreader):
+    """
+    Convert text to html to send to the webclient, for the client's settings (see
+    `AjaxWebClientSession.send_text`).
+
+    Returns:
+        str: The rendered text.
+
+    """
+    if screenreader:
+        # screenreader mode cleans up output
+        text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
+        text = _RE_SCREENREADER_REGEX.sub("", text)
+    if raw:
+        return text
+    return parse_html(text, strip_ansi=nocolor)
+
+
 # defining a simple json encoder for returning
 # django data to the client. Might need to
 # extend this if one wants to send more
@@ -163,15 +182,9 @@ class AjaxWebClientSession(session.Session):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
-        if screenreader:
-            # screenreader mode cleans up output
-            text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
-            text = _RE_SCREENREADER_REGEX.sub("", text)
         cmd = "prompt" if prompt else "text"
-        if raw:
-            args[0] = text
-        else:
-            args[0] = parse_html(text, strip_ansi=nocolor)
+        # the same text is often sent to many sessions - render it once per client setup
+        args[0] = cached_render(_render_text, text, raw, nocolor, screenreader)
 
         # send to client on required form [cmdname, args, kwargs]
         self.client.lineSend(self.csessid, [cmd, args, kwargs])
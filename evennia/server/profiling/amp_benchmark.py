@@ -0,0 +1,216 @@
+"""
+Benchmark the AMP connection between Server and Portal.
+
+This replays mixes of typical outgoing messages through the actual AMP
+protocols (Server-side `AMPServerClientProtocol` to Portal-side
+`AMPServerProtocol`) over an in-memory transport, and reports how many
+messages per second get through and how many bytes were sent over the wire,
+for different compression policies (`settings.AMP_COMPRESSION`,
+`AMP_COMPRESSION_LEVEL` and `AMP_COMPRESSION_MIN_SIZE`). Nothing is sent to
+any real sessions.
+
+Run from your game dir with
+
+    evennia shell
+    >>> from evennia.server.profiling.amp_benchmark import run_benchmark
+    >>> run_benchmark()
+
+To test with your own messages, pass a mix of the form `{name: ticks}`, where
+`ticks` is a list of the messages sent during one reactor tick, each a list of
+`(sessid, kwargs)` as would be passed to `SESSION_HANDLER.data_out`.
+
+"""
+
+import time
+from types import SimpleNamespace
+
+from twisted.internet.testing import StringTransport
+
+import evennia
+from evennia.server.amp_client import AMPServerClientProtocol
+from evennia.server.portal import amp
+from evennia.server.portal.amp_server import AMPServerProtocol
+
+# name: (compression, level, min_size)
+POLICIES = {
+    "zlib-9": ("zlib", 9, 0),
+    "zlib-1": ("zlib", 1, 0),
+    "zlib-1/512": ("zlib", 1, 512),
+    "uncompressed": ("zlib", 1, amp.AMP_MAXLEN + 1),
+}
+if amp.zstandard:
+    POLICIES["zstd-1/512"] = ("zstd", 1, 512)
+    POLICIES["zstd-3/512"] = ("zstd", 3, 512)
+
+_ROOM_DESC = (
+    "|cThe Old Harbour|n\n"
+    "Rotting piers stretch out into the |bgrey water|n. Gulls scream overhead and the "
+    "smell of tar and fish hangs in the air. A |ynarrow alley|n leads back into town.\n"
+    "|wExits:|n north, east and |gpier|n\n"
+    "|wYou see:|n a coil of rope, an old crate and |mGriatch|n.\n"
+)
+_HELP_TEXT = "\n".join(
+    f"  |w{num:>3}|n  This is line {num} of a long help entry, describing something in detail."
+    for num in range(300)
+)
+
+
+def get_sample_mixes(nsessions=50):
+    """
+    Get sample mixes of outgoing messages.
+
+    Args:
+        nsessions (int, optional): How many sessions to send to in broadcasts.
+
+    Returns:
+        dict: `{name: ticks}`, where ticks is a list of `[(sessid, kwargs), ...]`,
+            the messages sent in each reactor tick.
+
+    """
+    return {
+        "say": [
+            [(1, {"text": (f'Griatch says, "Hello number {num}!"',), "options": {}})]
+            for num in range(200)
+        ],
+        "room": [[(1, {"text": (_ROOM_DESC,), "options": {}})] for _ in range(50)],
+        "help": [[(1, {"text": (_HELP_TEXT,), "options": {}})] for _ in range(10)],
+        "oob": [
+            [
+                (
+                    1,
+                    {
+                        "vitals": ((), {"hp": 32 - num % 10, "hp_max": 40, "mana": 10}),
+                        "prompt": ((f"HP: {32 - num % 10}/40 > ",), {}),
+                    },
+                )
+            ]
+            for num in range(200)
+        ],
+        "channel": [
+            [
+                (sessid, {"text": (f"[Public] Griatch: Message number {num}",), "options": {}})
+                for sessid in range(1, nsessions + 1)
+            ]
+            for num in range(20)
+        ],
+    }
+
+
+class _BenchmarkPortalSessionHandler(dict):
+    """
+    Stand-in for the Portal's sessionhandler, receiving the messages.
+
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.nmessages = 0
+
+    def get(self, sessid, default=None):
+        return sessid
+
+    def data_out(self, session, **kwargs):
+        self.nmessages += 1
+
+
+def _connect(policy):
+    """
+    Get a Server- and Portal-side AMP protocol pair using the given policy,
+    connected to in-memory transports.
+
+    """
+    compression, level, min_size = policy
+    attrs = {
+        "compression": compression,
+        "compression_level": level,
+        "compression_min_size": min_size,
+    }
+    client = type("Client", (AMPServerClientProtocol,), attrs)()
+    server = type("Server", (AMPServerProtocol,), attrs)()
+    # skip the handshake
+    client.peer_capabilities = server.capabilities
+    server.peer_capabilities = client.capabilities
+    for proto in (client, server):
+        proto.transport = StringTransport()
+        proto.startReceivingBoxes(proto)
+    return client, server
+
+
+def _replay(client, server, ticks):
+    """
+    Send the messages from Server to Portal, passing everything sent on to
+    the other side.
+
+    Returns:
+        int: The number of bytes sent from Server to Portal.
+
+    """
+    nbytes = 0
+    for messages in ticks:
+        if len(messages) == 1:
+            sessid, kwargs = messages[0]
+            client.send_MsgServer2Portal(SimpleNamespace(sessid=sessid), **kwargs)
+        else:
+            client.send_MsgServer2PortalBatch(
+                [(SimpleNamespace(sessid=sessid), kwargs) for sessid, kwargs in messages]
+            )
+        client.flush_outbuffer()
+        wire_data = client.transport.value()
+        client.transport.clear()
+        nbytes += len(wire_data)
+        server.dataReceived(wire_data)
+        # return the answers, so the Server-side doesn't pile up waiting requests
+        answers = server.transport.value()
+        server.transport.clear()
+        client.dataReceived(answers)
+    return nbytes
+
+
+def run_benchmark(number=5, mixes=None, policies=None, verbose=True):
+    """
+    Run the benchmark.
+
+    Args:
+        number (int, optional): How many times to replay each mix.
+        mixes (dict, optional): `{name: ticks}` of messages to send. See
+            `get_sample_mixes` for the format. Defaults to the sample mixes.
+        policies (dict, optional): `{name: (compression, level, min_size)}` to compare.
+            Defaults to `POLICIES`.
+        verbose (bool, optional): Print the result as a table.
+
+    Returns:
+        dict: `{(mix_name, policy_name): (msgs/s, bytes per replay), ...}`.
+
+    """
+    mixes = mixes or get_sample_mixes()
+    policies = policies or POLICIES
+
+    portal_sessionhandler = evennia.PORTAL_SESSION_HANDLER
+    evennia.PORTAL_SESSION_HANDLER = _BenchmarkPortalSessionHandler()
+    results = {}
+    try:
+        for mix_name, ticks in mixes.items():
+            for policy_name, policy in policies.items():
+                client, server = _connect(policy)
+                evennia.PORTAL_SESSION_HANDLER.nmessages = 0
+                nbytes = 0
+                t0 = time.perf_counter()
+                for _ in range(number):
+                    nbytes = _replay(client, server, ticks)
+                duration = time.perf_counter() - t0
+                results[(mix_name, policy_name)] = (
+                    evennia.PORTAL_SESSION_HANDLER.nmessages / duration,
+                    nbytes,
+                )
+    finally:
+        evennia.PORTAL_SESSION_HANDLER = portal_sessionhandler
+
+    if verbose:
+        print(f"{'mix':<10}{'policy':<14}{'msgs/s':>12}{'bytes':>12}")
+        for (mix_name, policy_name), (nmsgs, nbytes) in results.items():
+            print(f"{mix_name:<10}{policy_name:<14}{nmsgs:>12.0f}{nbytes:>12}")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
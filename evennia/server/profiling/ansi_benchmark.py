@@ -0,0 +1,136 @@
+"""
+Benchmark ANSI parsing (`ANSIParser.parse_ansi`).
+
+This compares the single-pass tokenizer used by `parse_ansi` against the older
+way of running one regex substitution per type of markup, for typical
+texts sent to players. Every text is made unique so the parse cache is never
+hit, which is the case for dynamic text like prompts and combat messages.
+
+Run from your game dir with
+
+    evennia shell
+    >>> from evennia.server.profiling.ansi_benchmark import run_benchmark
+    >>> run_benchmark()
+
+"""
+
+import re
+import time
+
+from evennia.utils import ansi
+from evennia.utils.ansi import ANSI_PARSER, hex2truecolor, hex_sub
+
+_TEXTS = {
+    "room": (
+        "|cThe Old Harbour|n\n"
+        "Rotting piers stretch out into the |bgrey water|n. Gulls scream overhead and the "
+        "smell of tar and fish hangs in the air. A |ynarrow alley|n leads back into town, "
+        "past a |[x|Wshuttered warehouse|n and a |530lantern|n swinging in the wind.\n"
+        "|wExits:|n |lcnorth|ltnorth|le, |lceast|lteast|le and |lcpier|ltpier|le\n"
+        "|wYou see:|n a coil of rope, an old crate and |mGriatch|n.\n"
+    ),
+    "combat": "|rGriatch hits you for |w12|r damage!|n |=kYou feel dizzy.|n",
+    "prompt": "|gHP:|n |50032|n/|05040|n |[=c|#5f87ffMP: 10/10|n > ",
+    "plain": 'You say, "Hello there, how are you doing today? Fine weather, isn\'t it?"',
+}
+
+# the bright background regex as it was before the tokenizer
+_OLD_BRIGHTBG_SUB = re.compile(
+    r"|".join(
+        [r"(?<!\|)%s" % re.escape(tup[0]) for tup in ANSI_PARSER.ansi_xterm256_bright_bg_map]
+    ),
+    re.DOTALL,
+)
+
+
+def _parse_chained(parser, string, strip_ansi=False, xterm256=False, mxp=False, truecolor=False):
+    """
+    ANSI parsing as done before the tokenizer, with one regex pass per type of
+    markup (without the parse cache).
+
+    """
+    string = _OLD_BRIGHTBG_SUB.sub(parser.sub_brightbg, string)
+
+    def do_truecolor(part):
+        return hex2truecolor.sub_truecolor(part, truecolor)
+
+    def do_xterm256_fg(part):
+        return parser.sub_xterm256(part, xterm256, "fg")
+
+    def do_xterm256_bg(part):
+        return parser.sub_xterm256(part, xterm256, "bg")
+
+    def do_xterm256_gfg(part):
+        return parser.sub_xterm256(part, xterm256, "gfg")
+
+    def do_xterm256_gbg(part):
+        return parser.sub_xterm256(part, xterm256, "gbg")
+
+    parsed_string = []
+    parts = parser.ansi_escapes.split(string) + [" "]
+    for part, sep in zip(parts[::2], parts[1::2]):
+        pstring = hex_sub.sub(do_truecolor, part)
+        pstring = parser.xterm256_fg_sub.sub(do_xterm256_fg, pstring)
+        pstring = parser.xterm256_bg_sub.sub(do_xterm256_bg, pstring)
+        pstring = parser.xterm256_gfg_sub.sub(do_xterm256_gfg, pstring)
+        pstring = parser.xterm256_gbg_sub.sub(do_xterm256_gbg, pstring)
+        pstring = parser.ansi_sub.sub(parser.sub_ansi, pstring)
+        parsed_string.append("%s%s" % (pstring, sep[0].strip()))
+    parsed_string = "".join(parsed_string)
+    if not mxp:
+        parsed_string = parser.strip_mxp(parsed_string)
+    if strip_ansi:
+        return parser.strip_raw_codes(parsed_string)
+    return parsed_string
+
+
+def _parse_uncached(parser, string, **kwargs):
+    ansi._PARSE_CACHE.clear()
+    ansi._TOKENIZE_CACHE.clear()
+    return parser.parse_ansi(string, **kwargs)
+
+
+def _time(func, texts, kwargs):
+    t0 = time.perf_counter()
+    for text in texts:
+        func(ANSI_PARSER, text, **kwargs)
+    return len(texts) / (time.perf_counter() - t0)
+
+
+def run_benchmark(number=5000, verbose=True):
+    """
+    Run the benchmark.
+
+    Args:
+        number (int, optional): How many (unique) texts to parse of each kind.
+        verbose (bool, optional): Print the result as a table.
+
+    Returns:
+        dict: `{(text_name, flags, method): parses/s, ...}`, where flags is one of
+            `"ansi"`, `"xterm256"` and `"strip"` and method one of `"chained"` and
+            `"tokenizer"`.
+
+    """
+    flag_options = {
+        "ansi": {},
+        "xterm256": {"xterm256": True, "truecolor": True},
+        "strip": {"strip_ansi": True},
+    }
+    results = {}
+    for text_name, text in _TEXTS.items():
+        texts = [f"{text} {num}" for num in range(number)]
+        for flags, kwargs in flag_options.items():
+            for method, func in (("chained", _parse_chained), ("tokenizer", _parse_uncached)):
+                results[(text_name, flags, method)] = _time(func, texts, kwargs)
+    ansi._PARSE_CACHE.clear()
+    ansi._TOKENIZE_CACHE.clear()
+
+    if verbose:
+        print(f"{'text':<10}{'flags':<10}{'method':<12}{'parses/s':>12}")
+        for (text_name, flags, method), nparses in results.items():
+            print(f"{text_name:<10}{flags:<10}{method:<12}{nparses:>12.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,112 @@
+"""
+Benchmark lock checks (`LockHandler.check`).
+
+This compares checking locks through the compiled lock definitions against
+the older way of calling all lock functions and `eval`-ing the combined
+result string, as well as the effect of the lock result cache
+(`settings.LOCK_RESULT_CACHE`). Simple stand-in objects are used so the
+numbers are not skewed by database access.
+
+Run from your game dir with
+
+    evennia shell
+    >>> from evennia.server.profiling.lock_benchmark import run_benchmark
+    >>> run_benchmark()
+
+"""
+
+import time
+
+from evennia.locks import lockhandler
+from evennia.locks.lockhandler import LockHandler
+
+_LOCKSTRINGS = {
+    "single": "call:true()",
+    "negated": "get:not false()",
+    "and/or": "edit:id(10) or id(11) or id(12) and not false()",
+    "long": "control:" + " or ".join(f"id({num})" for num in range(20, 30)) + " or self()",
+}
+
+
+class _BenchmarkObj:
+    """
+    Minimal stand-in for a typeclassed entity.
+
+    """
+
+    __dbclass__ = None
+
+    def __init__(self, dbid, lock_storage=""):
+        self.dbid = self.pk = dbid
+        self.lock_storage = lock_storage
+        self.locks = LockHandler(self)
+
+    def __hash__(self):
+        return self.dbid
+
+
+def _check_eval(lockhandler, accessing_obj, access_type):
+    """
+    The lock check as done before locks were compiled.
+
+    """
+    evalstring, func_tup, raw_string, compiled = lockhandler.locks[access_type]
+    true_false = tuple(
+        bool(tup[0](accessing_obj, lockhandler.obj, *tup[1], access_type=access_type, **tup[2]))
+        for tup in func_tup
+    )
+    return eval(evalstring % true_false)
+
+
+def _time(func, number):
+    t0 = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - t0)
+
+
+def run_benchmark(number=100000, verbose=True):
+    """
+    Run the benchmark.
+
+    Args:
+        number (int, optional): How many times to check each lock.
+        verbose (bool, optional): Print the result as a table.
+
+    Returns:
+        dict: `{(lock_name, method): checks/s, ...}`, where method is one of
+            `"eval"`, `"compiled"` and `"cached"`.
+
+    """
+    accessing_obj = _BenchmarkObj(11)
+    use_cache = lockhandler._LOCK_RESULT_CACHE
+    results = {}
+    try:
+        for lock_name, lockstring in _LOCKSTRINGS.items():
+            obj = _BenchmarkObj(1, lock_storage=lockstring)
+            access_type = lockstring.split(":", 1)[0]
+            check = obj.locks.check
+
+            results[(lock_name, "eval")] = _time(
+                lambda: _check_eval(obj.locks, accessing_obj, access_type), number
+            )
+            lockhandler._LOCK_RESULT_CACHE = False
+            results[(lock_name, "compiled")] = _time(
+                lambda: check(accessing_obj, access_type), number
+            )
+            lockhandler._LOCK_RESULT_CACHE = True
+            results[(lock_name, "cached")] = _time(
+                lambda: check(accessing_obj, access_type), number
+            )
+    finally:
+        lockhandler._LOCK_RESULT_CACHE = use_cache
+
+    if verbose:
+        print(f"{'lock':<10}{'method':<12}{'checks/s':>12}")
+        for (lock_name, method), nchecks in results.items():
+            print(f"{lock_name:<10}{method:<12}{nchecks:>12.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
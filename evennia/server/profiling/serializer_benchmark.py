@@ -0,0 +1,122 @@
+"""
+Benchmark the data serializer backends (`settings.DATA_SERIALIZER`).
+
+This compares encode/decode throughput and size of the stored blob for
+the active backend with the default pickle backend, using Attribute-like
+data trees (as they look after `to_pickle` has packed any database objects).
+
+Run from your game dir with
+
+    evennia shell
+    >>> from evennia.server.profiling.serializer_benchmark import run_benchmark
+    >>> run_benchmark()
+
+"""
+
+import time
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime, timedelta
+
+from django.conf import settings
+
+from evennia.utils.serializers import PickleSerializer, get_serializer
+
+_NATURAL_KEY = ("objects", "objectdb")
+
+
+def _packed_dbobj(dbid):
+    # each object has a unique creation-time string
+    return ("__packed_dbobj__", _NATURAL_KEY, f"2024:03:01-12:00:00:{dbid:06}", dbid)
+
+
+def get_sample_trees():
+    """
+    Get sample data mimicking common types of Attribute values.
+
+    Returns:
+        dict: `{name: data, ...}`.
+
+    """
+    return {
+        "int": 42,
+        "short string": "A rusty iron sword.",
+        "description": "A long room description that goes on for a while. " * 20,
+        "stats dict": {
+            "strength": 14,
+            "dexterity": 12,
+            "constitution": 15,
+            "intelligence": 9,
+            "wisdom": 11,
+            "charisma": 8,
+            "hp": 32,
+            "hp_max": 40,
+            "conditions": ["poisoned", "hungry"],
+        },
+        "inventory": {
+            "slots": [_packed_dbobj(dbid) for dbid in range(100, 140)],
+            "equipped": {"weapon": _packed_dbobj(101), "armor": _packed_dbobj(102)},
+            "gold": 1234,
+        },
+        "quest log": OrderedDict(
+            (
+                f"quest_{num}",
+                {
+                    "stage": num % 5,
+                    "started": datetime(2024, 1, 1) + timedelta(days=num),
+                    "flags": {"met_npc", "found_key"},
+                    "giver": _packed_dbobj(500 + num),
+                    "rewards": (100 * num, "potion"),
+                },
+            )
+            for num in range(25)
+        ),
+        "message history": deque((f"Message number {num}" for num in range(50)), maxlen=50),
+        "counters": defaultdict(int, {f"kill_{num}": num for num in range(60)}),
+    }
+
+
+def _time(func, arg, number):
+    t0 = time.perf_counter()
+    for _ in range(number):
+        func(arg)
+    return number / (time.perf_counter() - t0)
+
+
+def run_benchmark(number=2000, serializers=None, verbose=True):
+    """
+    Run the benchmark.
+
+    Args:
+        number (int, optional): How many times to encode/decode each sample.
+        serializers (dict, optional): `{name: serializer_instance}` to compare. If
+            not given, compare `settings.DATA_SERIALIZER` with pickle.
+        verbose (bool, optional): Print the result as a table.
+
+    Returns:
+        dict: `{(sample_name, serializer_name): (encodes/s, decodes/s, size), ...}`.
+
+    """
+    if not serializers:
+        serializers = {"pickle": PickleSerializer()}
+        if not isinstance(get_serializer(), PickleSerializer):
+            serializers[settings.DATA_SERIALIZER.rsplit(".", 1)[-1]] = get_serializer()
+
+    results = {}
+    for sample_name, data in get_sample_trees().items():
+        for ser_name, serializer in serializers.items():
+            blob = serializer.dumps(data)
+            results[(sample_name, ser_name)] = (
+                _time(serializer.dumps, data, number),
+                _time(serializer.loads, blob, number),
+                len(blob),
+            )
+
+    if verbose:
+        print(f"{'sample':<18}{'serializer':<12}{'encode/s':>12}{'decode/s':>12}{'bytes':>8}")
+        for (sample_name, ser_name), (nenc, ndec, size) in results.items():
+            print(f"{sample_name:<18}{ser_name:<12}{nenc:>12.0f}{ndec:>12.0f}{size:>8}")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -553,6 +553,11 @@ class EvenniaServerService(MultiService):
 
         TICKER_HANDLER.save()
 
+        # save the help search indices so they don't need to be rebuilt
+        from evennia.help.utils import save_help_index_cache
+
+        save_help_index_cache()
+
         # on-demand handler state should always be saved.
         from evennia.scripts.ondemandhandler import ON_DEMAND_HANDLER
 
@@ -564,6 +569,14 @@ class EvenniaServerService(MultiService):
         if hasattr(self, "web_root"):  # not set very first start
             yield self.web_root.empty_threadpool()
 
+        # commit eventual pending Attribute and write-behind saves, including those
+        # made by the hooks above
+        from evennia.utils.dbserialize import flush_deferred_saves
+        from evennia.utils.idmapper.models import flush_write_behind
+
+        flush_deferred_saves()
+        flush_write_behind()
+
         if not _reactor_stopping:
             # kill the server
             self.shutdown_complete = True
@@ -15,6 +15,7 @@ There are two similar but separate stores of sessions:
 
 import time
 from codecs import decode as codecs_decode
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.utils.translation import gettext as _
@@ -311,6 +312,9 @@ class ServerSessionHandler(SessionHandler):
         evennia.server_data = {"servername": _SERVERNAME}
         # will be set on psync
         self.portal_start_time = 0.0
+        # outgoing messages collected by batched_data_out
+        self._batch_depth = 0
+        self._batch = []
 
     def _run_cmd_login(self, session):
         """
@@ -805,8 +809,9 @@ class ServerSessionHandler(SessionHandler):
             message (str): Message to send.
 
         """
-        for session in self.values():
-            self.data_out(session, text=message)
+        with self.batched_data_out():
+            for session in self.values():
+                self.data_out(session, text=message)
 
     def data_out(self, session, **kwargs):
         """
@@ -823,9 +828,44 @@ class ServerSessionHandler(SessionHandler):
         # clean output for sending
         kwargs = self.clean_senddata(session, kwargs)
 
+        if self._batch_depth:
+            # collect to send later, in one go
+            self._batch.append((session, kwargs))
+            return
+
         # send across AMP
         evennia.EVENNIA_SERVER_SERVICE.amp_protocol.send_MsgServer2Portal(session, **kwargs)
 
+    @contextmanager
+    def batched_data_out(self):
+        """
+        Context manager for sending many messages to the Portal as one.
+        All messages sent (with `data_out`) inside the context are collected
+        and sent across AMP together when the (outermost) context exits.
+        Other messages to the Portal (like disconnects) are not delayed.
+
+        Example:
+            ::
+
+                with evennia.SESSION_HANDLER.batched_data_out():
+                    for obj in room.contents:
+                        obj.msg("The ground shakes!")
+
+        """
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch:
+                batch, self._batch = self._batch, []
+                amp_protocol = evennia.EVENNIA_SERVER_SERVICE.amp_protocol
+                if len(batch) == 1:
+                    session, kwargs = batch[0]
+                    amp_protocol.send_MsgServer2Portal(session, **kwargs)
+                else:
+                    amp_protocol.send_MsgServer2PortalBatch(batch)
+
     def get_inputfuncs(self):
         """
         Get all registered inputfuncs (access function)
@@ -3,8 +3,11 @@ Test AMP client
 
 """
 
+import bz2
 import pickle
-from unittest import TestCase
+import random
+import zlib
+from unittest import TestCase, skipIf
 from unittest.mock import MagicMock, patch
 
 from model_mommy import mommy
@@ -94,6 +97,53 @@ class TestAMPClientSend(_TestAMP):
             self.portalsession, text={"foo": "bar"}
         )
 
+    def test_msgserver2portal_batch(self, mocktransport):
+        portalsession2 = session.Session()
+        portalsession2.sessid = 2
+        evennia.PORTAL_SESSION_HANDLER[2] = portalsession2
+        session2 = MagicMock()
+        session2.sessid = 2
+
+        self._connect_client(mocktransport)
+        self.amp_client.peer_capabilities = amp.CAPABILITIES
+        self.amp_client.send_MsgServer2PortalBatch(
+            [(self.session, {"text": "foo"}), (session2, {"text": "bar"})]
+        )
+        self.amp_client.flush_outbuffer()
+        wire_data = self._catch_wire_read(mocktransport)[0]
+
+        self._connect_server(mocktransport)
+        self.amp_server.dataReceived(wire_data)
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_any_call(self.portalsession, text="foo")
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_called_with(portalsession2, text="bar")
+
+    def test_msgserver2portal_coalesced(self, mocktransport):
+        self._connect_client(mocktransport)
+        self.amp_client.peer_capabilities = amp.CAPABILITIES
+        self.amp_client.send_MsgServer2Portal(self.session, text="foo")
+        self.amp_client.send_MsgServer2Portal(self.session, text="bar")
+        self.assertFalse(self._catch_wire_read(mocktransport))
+        self.assertTrue(self.amp_client.outbuffer_task.active())
+
+        self.amp_client.flush_outbuffer()
+        self.assertIsNone(self.amp_client.outbuffer_task)
+        wire_data = self._catch_wire_read(mocktransport)
+        self.assertEqual(len(wire_data), 1)
+
+        self._connect_server(mocktransport)
+        self.amp_server.dataReceived(wire_data[0])
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_any_call(self.portalsession, text="foo")
+        evennia.PORTAL_SESSION_HANDLER.data_out.assert_called_with(self.portalsession, text="bar")
+
+    def test_msgserver2portal_flush_before_admin(self, mocktransport):
+        self._connect_client(mocktransport)
+        self.amp_client.peer_capabilities = amp.CAPABILITIES
+        self.amp_client.send_MsgServer2Portal(self.session, text="foo")
+        self.amp_client.send_AdminServer2Portal(self.session, operation=amp.SDISCONN)
+        # the queued message was sent first
+        self.assertEqual(len(self._catch_wire_read(mocktransport)), 2)
+        self.assertIsNone(self.amp_client.outbuffer_task)
+
     def test_adminserver2portal(self, mocktransport):
         self._connect_client(mocktransport)
 
@@ -131,3 +181,131 @@ class TestAMPClientRecv(_TestAMP):
         evennia.SERVER_SESSION_HANDLER.portal_disconnect_all = MagicMock()
         self.amp_client.dataReceived(wire_data)
         evennia.SERVER_SESSION_HANDLER.portal_disconnect_all.assert_called()
+
+
+class TestBatchedDataOut(TestCase):
+    """Test batching of outgoing messages in the server sessionhandler"""
+
+    def setUp(self):
+        self.sessionhandler = ServerSessionHandler()
+        self.sessionhandler.clean_senddata = lambda session, kwargs: kwargs
+        self.session1, self.session2 = MagicMock(), MagicMock()
+
+    @patch("evennia.EVENNIA_SERVER_SERVICE")
+    def test_batched_data_out(self, mock_service):
+        amp_protocol = mock_service.amp_protocol
+        with self.sessionhandler.batched_data_out():
+            self.sessionhandler.data_out(self.session1, text="foo")
+            with self.sessionhandler.batched_data_out():
+                self.sessionhandler.data_out(self.session2, text="bar")
+            amp_protocol.send_MsgServer2PortalBatch.assert_not_called()
+        amp_protocol.send_MsgServer2Portal.assert_not_called()
+        amp_protocol.send_MsgServer2PortalBatch.assert_called_once_with(
+            [(self.session1, {"text": "foo"}), (self.session2, {"text": "bar"})]
+        )
+
+        # a single message is sent normally
+        with self.sessionhandler.batched_data_out():
+            self.sessionhandler.data_out(self.session1, text="foo")
+        amp_protocol.send_MsgServer2Portal.assert_called_once_with(self.session1, text="foo")
+
+
+class _Bz2Compressor(amp.AMPCompressor):
+    """Custom compressor for testing"""
+
+    key = "bz2"
+    prefix = b"BZh"
+
+    def compress(self, data):
+        return bz2.compress(data)
+
+    def decompress(self, data):
+        return bz2.decompress(data)
+
+
+class TestCompressed(TestCase):
+    """Test compression of AMP data"""
+
+    def _get_proto(self, compression="zlib", peer_capabilities=()):
+        proto_class = type(
+            "Proto",
+            (amp.AMPMultiConnectionProtocol,),
+            {"compression": compression, "compression_level": 1, "compression_min_size": 512},
+        )
+        proto = proto_class()
+        proto.peer_capabilities = peer_capabilities
+        return proto
+
+    def test_compression(self):
+        data = b"foo" * 1000
+        proto = self._get_proto()
+        compressed = amp.Compressed()
+        for inp in (data, data[:10]):
+            # peer not supporting raw chunks
+            outp = compressed.toStringProto(inp, proto)
+            self.assertEqual(outp, zlib.compress(inp, 1))
+            self.assertEqual(compressed.fromStringProto(outp, proto), inp)
+
+        proto.peer_capabilities = amp.CAPABILITIES
+        outp = compressed.toStringProto(data, proto)
+        self.assertEqual(outp, zlib.compress(data, 1))
+        self.assertEqual(compressed.fromStringProto(outp, proto), data)
+        # small data is not compressed
+        outp = compressed.toStringProto(data[:10], proto)
+        self.assertEqual(outp, b"\x00" + data[:10])
+        self.assertEqual(compressed.fromStringProto(outp, proto), data[:10])
+        # incompressible data is not compressed either
+        noise = random.Random(1).randbytes(1000)
+        outp = compressed.toStringProto(noise, proto)
+        self.assertEqual(outp, b"\x00" + noise)
+        self.assertEqual(compressed.fromStringProto(outp, proto), noise)
+        # old-style, level 9
+        self.assertEqual(compressed.fromString(zlib.compress(data, 9)), data)
+        self.assertEqual(compressed.fromStringProto(zlib.compress(data, 9), proto), data)
+
+    def test_custom_compressor(self):
+        data = b"foo" * 1000
+        compressed = amp.Compressed()
+        proto = self._get_proto(
+            compression="evennia.server.tests.test_amp_connection._Bz2Compressor"
+        )
+        self.assertIn("compression:bz2", proto.capabilities)
+        # the other side doesn't support the compressor
+        proto.peer_capabilities = amp.CAPABILITIES
+        self.assertEqual(compressed.toStringProto(data, proto), zlib.compress(data, 1))
+
+        proto.peer_capabilities = proto.capabilities
+        outp = compressed.toStringProto(data, proto)
+        self.assertEqual(outp, bz2.compress(data))
+        self.assertEqual(compressed.fromStringProto(outp, proto), data)
+        # still reads zlib
+        self.assertEqual(compressed.fromStringProto(zlib.compress(data, 1), proto), data)
+
+    @patch("evennia.server.portal.amp._get_logger")
+    def test_unavailable_compressor(self, mock_logger):
+        with patch.object(amp.ZstdCompressor, "is_available", classmethod(lambda cls: False)):
+            proto = self._get_proto(compression="zstd", peer_capabilities=amp.CAPABILITIES)
+        self.assertIsInstance(proto.compressor, amp.ZlibCompressor)
+        self.assertNotIn("compression:zstd", proto.capabilities)
+        mock_logger.return_value.log_warn.assert_called_once()
+
+    @skipIf(amp.zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        data = b"foo" * 1000
+        compressed = amp.Compressed()
+        proto = self._get_proto(compression="zstd", peer_capabilities=amp.CAPABILITIES)
+        outp = compressed.toStringProto(data, proto)
+        self.assertTrue(outp.startswith(amp.ZstdCompressor.prefix))
+        self.assertEqual(compressed.fromStringProto(outp, proto), data)
+
+    def test_box(self):
+        data = random.Random(1).randbytes(100000) + b"foo" * 100000
+        compressed = amp.Compressed()
+        proto = self._get_proto(peer_capabilities=amp.CAPABILITIES)
+        strings = {}
+        compressed.toBox(b"data", strings, {"data": data}, proto)
+        self.assertGreaterEqual(len(strings), -(-len(data) // amp.AMP_MAXLEN))
+        self.assertTrue(all(len(chunk) <= amp.AMP_MAXLEN for chunk in strings.values()))
+        objects = {}
+        compressed.fromBox(b"data", strings, objects, proto)
+        self.assertEqual(objects["data"], data)
@@ -132,6 +132,25 @@ EVENNIA_ADMIN = True
 AMP_HOST = "localhost"
 AMP_PORT = 4006
 AMP_INTERFACE = "127.0.0.1"
+# If set, all messages from the Server to sessions queued within the same
+# reactor tick are sent to the Portal as one AMP message. This greatly reduces
+# the overhead of broadcasts (like channel messages).
+AMP_COALESCE_OUTPUT = True
+# Compression of data sent between Portal and Server. One of "zlib" or "zstd"
+# (requires `pip install zstandard` for both Portal and Server), or the
+# python-path to a custom `evennia.server.portal.amp.AMPCompressor` class. If the
+# compressor is not available, zlib is used.
+AMP_COMPRESSION = "zlib"
+# Compression level (zlib: 1-9, zstd: 1-22). Lower is faster, higher gives
+# smaller messages. Since the data is only sent locally, speed is usually more
+# important. Use `evennia.server.profiling.amp_benchmark` to compare.
+AMP_COMPRESSION_LEVEL = 1
+# Messages (chunks) smaller than this (in bytes) are not compressed at all.
+AMP_COMPRESSION_MIN_SIZE = 512
+# If set, the Portal renders each text sent to many sessions (like says and
+# channel messages) only once per combination of client settings (color
+# support, MXP, screenreader etc), instead of once per session.
+PORTAL_RENDER_CACHE = True
 
 
 # Path to the lib directory containing the bulk of the codebase's code.
@@ -232,7 +251,10 @@ MXP_OUTGOING_ONLY = True
 #     500    |      ~30 000     ||     2000    |    ~125 000
 # Note that the estimated memory usage is not exact (and the cap is only
 # checked every 5 minutes), so err on the side of caution if
-# running on a server with limited memory. Also note that Python
+# running on a server with limited memory. When the cap is reached, the
+# least recently used entities are evicted from the cache (entities with
+# connected sessions, non-persistent Attributes or referenced by other
+# cached entities are kept). Also note that Python
 # will not necessarily return the memory to the OS when the idmapper
 # flashes (the memory will be freed and made available to the Python
 # process only). How many objects need to be in memory at any given
@@ -240,6 +262,45 @@ MXP_OUTGOING_ONLY = True
 # be necessary (use @server to see how many objects are in the idmapper
 # cache at any time). Setting this to None disables the cache cap.
 IDMAPPER_CACHE_MAXSIZE = 400  # (MB)
+# Max number of instances of each database model (like ObjectDB or
+# Attribute) to keep in the idmapper cache, regardless of memory use. This
+# is checked at the same time as IDMAPPER_CACHE_MAXSIZE, evicting the least
+# recently used instances. None means no limit.
+IDMAPPER_CACHE_MAX_INSTANCES = None
+# Write-behind mode for database saves. When active, field-updates of
+# already existing database entities (like changing an object's location)
+# are not committed immediately but are queued, merged per entity and
+# committed together in one transaction. This lessens the load of many
+# saves happening at the same time (like in a big combat tick). All
+# in-game access sees the new values immediately, but raw database
+# queries will only see them after the next flush. The queue is always
+# flushed on reload/shutdown. Check the queue status with `server`.
+IDMAPPER_WRITE_BEHIND = False
+# Max seconds a save can wait in the write-behind queue.
+IDMAPPER_WRITE_BEHIND_INTERVAL = 1.0
+# Flush the write-behind queue immediately when this many entities wait in it.
+IDMAPPER_WRITE_BEHIND_MAXSIZE = 500
+# The TickerHandler can spread the subscribers of each ticker interval over
+# this many time slices of the interval (each subscriber always lands in the
+# same slice), so a ticker with many subscribers doesn't call them all at
+# once. A subscriber in slice N is called N * interval / TICKER_SLICES seconds
+# after the start of each interval. The default of 1 calls all subscribers at
+# the start of the interval.
+TICKER_SLICES = 1
+# Max seconds the TickerHandler spends calling subscribers before letting the
+# server do other work (the rest is called in the next reactor turn).
+TICKER_TIME_BUDGET = 0.05
+# What a ticker does if its previous tick hasn't finished calling all its
+# subscribers when the next tick comes: "queue" runs both ticks fully, "merge"
+# calls subscribers still waiting for the previous tick only once, and "skip"
+# drops the new tick. See the overrun metrics with the `tickers` command.
+TICKER_OVERLOAD_POLICY = "queue"
+# Named thread pools used by evennia.utils.executors to run blocking code
+# outside the main thread, as {name: {"maxthreads": int, "maxqueue": int}}.
+# maxthreads is how many jobs may run at the same time and maxqueue how many
+# may wait for a free thread (0 for no limit) before new jobs are rejected.
+# Pools not listed here use the limits of the "default" pool.
+EXECUTOR_POOLS = {"default": {"maxthreads": 4, "maxqueue": 1000}}
 # This determines how many connections per second the Portal should
 # accept, as a DoS countermeasure. If the rate exceeds this number, incoming
 # connections will be queued to this rate, so none will be lost.
@@ -326,6 +387,19 @@ ATTRIBUTE_STORED_MODEL_RENAME = [
     (("players", "playerdb"), ("accounts", "accountdb")),
     (("typeclasses", "defaultplayer"), ("typeclasses", "defaultaccount")),
 ]
+# The backend used to serialize Attribute values (and other pickled database
+# fields) to bytes for storage. The default uses Python's pickle. A custom
+# backend should inherit from evennia.utils.serializers.BaseSerializer. Data
+# stored with pickle can always be read, but note that searching Attributes
+# by value only finds values stored with the currently active backend.
+DATA_SERIALIZER = "evennia.utils.serializers.PickleSerializer"
+# Normally every change to a nested mutable stored in an Attribute (like
+# `obj.db.mydict["key"][3] = 2`) re-serializes and saves the entire Attribute.
+# If this is set, all such changes made during the same reactor iteration are
+# merged so each changed Attribute is only saved once, at the start of the
+# next iteration. Changes can also be batched explicitly by wrapping them in
+# `with obj.attributes.deferred():`.
+ATTRIBUTE_SAVE_COALESCE = False
 # Default type of autofield (required by Django), which defines the type of
 # primary key fields for all tables. This type is guaranteed to be at least a
 # 64-bit integer.
@@ -380,6 +454,20 @@ SEARCH_MULTIMATCH_TEMPLATE = " {name}-{number}{aliases}{info}\n"
 # both for command- and object-searches. This allows full control
 # over the error output (it uses SEARCH_MULTIMATCH_TEMPLATE by default).
 SEARCH_AT_RESULT = "evennia.utils.utils.at_search_result"
+# Keep an in-memory index of the keys and aliases of all Objects and Accounts,
+# used to speed up global (not location-based) searches in big databases. The
+# index is built on the first global search and uses some memory (see the
+# `server` command). Changes made to the database from outside the server
+# process are not seen by the index; use `server/reindex` to rebuild it.
+SEARCH_KEY_INDEX = False
+# Keep an in-memory reverse index of the Tags (including aliases and
+# permissions) of all Objects, Accounts, Scripts and Channels, used by
+# `get_by_tag`/`search_tag` to find tagged entities without joining the tag
+# tables in the database. The index is built on the first tag search. Tags
+# changed other than through the `.tags`/`.aliases`/`.permissions` handlers
+# (or from outside the server process) are not seen by the index; use
+# `server/checkindex` to find differences and `server/reindex` to rebuild it.
+SEARCH_TAG_INDEX = False
 # Single characters to ignore at the beginning of a command. When set, e.g.
 # cmd, @cmd and +cmd will all find a command "cmd" or one named "@cmd" etc. If
 # you have defined two different commands cmd and @cmd you can still enter
@@ -438,6 +526,34 @@ WEB_PLUGINS_MODULE = "server.conf.web_plugins"
 # Tuple of modules implementing lock functions. All callable functions
 # inside these modules will be available as lock functions.
 LOCK_FUNC_MODULES = ("evennia.locks.lockfuncs", "server.conf.lockfuncs")
+# Cache the results of lock checks per accessing object. Only locks made up
+# entirely of the lock functions in LOCK_RESULT_CACHE_FUNCS are cached. The
+# cache is invalidated when the lock changes, when any Tag or Permission
+# changes and when an Account puppets, unpuppets or quells with the quell
+# command. Only add lock functions here whose result depends on nothing else
+# (or call evennia.locks.lockhandler.invalidate_lock_cache() when it changes).
+# This includes changing an Account's `is_superuser` or `_quell` Attribute
+# directly in code.
+LOCK_RESULT_CACHE = False
+LOCK_RESULT_CACHE_FUNCS = (
+    "true",
+    "all",
+    "false",
+    "none",
+    "superuser",
+    "self",
+    "perm",
+    "perm_above",
+    "pperm",
+    "pperm_above",
+    "dbref",
+    "pdbref",
+    "id",
+    "pid",
+    "tag",
+)
+# Max number of cached results per locked object.
+LOCK_RESULT_CACHE_SIZE = 100
 # Module holding handlers for managing incoming data from the client. These
 # will be loaded in order, meaning functions in later modules may overload
 # previous ones if having the same name.
@@ -500,6 +616,10 @@ CMDSET_ACCOUNT = "commands.default_cmdsets.AccountCmdSet"
 
 # Location to search for cmdsets if full path not given
 CMDSET_PATHS = ["commands", "evennia", "evennia.contrib"]
+# The number of cmdset merge-results to cache. Merging is done for every
+# command, so the results are reused as long as the same cmdsets are in play.
+# The least recently used results are dropped first.
+CMDSET_MERGE_CACHE_SIZE = 1000
 # Fallbacks for cmdset paths that fail to load. Note that if you change the path for your
 # default cmdsets, you will also need to copy CMDSET_FALLBACKS after your change in your
 # settings file for it to detect the change.
@@ -681,6 +801,10 @@ HELP_CLICKABLE_TOPICS = True
 # so we need to make sure to tell Lunr to not filter them out by adding them here
 # (many are auto-added out of the box, this extends the list).
 LUNR_STOP_WORD_FILTER_EXCEPTIONS = []
+# How many search indices (one per set of help entries visible to a user) the help
+# system caches. The cache is saved in CACHE_DIR on reload/shutdown. Set to 0 to
+# rebuild the index on every help search.
+HELP_INDEX_CACHE_SIZE = 20
 
 ######################################################################
 # FuncParser
@@ -18,7 +18,13 @@ from django.conf import settings
 from django.db import models
 from django.utils.encoding import smart_str
 from evennia.locks.lockhandler import LockHandler
-from evennia.utils.dbserialize import from_pickle, to_pickle
+from evennia.utils.dbserialize import (
+    deferred_saves,
+    discard_deferred_save,
+    from_pickle,
+    get_deferred_save,
+    to_pickle,
+)
 from evennia.utils.idmapper.models import SharedMemoryModel
 from evennia.utils.picklefield import PickledObjectField
 from evennia.utils.utils import is_iter, lazy_property, make_iter, to_str
@@ -444,6 +450,10 @@ class Attribute(IAttribute, SharedMemoryModel):
         as storing a dbobj which is then deleted elsewhere) out-of-sync.
         The overhead of unpickling seems hard to avoid.
         """
+        pending = get_deferred_save(self)
+        if pending is not None:
+            # nested updates not yet saved to db_value
+            return pending
         return from_pickle(self.db_value, db_obj=self)
 
     @value.setter
@@ -452,6 +462,7 @@ class Attribute(IAttribute, SharedMemoryModel):
         Setter. Allows for self.value = value. We cannot cache here,
         see self.__value_get.
         """
+        discard_deferred_save(self)
         self.db_value = to_pickle(new_value)
         self.save(update_fields=["db_value"])
 
@@ -528,12 +539,30 @@ class IAttributeBackend:
         """Cache all attributes of this object"""
         if not _TYPECLASS_AGGRESSIVE_CACHE:
             return
-        attrs = self.query_all()
-        self._cache = {
+        self._fill_cache(self.query_all())
+
+    def _fill_cache(self, attrs, categories=None):
+        """
+        Fill the cache with Attributes of this object.
+
+        Args:
+            attrs (list): All Attributes of this object (of this backend's attrtype).
+            categories (list, optional): If given, `attrs` are instead all Attributes
+                of these (cleaned) categories, and only those categories are marked
+                as cached.
+
+        """
+        cache = {
             f"{to_str(attr.key).lower()}-{attr.category.lower() if attr.category else None}": attr
             for attr in attrs
         }
-        self._cache_complete = True
+        if categories is None:
+            self._cache = cache
+            self._cache_complete = True
+        else:
+            self._cache.update(cache)
+            for category in categories:
+                self._catcache["-%s" % category] = True
 
     def _get_cache_key(self, key, category):
         """
@@ -559,6 +588,9 @@ class IAttributeBackend:
             attr = None
             cachefound = False
             del self._cache[cachekey]
+        if not cachefound and _TYPECLASS_AGGRESSIVE_CACHE:
+            # a fully cached object (or category) has no uncached Attributes
+            cachefound = self._cache_complete or "-%s" % category in self._catcache
         if cachefound and _TYPECLASS_AGGRESSIVE_CACHE:
             if attr:
                 return [attr]  # return cached entity
@@ -598,7 +630,7 @@ class IAttributeBackend:
             if _TYPECLASS_AGGRESSIVE_CACHE:
                 for attr in attrs:
                     if attr.pk:
-                        cachekey = "%s-%s" % (attr.key, category)
+                        cachekey = "%s-%s" % (to_str(attr.key).lower(), category)
                         self._cache[cachekey] = attr
                 # mark category cache as up-to-date
                 self._catcache[catkey] = True
@@ -1033,7 +1065,9 @@ class ModelAttributeBackend(IAttributeBackend):
         }
         return [
             conn.attribute
-            for conn in getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query)
+            for conn in getattr(self.obj, self._m2m_fieldname)
+            .through.objects.filter(**query)
+            .select_related("attribute")
         ]
 
     def query_key(self, key, category):
@@ -1046,7 +1080,11 @@ class ModelAttributeBackend(IAttributeBackend):
         }
         if not self.obj.pk:
             return []
-        return getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query)
+        return (
+            getattr(self.obj, self._m2m_fieldname)
+            .through.objects.filter(**query)
+            .select_related("attribute")
+        )
 
     def query_category(self, category):
         query = {
@@ -1057,7 +1095,9 @@ class ModelAttributeBackend(IAttributeBackend):
         }
         return [
             conn.attribute
-            for conn in getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query)
+            for conn in getattr(self.obj, self._m2m_fieldname)
+            .through.objects.filter(**query)
+            .select_related("attribute")
         ]
 
     def do_create_attribute(self, key, category, lockstring, value, strvalue):
@@ -1114,6 +1154,58 @@ class ModelAttributeBackend(IAttributeBackend):
             pass
 
 
+def fill_attribute_caches(backends, categories=None):
+    """
+    Cache the Attributes of many entities using one database query, instead
+    of one query per entity.
+
+    Args:
+        backends (list): `ModelAttributeBackend`s (like `obj.attributes.backend`) to
+            cache. These must all be of the same attrtype and be on entities of the
+            same type (like all Objects). Backends already cached are skipped.
+        categories (list, optional): Only cache Attributes of these categories
+            (`None` meaning Attributes without a category). If not given, all
+            Attributes are cached.
+
+    """
+    if not _TYPECLASS_AGGRESSIVE_CACHE:
+        return
+    if categories is not None:
+        categories = [category.strip().lower() if category else None for category in categories]
+    backends = [
+        backend
+        for backend in backends
+        if isinstance(backend, ModelAttributeBackend)
+        and backend._objid
+        and not backend._cache_complete
+        and (
+            categories is None
+            or any("-%s" % category not in backend._catcache for category in categories)
+        )
+    ]
+    if not backends:
+        return
+    backend = backends[0]
+    model = backend._model
+    query = getattr(backend.obj, backend._m2m_fieldname).through.objects.filter(
+        **{
+            "%s__id__in" % model: [backend._objid for backend in backends],
+            "attribute__db_model__iexact": model,
+            "attribute__db_attrtype": backend._attrtype,
+        }
+    )
+    if categories is not None:
+        catquery = models.Q()
+        for category in categories:
+            catquery |= models.Q(attribute__db_category__iexact=category)
+        query = query.filter(catquery)
+    attrs_by_objid = defaultdict(list)
+    for conn in query.select_related("attribute"):
+        attrs_by_objid[getattr(conn, "%s_id" % model)].append(conn.attribute)
+    for backend in backends:
+        backend._fill_cache(attrs_by_objid[backend._objid], categories=categories)
+
+
 class AttributeHandler:
     """
     Handler for adding Attributes to the object.
@@ -1434,6 +1526,26 @@ class AttributeHandler:
     def reset_cache(self):
         self.backend.reset_cache()
 
+    def deferred(self):
+        """
+        Batch updates to nested mutable Attributes. Inside this block, changes to
+        nested lists/dicts etc stored in Attributes are not saved one by one, but
+        each changed Attribute is serialized and saved only once when the block
+        exits. This is not limited to the Attributes of this handler.
+
+        Returns:
+            contextmanager: The batching context.
+
+        Example:
+        ::
+
+            with obj.attributes.deferred():
+                for slot in range(100):
+                    obj.db.inventory["slots"][slot] = None
+
+        """
+        return deferred_saves()
+
 
 # DbHolders for .db and .ndb properties on Typeclasses.
 
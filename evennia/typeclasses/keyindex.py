@@ -0,0 +1,383 @@
+"""
+Key/alias index
+
+This is an optional in-memory index of the keys and aliases of all entities
+of a given type (like all Objects or Accounts). It is used to speed up global
+searches, which otherwise need to scan the whole database table with a
+case-insensitive (or regex) match. It is activated with
+`settings.SEARCH_KEY_INDEX`.
+
+The index stores the lowercase key and aliases and the typeclass path of
+each entity, and maps every word (sequence of alphanumeric characters) of
+these names to the entities using them. A sorted list of all words allows
+finding all words starting with a given prefix.
+
+The index is built on first use and then kept up-to-date by listening to
+the saving/deleting of entities and by the `AliasHandler`. Changes made
+directly in the database (like with `QuerySet.update`) or by another process
+are not seen by the index; use `server/reindex` to rebuild it if needed.
+
+"""
+
+import re
+import sys
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+_RE_WORD = re.compile(r"\w+")
+
+_KEY_INDEXES = {}
+
+
+class KeyIndex:
+    """
+    Index of the keys and aliases of all entities of one database model.
+
+    """
+
+    def __init__(self, model, key_field="db_key"):
+        """
+        Args:
+            model (Model): The database model (like `ObjectDB`) to index.
+            key_field (str, optional): The name of the database field holding the key.
+
+        """
+        self.model = model
+        self.key_field = key_field
+        self.model_name = model.__name__.lower()
+        self.built = False
+        self.reset()
+
+    def reset(self):
+        """
+        Empty the index. It will be rebuilt on next use.
+
+        """
+        self.built = False
+        # {id: [typeclass_path, key, set(aliases)]}
+        self._entries = {}
+        # {name: set(ids)} for keys and aliases
+        self._keys = defaultdict(set)
+        self._aliases = defaultdict(set)
+        # {word: set(ids)} and a sorted list of all words for prefix lookups
+        self._words = {}
+        self._sorted_words = []
+
+    def build(self):
+        """
+        Build the index from the database.
+
+        """
+        self.reset()
+        for dbid, key, typeclass_path in self.model.objects.values_list(
+            "id", self.key_field, "db_typeclass_path"
+        ).iterator(chunk_size=10000):
+            self._entries[dbid] = [typeclass_path, (key or "").lower(), set()]
+        through = self.model.db_tags.through
+        for dbid, alias in (
+            through.objects.filter(tag__db_tagtype="alias", tag__db_model=self.model_name)
+            .values_list(f"{self.model_name}_id", "tag__db_key")
+            .iterator(chunk_size=10000)
+        ):
+            if dbid in self._entries:
+                self._entries[dbid][2].add(alias.lower())
+
+        words = defaultdict(set)
+        for dbid, (_, key, aliases) in self._entries.items():
+            self._keys[key].add(dbid)
+            for alias in aliases:
+                self._aliases[alias].add(dbid)
+            for word in _RE_WORD.findall(" ".join((key, *aliases))):
+                words[word].add(dbid)
+        self._words = dict(words)
+        self._sorted_words = sorted(self._words)
+        self.built = True
+
+    # updating
+
+    def _index(self, dbid):
+        """
+        Add an entity's key and aliases to the lookups.
+
+        """
+        _, key, aliases = self._entries[dbid]
+        self._keys[key].add(dbid)
+        for alias in aliases:
+            self._aliases[alias].add(dbid)
+        for word in set(_RE_WORD.findall(" ".join((key, *aliases)))):
+            dbids = self._words.get(word)
+            if dbids is None:
+                self._words[word] = dbids = set()
+                insort(self._sorted_words, word)
+            dbids.add(dbid)
+
+    def _unindex(self, dbid):
+        """
+        Remove an entity's key and aliases from the lookups.
+
+        """
+        _, key, aliases = self._entries[dbid]
+        for lookup, names in ((self._keys, (key,)), (self._aliases, aliases)):
+            for name in names:
+                dbids = lookup.get(name)
+                if dbids is not None:
+                    dbids.discard(dbid)
+                    if not dbids:
+                        del lookup[name]
+        for word in set(_RE_WORD.findall(" ".join((key, *aliases)))):
+            dbids = self._words.get(word)
+            if dbids is not None:
+                dbids.discard(dbid)
+                if not dbids:
+                    del self._words[word]
+                    del self._sorted_words[bisect_left(self._sorted_words, word)]
+
+    def update(self, obj, aliases=None):
+        """
+        Add or update an entity in the index.
+
+        Args:
+            obj (TypedObject): The entity to update.
+            aliases (list, optional): The entity's aliases. If not given, the
+                aliases already in the index are kept (or, for a new entity, read
+                from the entity).
+
+        """
+        if not self.built:
+            return
+        dbid = obj.id
+        entry = self._entries.get(dbid)
+        if entry:
+            self._unindex(dbid)
+            if aliases is None:
+                aliases = entry[2]
+        elif aliases is None:
+            aliases = obj.aliases.all()
+        self._entries[dbid] = [
+            obj.db_typeclass_path,
+            (getattr(obj, self.key_field) or "").lower(),
+            set(alias.lower() for alias in aliases),
+        ]
+        self._index(dbid)
+
+    def add_alias(self, obj, alias):
+        """
+        Add an alias to an entity in the index.
+
+        Args:
+            obj (TypedObject): The entity.
+            alias (str): The new alias.
+
+        """
+        if self.built and obj.id in self._entries:
+            self.update(obj, aliases=self._entries[obj.id][2] | {alias.lower()})
+
+    def remove_alias(self, obj, alias):
+        """
+        Remove an alias from an entity in the index.
+
+        Args:
+            obj (TypedObject): The entity.
+            alias (str): The alias to remove.
+
+        """
+        if self.built and obj.id in self._entries:
+            self.update(obj, aliases=self._entries[obj.id][2] - {alias.lower()})
+
+    def remove(self, dbid):
+        """
+        Remove an entity from the index.
+
+        Args:
+            dbid (int): The database id of the entity.
+
+        """
+        if self.built and dbid in self._entries:
+            self._unindex(dbid)
+            del self._entries[dbid]
+
+    # searching
+
+    def _prefix_ids(self, prefix):
+        """
+        Get the ids of all entities with a word starting with `prefix`.
+
+        """
+        sorted_words = self._sorted_words
+        ids = set()
+        for inum in range(bisect_left(sorted_words, prefix), len(sorted_words)):
+            word = sorted_words[inum]
+            if not word.startswith(prefix):
+                break
+            ids.update(self._words[word])
+        return ids
+
+    def search(self, ostring, match="exact", typeclasses=None, keys=True, aliases=True):
+        """
+        Search the index.
+
+        Args:
+            ostring (str): The string to search for.
+            match (str, optional): How to match. One of
+
+                - "exact" - require an exact (case-insensitive) match.
+                - "words" - each word in `ostring` must match the start of a word in
+                  the key/alias, in order (so "b sw" matches "big sword"). This
+                  matches the same as `ObjectDBManager.get_objs_with_key_or_alias`.
+                - "contains" - the key/alias must contain `ostring` (case-insensitive).
+
+            typeclasses (list, optional): Only match entities having these
+                typeclass paths.
+            keys (bool, optional): Match against the keys.
+            aliases (bool, optional): Match against the aliases.
+
+        Returns:
+            list or None: The sorted ids of all matching entities. If `None`, the
+                search can't be done with the index (like when searching for an
+                empty string, which matches everything).
+
+        """
+        if not self.built:
+            self.build()
+        ostring = ostring.lower()
+
+        if match == "exact":
+            ids = set()
+            if keys:
+                ids.update(self._keys.get(ostring, ()))
+            if aliases:
+                ids.update(self._aliases.get(ostring, ()))
+            if typeclasses:
+                ids = [dbid for dbid in ids if self._entries[dbid][0] in typeclasses]
+            return sorted(ids)
+
+        if match == "contains":
+            if not ostring:
+                return None
+            # there's no shortcut for substrings, but this is still much faster
+            # than a full table scan in the database
+            return [
+                dbid
+                for dbid, (typeclass_path, key, entity_aliases) in sorted(self._entries.items())
+                if (not typeclasses or typeclass_path in typeclasses)
+                and (
+                    (keys and ostring in key)
+                    or (aliases and any(ostring in alias for alias in entity_aliases))
+                )
+            ]
+
+        words = ostring.split()
+        prefixes = [_RE_WORD.match(word) for word in words]
+        if not words or not all(prefixes):
+            # the regex-matching of words starting with a non-word character is
+            # not simple to reproduce - let the database handle it
+            return None
+        # the longest word is likely the one matching the fewest entities
+        candidate_ids = self._prefix_ids(max((prefix.group() for prefix in prefixes), key=len))
+
+        search_regex = re.compile(
+            r".* ".join(r"\b" + re.escape(word) for word in words) + r".*", re.I
+        )
+        matches = []
+        for dbid in candidate_ids:
+            typeclass_path, key, entity_aliases = self._entries[dbid]
+            if typeclasses and typeclass_path not in typeclasses:
+                continue
+            if (keys and search_regex.search(key)) or (
+                aliases and any(search_regex.search(alias) for alias in entity_aliases)
+            ):
+                matches.append(dbid)
+        return sorted(matches)
+
+    # info
+
+    def memory_usage(self):
+        """
+        Estimate the memory used by the index.
+
+        Returns:
+            int: Approximate memory use in bytes.
+
+        """
+        getsize = sys.getsizeof
+        size = getsize(self._entries) + getsize(self._words) + getsize(self._sorted_words)
+        size += getsize(self._keys) + getsize(self._aliases)
+        for entry in self._entries.values():
+            size += getsize(entry) + getsize(entry[1]) + getsize(entry[2])
+            size += sum(getsize(alias) for alias in entry[2])
+        for lookup in (self._words, self._keys, self._aliases):
+            for name, ids in lookup.items():
+                size += getsize(ids) + (0 if lookup is self._keys else getsize(name))
+        return size
+
+    def stats(self):
+        """
+        Get statistics about the index.
+
+        Returns:
+            dict: With keys `entities`, `words` and `memory` (approximate, in bytes).
+
+        """
+        return {
+            "entities": len(self._entries),
+            "words": len(self._words),
+            "memory": self.memory_usage(),
+        }
+
+
+def _on_post_save(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Update the index when an entity is saved.
+
+    """
+    index = _KEY_INDEXES.get(getattr(instance, "__dbclass__", None))
+    if (
+        index
+        and index.built
+        and (
+            created
+            or not update_fields
+            or index.key_field in update_fields
+            or "db_typeclass_path" in update_fields
+        )
+    ):
+        # aliases of a new entity are added by `at_first_save` before this is
+        # called, so they are read from the entity
+        index.update(instance)
+
+
+def _on_post_delete(sender, instance, **kwargs):
+    """
+    Remove a deleted entity from the index.
+
+    """
+    index = _KEY_INDEXES.get(getattr(instance, "__dbclass__", None))
+    if index:
+        index.remove(instance.id)
+
+
+def get_key_index(model):
+    """
+    Get the key/alias index for a model, if the index is active.
+
+    Args:
+        model (Model): The database model, like `ObjectDB` or `AccountDB`.
+
+    Returns:
+        KeyIndex or None: The index, or `None` if `settings.SEARCH_KEY_INDEX`
+            is not set.
+
+    """
+    if not settings.SEARCH_KEY_INDEX:
+        return None
+    index = _KEY_INDEXES.get(model)
+    if index is None:
+        if not _KEY_INDEXES:
+            post_save.connect(_on_post_save, dispatch_uid="evennia-key-index-save")
+            post_delete.connect(_on_post_delete, dispatch_uid="evennia-key-index-delete")
+        key_field = "username" if model.__name__ == "AccountDB" else "db_key"
+        index = _KEY_INDEXES[model] = KeyIndex(model, key_field=key_field)
+    return index
@@ -6,11 +6,24 @@ all Attributes and TypedObjects).
 """
 
 import shlex
-
-from django.db.models import Count, ExpressionWrapper, F, FloatField, Q
+from collections import defaultdict
+
+from django.db import connections
+from django.db.models import (
+    Case,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    IntegerField,
+    Q,
+    Value,
+    When,
+)
 from django.db.models.functions import Cast
 
 from evennia.typeclasses.attributes import Attribute
+from evennia.typeclasses.tagindex import get_tag_index
 from evennia.typeclasses.tags import Tag
 from evennia.utils import idmapper
 from evennia.utils.utils import class_from_module, make_iter, variable_from_module
@@ -323,6 +336,31 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             # ANY mode; must match any one of them
             for category in unique_categories:
                 clauses |= Q(db_category__iexact=category)
+        n_req_tags = n_keys if n_keys > 0 else n_unique_categories
+
+        index = get_tag_index(self.model.__dbclass__)
+        if index:
+            matches = index.search(keys, categories, tagtype=tagtype)
+            if not anymatch:
+                matches = {dbid: nmatch for dbid, nmatch in matches.items() if nmatch >= n_req_tags}
+            max_query_params = connections[self.db].features.max_query_params
+            # the ids are passed twice, to filter and to annotate the matches
+            if not max_query_params or 2 * len(matches) <= max_query_params:
+                ids_by_matches = defaultdict(list)
+                for dbid, nmatch in matches.items():
+                    ids_by_matches[nmatch].append(dbid)
+                query = self.filter(id__in=matches).annotate(
+                    matches=Case(
+                        *(
+                            When(id__in=ids, then=Value(nmatch))
+                            for nmatch, ids in ids_by_matches.items()
+                        ),
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    )
+                )
+                return query.order_by("-matches", "id") if anymatch else query.order_by("id")
+            # too many matches to pass as query parameters - use the database query
 
         tags = _Tag.objects.filter(clauses)
         query = query.filter(db_tags__in=tags).annotate(
@@ -334,7 +372,6 @@ class TypedObjectManager(idmapper.manager.SharedMemoryManager):
             query = query.order_by("-matches")
         else:
             # Default ALL: Match all of the tags and optionally more
-            n_req_tags = n_keys if n_keys > 0 else n_unique_categories
             query = query.filter(matches__gte=n_req_tags)
 
         return query
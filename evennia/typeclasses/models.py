@@ -26,6 +26,8 @@ these to create custom managers.
 
 """
 
+from collections import defaultdict
+
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
@@ -48,6 +50,7 @@ from evennia.typeclasses.attributes import (
     DbHolder,
     InMemoryAttributeBackend,
     ModelAttributeBackend,
+    fill_attribute_caches,
 )
 from evennia.typeclasses.tags import (
     AliasHandler,
@@ -56,6 +59,7 @@ from evennia.typeclasses.tags import (
     TagCategoryProperty,
     TagHandler,
     TagProperty,
+    fill_tag_caches,
 )
 from evennia.utils.idmapper.models import SharedMemoryModel, SharedMemoryModelBase
 from evennia.utils.logger import log_trace
@@ -91,6 +95,44 @@ def remove_attributes_on_delete(sender, instance, **kwargs):
     instance.db_attributes.all().delete()
 
 
+def prefetch_handlers(objs, attributes=True, tags=True, categories=None):
+    """
+    Load the Attributes and/or Tags of many typeclassed entities with one database
+    query each, instead of every entity querying for its own on first access. Use
+    this before looping over a collection of entities, like the contents of a room,
+    that will all be checked for the same Attributes or Tags.
+
+    Args:
+        objs (iterable): The entities to prefetch for. Entities of different types
+            (like Objects and Accounts) are queried separately.
+        attributes (bool, optional): Prefetch Attributes (`.attributes`/`.db`).
+        tags (bool, optional): Prefetch Tags, aliases and permissions.
+        categories (list, optional): Only prefetch Attributes and Tags of these
+            categories (`None` meaning those without a category). If not given,
+            everything is prefetched.
+
+    Notes:
+        Entities whose caches are already filled are skipped, so this is cheap to
+        call repeatedly. Nothing is done if `settings.TYPECLASS_AGGRESSIVE_CACHE`
+        is off.
+
+    """
+    if not _TYPECLASS_AGGRESSIVE_CACHE:
+        return
+    objs_by_dbclass = defaultdict(list)
+    for obj in objs:
+        if obj.pk:
+            objs_by_dbclass[obj.__dbclass__].append(obj)
+    for dbobjs in objs_by_dbclass.values():
+        if attributes:
+            fill_attribute_caches([obj.attributes.backend for obj in dbobjs], categories)
+        if tags:
+            fill_tag_caches(
+                [handler for obj in dbobjs for handler in (obj.tags, obj.aliases, obj.permissions)],
+                categories,
+            )
+
+
 # ------------------------------------------------------------
 #
 # Typed Objects
@@ -515,6 +557,45 @@ class TypedObject(SharedMemoryModel):
         # a normal flush
         return True
 
+    def at_idmapper_evict(self):
+        """
+        This is called when the idmapper cache is too big and this object is
+        among the least recently used ones.
+
+        Returns:
+            bool: If the object may be evicted from the cache. Objects with
+                non-persistent Attributes (which would be lost) or connected
+                Sessions are kept.
+
+        """
+        nattributes = self.__dict__.get("nattributes")
+        if nattributes and nattributes.all():
+            return False
+        sessions = getattr(self, "sessions", None)
+        if sessions is not None and sessions.count():
+            return False
+        return True
+
+    def get_idmapper_references(self):
+        """
+        Get the other cached instances this object holds references to, so
+        they are kept in the idmapper cache as long as this object is.
+
+        Returns:
+            list: The referenced instances, including Attributes and Tags cached
+                by this object's handlers.
+
+        """
+        references = super().get_idmapper_references()
+        attributes = self.__dict__.get("attributes")
+        if attributes:
+            references.extend(attr for attr in attributes.backend._cache.values() if attr)
+        for handlername in ("tags", "aliases", "permissions"):
+            handler = self.__dict__.get(handlername)
+            if handler:
+                references.extend(tag for tag in handler._cache.values() if tag)
+        return references
+
     #
     # Object manipulation methods
     #
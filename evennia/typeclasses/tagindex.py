@@ -0,0 +1,282 @@
+"""
+Tag index
+
+This is an optional in-memory reverse index of the Tags (including aliases and
+permissions) of all entities of a given type (like all Objects or Accounts),
+mapping each tag to the ids of the entities having it. It is used by
+`TypedObjectManager.get_by_tag` (and so `get_by_alias`, `get_by_permission`
+and `evennia.search_tag`) to find the matching entities without joining the
+tag tables in the database. It is activated with `settings.SEARCH_TAG_INDEX`.
+
+The index is built on first use and then kept up-to-date by the `TagHandler`
+(`add`, `remove`, `clear` and the batch-methods using them) and by listening
+to the deleting of entities. Tags changed in other ways (like directly on the
+`db_tags` field, with `QuerySet.update` or by another process) are not seen
+by the index; use `server/checkindex` to find such differences and
+`server/reindex` to rebuild it.
+
+"""
+
+import sys
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models.signals import post_delete
+
+_TAG_INDEXES = {}
+
+
+def _clean(name):
+    return name.strip().lower() if name else None
+
+
+class TagIndex:
+    """
+    Reverse index of the tags of all entities of one database model.
+
+    """
+
+    def __init__(self, model):
+        """
+        Args:
+            model (Model): The database model (like `ObjectDB`) to index.
+
+        """
+        self.model = model
+        self.model_name = model.__name__.lower()
+        self.built = False
+        self.reset()
+
+    def reset(self):
+        """
+        Empty the index. It will be rebuilt on next use.
+
+        """
+        self.built = False
+        # {(tagtype, key, category): set(ids)}
+        self._tags = defaultdict(set)
+        # {(tagtype, category): set(keys)}, for category-only lookups
+        self._categories = defaultdict(set)
+        # {id: set((tagtype, key, category))}, for clearing an entity's tags
+        self._entities = defaultdict(set)
+
+    def _query_all(self):
+        """
+        Get all tags of this model from the database.
+
+        Returns:
+            iterable: `(id, key, category, tagtype)` for every tagged entity.
+
+        """
+        return (
+            self.model.db_tags.through.objects.filter(tag__db_model__iexact=self.model_name)
+            .values_list(
+                f"{self.model_name}_id", "tag__db_key", "tag__db_category", "tag__db_tagtype"
+            )
+            .iterator(chunk_size=10000)
+        )
+
+    def build(self):
+        """
+        Build the index from the database.
+
+        """
+        self.reset()
+        for dbid, key, category, tagtype in self._query_all():
+            self._add(dbid, (_clean(tagtype), _clean(key), _clean(category)))
+        self.built = True
+
+    # updating
+
+    def _add(self, dbid, tag):
+        self._tags[tag].add(dbid)
+        self._categories[(tag[0], tag[2])].add(tag[1])
+        self._entities[dbid].add(tag)
+
+    def _remove(self, dbid, tag):
+        dbids = self._tags.get(tag)
+        if dbids is not None:
+            dbids.discard(dbid)
+            if not dbids:
+                del self._tags[tag]
+                catkey = (tag[0], tag[2])
+                self._categories[catkey].discard(tag[1])
+                if not self._categories[catkey]:
+                    del self._categories[catkey]
+        tags = self._entities.get(dbid)
+        if tags is not None:
+            tags.discard(tag)
+            if not tags:
+                del self._entities[dbid]
+
+    def add(self, dbid, key, category=None, tagtype=None):
+        """
+        Add a tag to an entity in the index.
+
+        Args:
+            dbid (int): The database id of the entity.
+            key (str): The tag key.
+            category (str, optional): The tag category.
+            tagtype (str, optional): The tag type, like `None`, "alias" or "permission".
+
+        """
+        if self.built:
+            self._add(dbid, (_clean(tagtype), _clean(key), _clean(category)))
+
+    def remove(self, dbid, key, category=None, tagtype=None):
+        """
+        Remove a tag from an entity in the index.
+
+        Args:
+            dbid (int): The database id of the entity.
+            key (str): The tag key.
+            category (str, optional): The tag category.
+            tagtype (str, optional): The tag type.
+
+        """
+        if self.built:
+            self._remove(dbid, (_clean(tagtype), _clean(key), _clean(category)))
+
+    def clear(self, dbid, tagtype=None, category=None, all_tagtypes=False):
+        """
+        Remove tags from an entity in the index.
+
+        Args:
+            dbid (int): The database id of the entity.
+            tagtype (str, optional): Only remove tags of this type.
+            category (str, optional): Only remove tags of this category. If not
+                given, tags of all categories are removed.
+            all_tagtypes (bool, optional): Remove the tags of all types (and
+                categories), like when the entity is deleted.
+
+        """
+        if not self.built:
+            return
+        tagtype, category = _clean(tagtype), _clean(category)
+        for tag in list(self._entities.get(dbid, ())):
+            if all_tagtypes or (tag[0] == tagtype and (not category or tag[2] == category)):
+                self._remove(dbid, tag)
+
+    # searching
+
+    def search(self, keys, categories, tagtype=None):
+        """
+        Search the index. This matches the same as `TypedObjectManager.get_by_tag`.
+
+        Args:
+            keys (list): Tag keys to match. May be empty, to match only on categories.
+            categories (list): If `keys` are given, the category of each key.
+                Otherwise the categories to match.
+            tagtype (str, optional): The tag type.
+
+        Returns:
+            Counter: `{id: matches}` for all entities having any of the tags, where
+                `matches` is the number of the tags they have.
+
+        """
+        if not self.built:
+            self.build()
+        tagtype = _clean(tagtype)
+        if keys:
+            tags = set(
+                (tagtype, _clean(key), _clean(category)) for key, category in zip(keys, categories)
+            )
+        else:
+            tags = set(
+                (tagtype, key, category)
+                for category in set(_clean(category) for category in categories)
+                for key in self._categories.get((tagtype, category), ())
+            )
+        matches = Counter()
+        for tag in tags:
+            matches.update(self._tags.get(tag, ()))
+        return matches
+
+    # info
+
+    def check(self):
+        """
+        Compare the index with the database.
+
+        Returns:
+            tuple: `(missing, extra)`, each a sorted list of
+                `(id, tagtype, key, category)` that are in the database but not in
+                the index and in the index but not in the database, respectively.
+
+        """
+        if not self.built:
+            return [], []
+        indexed = set((dbid, *tag) for tag, dbids in self._tags.items() for dbid in dbids)
+        stored = set(
+            (dbid, _clean(tagtype), _clean(key), _clean(category))
+            for dbid, key, category, tagtype in self._query_all()
+        )
+
+        def _sortkey(entry):
+            return tuple("" if part is None else str(part) for part in entry)
+
+        return (
+            sorted(stored - indexed, key=_sortkey),
+            sorted(indexed - stored, key=_sortkey),
+        )
+
+    def memory_usage(self):
+        """
+        Estimate the memory used by the index.
+
+        Returns:
+            int: Approximate memory use in bytes.
+
+        """
+        getsize = sys.getsizeof
+        size = getsize(self._tags) + getsize(self._categories) + getsize(self._entities)
+        for lookup in (self._tags, self._categories, self._entities):
+            for name, entries in lookup.items():
+                size += getsize(name) + getsize(entries)
+        return size
+
+    def stats(self):
+        """
+        Get statistics about the index.
+
+        Returns:
+            dict: With keys `entities`, `tags` and `memory` (approximate, in bytes).
+
+        """
+        return {
+            "entities": len(self._entities),
+            "tags": len(self._tags),
+            "memory": self.memory_usage(),
+        }
+
+
+def _on_post_delete(sender, instance, **kwargs):
+    """
+    Remove the tags of a deleted entity from the index.
+
+    """
+    index = _TAG_INDEXES.get(getattr(instance, "__dbclass__", None))
+    if index:
+        index.clear(instance.id, all_tagtypes=True)
+
+
+def get_tag_index(model):
+    """
+    Get the tag index for a model, if the index is active.
+
+    Args:
+        model (Model): The database model, like `ObjectDB` or `AccountDB`.
+
+    Returns:
+        TagIndex or None: The index, or `None` if `settings.SEARCH_TAG_INDEX`
+            is not set.
+
+    """
+    if not settings.SEARCH_TAG_INDEX:
+        return None
+    index = _TAG_INDEXES.get(model)
+    if index is None:
+        if not _TAG_INDEXES:
+            post_delete.connect(_on_post_delete, dispatch_uid="evennia-tag-index-delete")
+        index = _TAG_INDEXES[model] = TagIndex(model)
+    return index
@@ -15,6 +15,9 @@ from collections import defaultdict
 from django.conf import settings
 from django.db import models
 from evennia.locks.lockfuncs import perm as perm_lockfunc
+from evennia.locks.lockhandler import invalidate_lock_cache
+from evennia.typeclasses.keyindex import get_key_index
+from evennia.typeclasses.tagindex import get_tag_index
 from evennia.utils.utils import make_iter, to_str
 
 _TYPECLASS_AGGRESSIVE_CACHE = settings.TYPECLASS_AGGRESSIVE_CACHE
@@ -335,8 +338,20 @@ class TagHandler(object):
         """
         if not _TYPECLASS_AGGRESSIVE_CACHE:
             return
-        tags = self._query_all()
-        self._cache = dict(
+        self._fill_cache(self._query_all())
+
+    def _fill_cache(self, tags, categories=None):
+        """
+        Fill the cache with all tags of this object.
+
+        Args:
+            tags (list): All `Tag`s of this handler's type on the object.
+            categories (list, optional): If given, `tags` are instead all `Tag`s of
+                these (cleaned) categories, and only those categories are marked
+                as cached.
+
+        """
+        cache = dict(
             (
                 "%s-%s"
                 % (
@@ -347,7 +362,13 @@ class TagHandler(object):
             )
             for tag in tags
         )
-        self._cache_complete = True
+        if categories is None:
+            self._cache = cache
+            self._cache_complete = True
+        else:
+            self._cache.update(cache)
+            for category in categories:
+                self._catcache["-%s" % category] = True
 
     def _getcache(self, key=None, category=None):
         """
@@ -383,6 +404,11 @@ class TagHandler(object):
                 del self._cache[cachekey]
             if tag:
                 return [tag]  # return cached entity
+            elif _TYPECLASS_AGGRESSIVE_CACHE and (
+                self._cache_complete or "-%s" % category in self._catcache
+            ):
+                # a fully cached object (or category) has no uncached tags
+                return []
             else:
                 query = {
                     "%s__id" % self._model: self._objid,
@@ -420,7 +446,7 @@ class TagHandler(object):
                 ]
                 if _TYPECLASS_AGGRESSIVE_CACHE:
                     for tag in tags:
-                        cachekey = "%s-%s" % (tag.db_key, category)
+                        cachekey = "%s-%s" % (to_str(tag.db_key).lower(), category)
                         self._cache[cachekey] = tag
                     # mark category cache as up-to-date
                     self._catcache[catkey] = True
@@ -437,6 +463,8 @@ class TagHandler(object):
             tag_obj (tag): The newly saved tag
 
         """
+        # cached lock results may depend on tags and permissions
+        invalidate_lock_cache()
         if not _TYPECLASS_AGGRESSIVE_CACHE:
             return
         if not key:  # don't allow an empty key in cache
@@ -461,6 +489,7 @@ class TagHandler(object):
             category (str or None): A cleaned category name
 
         """
+        invalidate_lock_cache()
         key, category = (
             str(key).strip().lower(),
             category.strip().lower() if category else category,
@@ -480,6 +509,7 @@ class TagHandler(object):
         Reset the cache from the outside.
 
         """
+        invalidate_lock_cache()
         self._cache_complete = False
         self._cache = {}
         self._catcache = {}
@@ -506,6 +536,7 @@ class TagHandler(object):
             return
         if not self._cache_complete:
             self._fullcache()
+        index = get_tag_index(self.obj.__dbclass__)
         for tagstr in make_iter(key):
             if not tagstr:
                 continue
@@ -520,6 +551,8 @@ class TagHandler(object):
             )
             getattr(self.obj, self._m2m_fieldname).add(tagobj)
             self._setcache(tagstr, category, tagobj)
+            if index:
+                index.add(self.obj.id, tagstr, category, self._tagtype)
 
     def has(self, key=None, category=None, return_list=False):
         """
@@ -642,6 +675,9 @@ class TagHandler(object):
             )
             if tagobj:
                 getattr(self.obj, self._m2m_fieldname).remove(tagobj[0])
+                index = get_tag_index(self.obj.__dbclass__)
+                if index:
+                    index.remove(self.obj.id, tagstr, category, self._tagtype)
             self._delcache(key, category)
 
     def clear(self, category=None):
@@ -664,6 +700,10 @@ class TagHandler(object):
         if category:
             query["tag__db_category"] = category.strip().lower()
         getattr(self.obj, self._m2m_fieldname).through.objects.filter(**query).delete()
+        index = get_tag_index(self.obj.__dbclass__)
+        if index:
+            index.clear(self.obj.id, tagtype=self._tagtype, category=category)
+        invalidate_lock_cache()
         self._cache = {}
         self._catcache = {}
         self._cache_complete = False
@@ -754,6 +794,61 @@ class TagHandler(object):
         return ",".join(self.all())
 
 
+def fill_tag_caches(handlers, categories=None):
+    """
+    Cache the tags of many tag handlers using one database query, instead of
+    one query per handler.
+
+    Args:
+        handlers (list): `TagHandler`s to cache. These must all be on entities of
+            the same type (like all Objects) but may be of different types (like
+            both `TagHandler`s and `AliasHandler`s). Handlers already cached are
+            skipped.
+        categories (list, optional): Only cache tags of these categories (`None`
+            meaning tags without a category). If not given, all tags are cached.
+
+    """
+    if not _TYPECLASS_AGGRESSIVE_CACHE:
+        return
+    if categories is not None:
+        categories = [category.strip().lower() if category else None for category in categories]
+    handlers = [
+        handler
+        for handler in handlers
+        if handler._objid
+        and not handler._cache_complete
+        and (
+            categories is None
+            or any("-%s" % category not in handler._catcache for category in categories)
+        )
+    ]
+    if not handlers:
+        return
+    handler = handlers[0]
+    model = handler._model
+    through = getattr(handler.obj, handler._m2m_fieldname).through
+    typequery = models.Q()
+    for tagtype in set(handler._tagtype for handler in handlers):
+        typequery |= models.Q(tag__db_tagtype=tagtype)
+    query = through.objects.filter(
+        typequery,
+        **{
+            "%s__id__in" % model: set(handler._objid for handler in handlers),
+            "tag__db_model": model,
+        },
+    )
+    if categories is not None:
+        catquery = models.Q()
+        for category in categories:
+            catquery |= models.Q(tag__db_category__iexact=category)
+        query = query.filter(catquery)
+    tags_by_key = defaultdict(list)
+    for conn in query.select_related("tag"):
+        tags_by_key[(getattr(conn, "%s_id" % model), conn.tag.db_tagtype)].append(conn.tag)
+    for handler in handlers:
+        handler._fill_cache(tags_by_key[(handler._objid, handler._tagtype)], categories=categories)
+
+
 class AliasProperty(TagProperty):
     """
     Allows for setting aliases like Django fields:
@@ -778,6 +873,26 @@ class AliasHandler(TagHandler):
 
     _tagtype = "alias"
 
+    def _setcache(self, key, category, tag_obj):
+        super()._setcache(key, category, tag_obj)
+        # keep the search index up-to-date
+        index = get_key_index(self.obj.__dbclass__)
+        if index and key:
+            index.add_alias(self.obj, str(key).strip())
+
+    def _delcache(self, key, category):
+        super()._delcache(key, category)
+        index = get_key_index(self.obj.__dbclass__)
+        if index and index.built:
+            # the same alias could remain in another category
+            index.update(self.obj, aliases=self.all())
+
+    def clear(self, category=None):
+        super().clear(category=category)
+        index = get_key_index(self.obj.__dbclass__)
+        if index and index.built:
+            index.update(self.obj, aliases=self.all() if category else [])
+
 
 class PermissionProperty(TagProperty):
     """
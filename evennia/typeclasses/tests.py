@@ -7,7 +7,12 @@ from django.test import override_settings
 from mock import patch
 from parameterized import parameterized
 
+from evennia.accounts.models import AccountDB
+from evennia.objects.models import ObjectDB
 from evennia.objects.objects import DefaultObject
+from evennia.typeclasses import keyindex, tagindex
+from evennia.typeclasses.models import prefetch_handlers
+from evennia.utils import create
 from evennia.utils.test_resources import BaseEvenniaTest, EvenniaTestCase
 
 # ------------------------------------------------------------
@@ -345,6 +350,237 @@ class TestTags(BaseEvenniaTest):
         )
 
 
+class TestPrefetchHandlers(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.obj1.db.testattr = "value1"
+        self.obj1.attributes.add("catattr", "value2", category="testcat")
+        self.obj2.db.testattr = "value3"
+        self.obj1.tags.add("tagA")
+        self.obj1.tags.add("tagB", category="testcat")
+        self.obj2.aliases.add("alias2")
+        self.objs = [self.obj1, self.obj2]
+        for obj in self.objs:
+            for handler in (obj.attributes, obj.tags, obj.aliases, obj.permissions):
+                handler.reset_cache()
+
+    def test_prefetch_all(self):
+        with self.assertNumQueries(2):
+            prefetch_handlers(self.objs)
+        with self.assertNumQueries(0):
+            prefetch_handlers(self.objs)
+            self.assertEqual(self.obj1.db.testattr, "value1")
+            self.assertEqual(self.obj1.attributes.get("catattr", category="testcat"), "value2")
+            self.assertEqual(self.obj2.db.testattr, "value3")
+            self.assertIsNone(self.obj2.db.missing)
+            self.assertTrue(self.obj1.tags.has("tagA"))
+            self.assertTrue(self.obj1.tags.has("tagB", category="testcat"))
+            self.assertFalse(self.obj2.tags.has("tagA"))
+            self.assertIn("alias2", self.obj2.aliases.all())
+            self.assertNotIn("alias2", self.obj1.aliases.all())
+
+    def test_prefetch_categories(self):
+        with self.assertNumQueries(2):
+            prefetch_handlers(self.objs, categories=["testcat"])
+        with self.assertNumQueries(0):
+            prefetch_handlers(self.objs, categories=["testcat"])
+            self.assertEqual(self.obj1.attributes.get("catattr", category="testcat"), "value2")
+            self.assertIsNone(self.obj2.attributes.get("catattr", category="testcat"))
+            self.assertEqual(self.obj1.tags.get(category="testcat"), "tagb")
+            self.assertFalse(self.obj2.tags.has("tagB", category="testcat"))
+        # other categories are still looked up in the database
+        with self.assertNumQueries(1):
+            self.assertEqual(self.obj1.db.testattr, "value1")
+
+    def test_prefetch_attributes_only(self):
+        with self.assertNumQueries(1):
+            prefetch_handlers(self.objs, tags=False)
+        self.assertFalse(self.obj1.tags._cache_complete)
+
+    @patch("evennia.typeclasses.models._TYPECLASS_AGGRESSIVE_CACHE", False)
+    def test_no_aggressive_cache(self):
+        with self.assertNumQueries(0):
+            prefetch_handlers(self.objs)
+
+
+class TestIdmapperEviction(BaseEvenniaTest):
+    def test_at_idmapper_evict(self):
+        self.assertTrue(self.obj1.at_idmapper_evict())
+        self.obj1.ndb.test = "value"
+        self.assertFalse(self.obj1.at_idmapper_evict())
+        # puppeted
+        self.assertFalse(self.char1.at_idmapper_evict())
+
+    def test_get_idmapper_references(self):
+        self.obj1.db.testattr = "value"
+        self.obj1.tags.add("testtag")
+        self.obj1.location
+        references = self.obj1.get_idmapper_references()
+        self.assertIn(self.obj1.attributes.get("testattr", return_obj=True), references)
+        self.assertIn(self.obj1.tags.get("testtag", return_tagobj=True), references)
+        self.assertIn(self.room1, references)
+
+
+@override_settings(SEARCH_KEY_INDEX=True)
+@patch("evennia.typeclasses.keyindex._KEY_INDEXES", new_callable=dict)
+class TestKeyIndex(BaseEvenniaTest):
+    def _compare(self, ostring, exact=True, typeclasses=None):
+        """Compare search with the index to a database search"""
+        index = keyindex.get_key_index(ObjectDB)
+        with self.settings(SEARCH_KEY_INDEX=False):
+            expected = list(
+                ObjectDB.objects.get_objs_with_key_or_alias(
+                    ostring, exact=exact, typeclasses=typeclasses
+                )
+            )
+        with patch.object(index, "search", wraps=index.search) as mock_search:
+            result = list(
+                ObjectDB.objects.get_objs_with_key_or_alias(
+                    ostring, exact=exact, typeclasses=typeclasses
+                )
+            )
+            mock_search.assert_called_once()
+        self.assertEqual(result, expected, f"mismatch for {ostring} (exact={exact})")
+
+    def test_search(self, mock_indexes):
+        self.obj1.key = "big sword"
+        self.obj2.key = "shiny Sword"
+        self.char1.aliases.add("Test alias")
+        for ostring, exact, typeclasses in (
+            ("Char", True, None),
+            ("char", True, ["evennia.objects.objects.DefaultObject"]),
+            ("test alias", True, None),
+            ("sw", False, None),
+            ("wor", False, None),
+            ("b sw", False, None),
+            ("sw b", False, None),
+            ("sh sw", False, ["evennia.objects.objects.DefaultObject"]),
+            ("test al", False, None),
+        ):
+            self._compare(ostring, exact, typeclasses)
+
+    def test_update(self, mock_indexes):
+        index = keyindex.get_key_index(ObjectDB)
+        index.build()
+        nentities = index.stats()["entities"]
+
+        self.obj1.key = "rusty dagger"
+        self.assertEqual(index.search("rusty dagger"), [self.obj1.id])
+        self.assertEqual(index.search("Obj"), [])
+        self.assertEqual(index.search("ru da", match="words"), [self.obj1.id])
+
+        self.obj1.aliases.add("knife")
+        self.assertEqual(index.search("kni", match="words"), [self.obj1.id])
+        self.obj1.aliases.remove("knife")
+        self.assertEqual(index.search("kni", match="words"), [])
+        self.obj1.aliases.add(["knife", "blade"])
+        self.obj1.aliases.clear()
+        self.assertEqual(index.search("knife"), [])
+        self.assertEqual(index.search("blade"), [])
+
+        obj = create.create_object(DefaultObject, key="new object", aliases=["thing"])
+        self.assertEqual(index.search("new object"), [obj.id])
+        self.assertEqual(index.search("thing"), [obj.id])
+        self.assertEqual(index.stats()["entities"], nentities + 1)
+        obj.delete()
+        self.assertEqual(index.search("new object"), [])
+        self.assertEqual(index.search("thi", match="words"), [])
+        self.assertEqual(index.stats()["entities"], nentities)
+        self.assertGreater(index.memory_usage(), 0)
+
+    def test_search_account(self, mock_indexes):
+        self.account.aliases.add("tester")
+        for ostring, exact in (("TestAccount", True), ("estacc", False), ("tester", True)):
+            with self.settings(SEARCH_KEY_INDEX=False):
+                expected = list(AccountDB.objects.search_account(ostring, exact=exact))
+            self.assertEqual(list(AccountDB.objects.search_account(ostring, exact=exact)), expected)
+            self.assertTrue(expected)
+
+
+@override_settings(SEARCH_TAG_INDEX=True)
+@patch("evennia.typeclasses.tagindex._TAG_INDEXES", new_callable=dict)
+class TestTagIndex(BaseEvenniaTest):
+    def _compare(self, **kwargs):
+        """Compare get_by_tag with the index to a database search"""
+        index = tagindex.get_tag_index(ObjectDB)
+        with self.settings(SEARCH_TAG_INDEX=False):
+            expected = [(obj, obj.matches) for obj in ObjectDB.objects.get_by_tag(**kwargs)]
+        with patch.object(index, "search", wraps=index.search) as mock_search:
+            result = [(obj, obj.matches) for obj in ObjectDB.objects.get_by_tag(**kwargs)]
+            mock_search.assert_called_once()
+        self.assertEqual(result, expected, f"mismatch for {kwargs}")
+        return result
+
+    def test_get_by_tag(self, mock_indexes):
+        self.obj1.tags.add("red", category="color")
+        self.obj1.tags.add("big")
+        self.obj2.tags.add("Red", category="Color")
+        self.obj2.tags.add("round", category="shape")
+        self.char1.tags.add("big")
+        self.char1.aliases.add("large")
+        for kwargs in (
+            {"key": "red", "category": "color"},
+            {"key": "RED", "category": "color"},
+            {"key": "red"},
+            {"key": "big"},
+            {"key": "large", "tagtype": "alias"},
+            {"key": ["red", "big"], "category": ["color", None]},
+            {"key": ["red", "big"], "category": ["color", None], "match": "any"},
+            {"key": ["red", "round"], "category": ["color", "shape"], "match": "any"},
+            {"category": "color"},
+            {"category": ["color", "shape"]},
+            {"category": ["color", "shape"], "match": "any"},
+            {"key": "missing"},
+        ):
+            self._compare(**kwargs)
+        self.assertEqual(
+            self._compare(key=["red", "round"], category=["color", "shape"], match="any"),
+            [(self.obj2, 2), (self.obj1, 1)],
+        )
+
+    def test_update(self, mock_indexes):
+        index = tagindex.get_tag_index(ObjectDB)
+        index.build()
+
+        def _search(key, category=None, tagtype=None):
+            return sorted(index.search([key], [category], tagtype=tagtype))
+
+        self.obj1.tags.add("zone1", category="zone")
+        self.obj1.tags.batch_add(("faction1", "faction"), ("faction2", "faction"))
+        self.assertEqual(_search("zone1", "zone"), [self.obj1.id])
+        self.assertEqual(_search("faction2", "faction"), [self.obj1.id])
+        self.obj1.tags.remove("zone1", category="zone")
+        self.assertEqual(_search("zone1", "zone"), [])
+        self.obj1.tags.clear(category="faction")
+        self.assertEqual(_search("faction1", "faction"), [])
+        self.obj1.permissions.add("Builder")
+        self.assertEqual(_search("builder", tagtype="permission"), [self.obj1.id])
+        self.obj1.permissions.clear()
+        self.assertEqual(_search("builder", tagtype="permission"), [])
+
+        obj = create.create_object(DefaultObject, key="new object", tags=[("spawn", "point")])
+        self.assertEqual(_search("spawn", "point"), [obj.id])
+        obj.delete()
+        self.assertEqual(_search("spawn", "point"), [])
+        self.assertEqual(index.check(), ([], []))
+        self.assertGreater(index.memory_usage(), 0)
+
+    def test_check(self, mock_indexes):
+        index = tagindex.get_tag_index(ObjectDB)
+        index.build()
+        self.obj1.tags.add("indexed")
+        # bypassing the TagHandler is not seen by the index
+        tag = ObjectDB.objects.create_tag(key="unindexed")
+        self.obj2.db_tags.add(tag)
+        self.obj1.db_tags.remove(self.obj1.tags.get("indexed", return_tagobj=True))
+        self.assertEqual(
+            index.check(),
+            ([(self.obj2.id, None, "unindexed", None)], [(self.obj1.id, None, "indexed", None)]),
+        )
+        index.build()
+        self.assertEqual(index.check(), ([], []))
+
+
 class TestNickHandler(BaseEvenniaTest):
     """
     Test the nick handler replacement.
@@ -64,6 +64,8 @@ Xterm256 greyscale:
 
 import functools
 import re
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import OrderedDict
 
 from django.conf import settings
@@ -127,9 +129,93 @@ ANSI_ESCAPES = ("{{", r"\\", r"\|\|")
 
 _PARSE_CACHE = OrderedDict()
 _PARSE_CACHE_SIZE = 10000
+# tokens of recently parsed strings, shared between parsings with different flags
+_TOKENIZE_CACHE = OrderedDict()
 
 _COLOR_NO_DEFAULT = settings.COLOR_NO_DEFAULT
 
+# max number of markup tokens to remember the output of
+_TOKEN_CACHE_SIZE = 10000
+
+
+def _first_chars(regexes):
+    """
+    Get the characters that matches of any of the given regexes start with, if
+    this can be told from the start of each regex.
+
+    Args:
+        regexes (list): Regex strings.
+
+    Returns:
+        str: A regex lookahead for the first characters, or "" if they can't be told.
+
+    """
+    chars = set()
+    for regex in regexes:
+        if regex[:1] == "\\" and len(regex) > 1 and not regex[1].isalnum():
+            chars.add(regex[1])
+        elif regex and regex[0] not in ".^$*+?{}[]\\|()":
+            chars.add(regex[0])
+        else:
+            return ""
+    return "(?=[%s])" % re.escape("".join(sorted(chars))) if chars else ""
+
+
+def _compile_tokenizer(token_types, starts=()):
+    """
+    Combine the regexes of all types of markup into one regex, used to find all
+    markup in a single pass.
+
+    Args:
+        token_types (list): `[(type, regexes), ...]` in order of precedence, where
+            `regexes` is a list of the regexes matching each type of markup.
+        starts (list, optional): Regexes matching the start of all markup. If the
+            first characters of these can be told, the regex engine can skip quickly
+            to the possible markup.
+
+    Returns:
+        tuple: `(regex, {group_index: (type, first_group, ngroups)})`, where
+            `group_index` is the index of the group wrapping each type of markup
+            (its `lastindex` when matched) and `first_group`/`ngroups` give the
+            position of the regex's own groups.
+
+    """
+    patterns = []
+    group_types = {}
+    index = 1
+    for token_type, regexes in token_types:
+        if not regexes:
+            continue
+        regex = "|".join(regexes)
+        ngroups = re.compile(regex).groups
+        patterns.append(f"({regex})")
+        group_types[index] = (token_type, index + 1, ngroups)
+        index += 1 + ngroups
+    # a lookahead for the first characters lets the regex engine skip quickly to
+    # the possible markup
+    lookahead = _first_chars(starts)
+    return re.compile("%s(?:%s)" % (lookahead, "|".join(patterns)), re.DOTALL), group_types
+
+
+class _TokenMatch:
+    """
+    Stand-in for the regex match of a markup token, as passed to the `sub_*`
+    replacer methods.
+
+    """
+
+    __slots__ = ("_text", "_groups")
+
+    def __init__(self, text, groups):
+        self._text = text
+        self._groups = groups
+
+    def group(self, *args):
+        return self._text
+
+    def groups(self):
+        return self._groups
+
 
 class ANSIParser(object):
     """
@@ -238,8 +324,15 @@ class ANSIParser(object):
     mxp_url_re = r"\|lu(.*?)\|lt(.*?)\|le"
 
     # prepare regex matching
+    # the check that a tag is not escaped (preceded by |) is done after matching it,
+    # so the regex engine can skip quickly to the possible tags
     brightbg_sub = re.compile(
-        r"|".join([r"(?<!\|)%s" % re.escape(tup[0]) for tup in ansi_xterm256_bright_bg_map]),
+        r"|".join(
+            [
+                r"%s(?<!\|%s)" % (re.escape(tup[0]), re.escape(tup[0]))
+                for tup in ansi_xterm256_bright_bg_map
+            ]
+        ),
         re.DOTALL,
     )
     xterm256_fg_sub = re.compile(r"|".join(xterm256_fg), re.DOTALL)
@@ -264,9 +357,32 @@ class ANSIParser(object):
     # instance of each
     ansi_escapes = re.compile(r"(%s)" % "|".join(ANSI_ESCAPES), re.DOTALL)
 
+    # all markup except bright backgrounds and escapes, found in one pass. The order
+    # is the one in which the separate regexes above used to be applied.
+    token_regex, token_groups = _compile_tokenizer(
+        [
+            ("hex", [hex_sub.pattern]),
+            ("fg", xterm256_fg),
+            ("bg", xterm256_bg),
+            ("gfg", xterm256_gfg),
+            ("gbg", xterm256_gbg),
+            ("ansi", [re.escape(tup[0]) for tup in ansi_map]),
+        ],
+        starts=[HexColors._RE_FG_OR_BG]
+        + xterm256_fg
+        + xterm256_bg
+        + xterm256_gfg
+        + xterm256_gbg
+        + [re.escape(tup[0]) for tup in ansi_map],
+    )
+
     # tabs/linebreaks |/ and |- should be able to be cleaned
     unsafe_tokens = re.compile(r"\|\/|\|-", re.DOTALL)
 
+    def __init__(self):
+        # {(token, strip_ansi, xterm256, truecolor): output}
+        self._token_cache = {}
+
     def sub_ansi(self, ansimatch):
         """
         Replacer used by `re.sub` to replace ANSI
@@ -445,6 +561,120 @@ class ANSIParser(object):
         """
         return self.unsafe_tokens.sub("", string)
 
+    def _tokenize_part(self, string, tokens):
+        """
+        Tokenize a string without escapes or bright background markup.
+
+        Args:
+            string (str): The string.
+            tokens (list): The tokens are appended to this.
+
+        """
+        group_types = self.token_groups
+        append = tokens.append
+        pos = 0
+        for match in self.token_regex.finditer(string):
+            start, end = match.span()
+            if start == end:
+                continue
+            if start > pos:
+                append(string[pos:start])
+            token_type, first_group, ngroups = group_types[match.lastindex]
+            if ngroups:
+                groups = match.groups()[first_group - 1 : first_group - 1 + ngroups]
+            else:
+                groups = ()
+            append((token_type, match.group(), groups))
+            pos = end
+        if pos < len(string):
+            tokens.append(string[pos:])
+
+    def tokenize(self, string):
+        """
+        Split a string into its markup and plain text.
+
+        Args:
+            string (str): The string to tokenize.
+
+        Returns:
+            list: The tokens, in order. Plain text is given as strings and markup
+            as tuples `(type, text, groups)`, where `type` is one of "hex", "fg",
+            "bg", "gfg", "gbg" or "ansi", `text` is the markup itself and `groups`
+            holds the groups matched by the regex for that type. Escaped markup
+            (like `||`) is returned as plain text. Use `emit` to convert tokens to
+            output.
+
+        """
+        # bright backgrounds are replaced by xterm256 markup first, since this
+        # should not be affected by the escapes.
+        string = self.brightbg_sub.sub(self.sub_brightbg, to_str(string))
+
+        tokens = []
+        parts = self.ansi_escapes.split(string) + [" "]
+        for part, sep in zip(parts[::2], parts[1::2]):
+            if part:
+                self._tokenize_part(part, tokens)
+            sep = sep[0].strip()
+            if sep:
+                tokens.append(sep)
+        return tokens
+
+    def _emit_token(self, token, xterm256=False, truecolor=False):
+        """
+        Get the output of a markup token.
+
+        """
+        token_type, text, groups = token
+        match = _TokenMatch(text, groups)
+        if token_type == "ansi":
+            output = self.sub_ansi(match)
+        elif token_type == "hex":
+            output = hex2truecolor.sub_truecolor(match, truecolor)
+            if not truecolor:
+                # this gives xterm256 markup, to be parsed in turn
+                tokens = []
+                self._tokenize_part(output, tokens)
+                output = self.emit(tokens, xterm256=xterm256, truecolor=truecolor)
+        else:
+            output = self.sub_xterm256(match, xterm256, token_type)
+        return output or ""
+
+    def emit(self, tokens, strip_ansi=False, xterm256=False, truecolor=False):
+        """
+        Convert tokens (from `tokenize`) to ANSI output.
+
+        Args:
+            tokens (list): The tokens.
+            strip_ansi (bool, optional): Leave out all ANSI sequences, giving only
+                the text.
+            xterm256 (bool, optional): If actually using xterm256 or if these values
+                should be converted to 16-color ANSI.
+            truecolor (bool, optional): If actually using truecolor or if these values
+                should be converted to xterm256 (or ANSI).
+
+        Returns:
+            str: The output.
+
+        """
+        cache = self._token_cache
+        output = []
+        for token in tokens:
+            if token.__class__ is str:
+                output.append(token)
+                continue
+            key = (token, strip_ansi, xterm256, truecolor)
+            try:
+                output.append(cache[key])
+            except KeyError:
+                token_output = self._emit_token(token, xterm256=xterm256, truecolor=truecolor)
+                if strip_ansi:
+                    token_output = self.strip_raw_codes(token_output)
+                if len(cache) >= _TOKEN_CACHE_SIZE:
+                    cache.clear()
+                cache[key] = token_output
+                output.append(token_output)
+        return "".join(output)
+
     def parse_ansi(self, string, strip_ansi=False, xterm256=False, mxp=False, truecolor=False):
         """
         Parses a string, subbing color codes according to the stored
@@ -477,46 +707,24 @@ class ANSIParser(object):
         if cachekey in _PARSE_CACHE:
             return _PARSE_CACHE[cachekey]
 
-        # pre-convert bright colors to xterm256 color tags
-        string = self.brightbg_sub.sub(self.sub_brightbg, string)
-
-        def do_truecolor(part: re.Match, truecolor=truecolor):
-            return hex2truecolor.sub_truecolor(part, truecolor)
-
-        def do_xterm256_fg(part):
-            return self.sub_xterm256(part, xterm256, "fg")
-
-        def do_xterm256_bg(part):
-            return self.sub_xterm256(part, xterm256, "bg")
-
-        def do_xterm256_gfg(part):
-            return self.sub_xterm256(part, xterm256, "gfg")
-
-        def do_xterm256_gbg(part):
-            return self.sub_xterm256(part, xterm256, "gbg")
-
         in_string = utils.to_str(string)
+        tokens = _TOKENIZE_CACHE.get(in_string)
+        if tokens is None:
+            tokens = _TOKENIZE_CACHE[in_string] = self.tokenize(in_string)
+            if len(_TOKENIZE_CACHE) > _PARSE_CACHE_SIZE:
+                _TOKENIZE_CACHE.popitem(last=False)
+        parsed_string = self.emit(
+            tokens, strip_ansi=strip_ansi, xterm256=xterm256, truecolor=truecolor
+        )
 
-        # do string replacement
-        parsed_string = []
-        parts = self.ansi_escapes.split(in_string) + [" "]
-        for part, sep in zip(parts[::2], parts[1::2]):
-            pstring = hex_sub.sub(do_truecolor, part)
-            pstring = self.xterm256_fg_sub.sub(do_xterm256_fg, pstring)
-            pstring = self.xterm256_bg_sub.sub(do_xterm256_bg, pstring)
-            pstring = self.xterm256_gfg_sub.sub(do_xterm256_gfg, pstring)
-            pstring = self.xterm256_gbg_sub.sub(do_xterm256_gbg, pstring)
-            pstring = self.ansi_sub.sub(self.sub_ansi, pstring)
-            parsed_string.append("%s%s" % (pstring, sep[0].strip()))
-        parsed_string = "".join(parsed_string)
-
-        if not mxp:
+        if not mxp and "|l" in parsed_string:
             parsed_string = self.strip_mxp(parsed_string)
 
         if strip_ansi:
-            # remove all ansi codes (including those manually
-            # inserted in string)
-            return self.strip_raw_codes(parsed_string)
+            # remove all ansi codes manually inserted in string
+            if "\033" in parsed_string:
+                parsed_string = self.strip_raw_codes(parsed_string)
+            return parsed_string
 
         # cache and crop old cache
         _PARSE_CACHE[cachekey] = parsed_string
@@ -798,7 +1006,8 @@ class ANSIString(str, metaclass=ANSIMeta):
 
         Internally, ANSIString can also passes itself precached code/character
         indexes and clean strings to avoid doing extra work when combining
-        ANSIStrings.
+        ANSIStrings. If only the clean string is given, the indexes are
+        calculated when first needed.
 
         """
         string = args[0]
@@ -809,14 +1018,14 @@ class ANSIString(str, metaclass=ANSIMeta):
         code_indexes = kwargs.pop("code_indexes", None)
         char_indexes = kwargs.pop("char_indexes", None)
         clean_string = kwargs.pop("clean_string", None)
-        # All True, or All False, not just one.
-        checks = [x is None for x in [code_indexes, char_indexes, clean_string]]
-        if not len(set(checks)) == 1:
+        if (code_indexes is None) != (char_indexes is None) or (
+            code_indexes is not None and clean_string is None
+        ):
             raise ValueError(
-                "You must specify code_indexes, char_indexes, "
-                "and clean_string together, or not at all."
+                "You must specify code_indexes and char_indexes together, "
+                "and only along with clean_string."
             )
-        if not all(checks):
+        if clean_string is not None:
             decoded = True
         if not decoded:
             # Completely new ANSI String
@@ -828,8 +1037,8 @@ class ANSIString(str, metaclass=ANSIMeta):
         elif hasattr(string, "_clean_string"):
             # It's already an ANSIString
             clean_string = string._clean_string
-            code_indexes = string._code_indexes
-            char_indexes = string._char_indexes
+            code_indexes = string._code_index_map
+            char_indexes = string._char_index_map
             string = string._raw_string
         else:
             # It's a string that has been pre-ansi decoded.
@@ -841,8 +1050,8 @@ class ANSIString(str, metaclass=ANSIMeta):
         ansi_string = super().__new__(ANSIString, to_str(clean_string))
         ansi_string._raw_string = string
         ansi_string._clean_string = clean_string
-        ansi_string._code_indexes = code_indexes
-        ansi_string._char_indexes = char_indexes
+        ansi_string._code_index_map = code_indexes
+        ansi_string._char_index_map = char_indexes
         return ansi_string
 
     def __str__(self):
@@ -914,45 +1123,46 @@ class ANSIString(str, metaclass=ANSIMeta):
         The third thing to set is the _clean_string. This is a string that is
         devoid of all ANSI Escapes.
 
-        Finally, _code_indexes and _char_indexes are defined. These are lookup
+        Finally there are _code_indexes and _char_indexes. These are lookup
         tables for which characters in the raw string are related to ANSI
-        escapes, and which are for the readable text.
+        escapes, and which are for the readable text. They are only needed
+        for positional operations like indexing and slicing, so they are not
+        calculated until first used.
 
         """
         self.parser = kwargs.pop("parser", ANSI_PARSER)
         super().__init__()
-        if self._code_indexes is None:
-            self._code_indexes, self._char_indexes = self._get_indexes()
 
-    @staticmethod
-    def _shifter(iterable, offset):
+    @property
+    def _code_indexes(self):
+        """
+        The indexes of all ANSI escape characters in the raw string.
+
+        """
+        if self._code_index_map is None:
+            self._code_index_map, self._char_index_map = self._get_indexes()
+        return self._code_index_map
+
+    @property
+    def _char_indexes(self):
         """
-        Takes a list of integers, and produces a new one incrementing all
-        by a number.
+        The indexes of all readable characters in the raw string.
 
         """
-        if not offset:
-            return iterable
-        return [i + offset for i in iterable]
+        if self._char_index_map is None:
+            self._code_index_map, self._char_index_map = self._get_indexes()
+        return self._char_index_map
 
     @classmethod
     def _adder(cls, first, second):
         """
-        Joins two ANSIStrings, preserving calculated info.
+        Joins two ANSIStrings without parsing them again. The indexes of the
+        result are calculated only if needed.
 
         """
-
-        raw_string = first._raw_string + second._raw_string
-        clean_string = first._clean_string + second._clean_string
-        code_indexes = first._code_indexes[:]
-        char_indexes = first._char_indexes[:]
-        code_indexes.extend(cls._shifter(second._code_indexes, len(first._raw_string)))
-        char_indexes.extend(cls._shifter(second._char_indexes, len(first._raw_string)))
         return ANSIString(
-            raw_string,
-            code_indexes=code_indexes,
-            char_indexes=char_indexes,
-            clean_string=clean_string,
+            first._raw_string + second._raw_string,
+            clean_string=first._clean_string + second._clean_string,
         )
 
     def __add__(self, other):
@@ -1004,6 +1214,7 @@ class ANSIString(str, metaclass=ANSIMeta):
 
         """
         char_indexes = self._char_indexes
+        raw_string = self._raw_string
         slice_indexes = char_indexes[slc]
         # If it's the end of the string, we need to append final color codes.
         if not slice_indexes:
@@ -1026,20 +1237,20 @@ class ANSIString(str, metaclass=ANSIMeta):
         except IndexError:
             return ANSIString("")
         last_mark = slice_indexes[0]
-        # Check between the slice intervals for escape sequences.
         i = None
-        for i in slice_indexes[1:]:
-            for index in range(last_mark, i):
-                if index in self._code_indexes:
-                    string += self._raw_string[index]
-            last_mark = i
-            try:
-                string += self._raw_string[i]
-            except IndexError:
-                # raw_string not long enough
-                pass
+        if len(slice_indexes) > 1:
+            i = slice_indexes[-1]
+            if slc.step in (None, 1):
+                # a continuous slice - all escape sequences between the first and
+                # last characters are included as they are
+                string += raw_string[last_mark + 1 : i + 1]
+            else:
+                # Check between the slice intervals for escape sequences.
+                for index in slice_indexes[1:]:
+                    string += self._get_codes(last_mark, index) + raw_string[index]
+                    last_mark = index
         if i is not None:
-            append_tail = self._get_interleving(char_indexes.index(i) + 1)
+            append_tail = self._get_interleving(bisect_left(char_indexes, i) + 1)
         else:
             append_tail = ""
         return ANSIString(string + append_tail, decoded=True)
@@ -1055,25 +1266,21 @@ class ANSIString(str, metaclass=ANSIMeta):
         if isinstance(item, slice):
             # Slices must be handled specially.
             return self._slice(item)
+        char_indexes = self._char_indexes
         try:
-            self._char_indexes[item]
+            index = char_indexes[item]
         except IndexError:
             raise IndexError("ANSIString Index out of range")
         # Get character codes after the index as well.
-        if self._char_indexes[-1] == self._char_indexes[item]:
+        if char_indexes[-1] == index:
             append_tail = self._get_interleving(item + 1)
         else:
             append_tail = ""
-        item = self._char_indexes[item]
-
-        clean = self._raw_string[item]
-        result = ""
         # Get the character they're after, and replay all escape sequences
         # previous to it.
-        for index in range(0, item + 1):
-            if index in self._code_indexes:
-                result += self._raw_string[index]
-        return ANSIString(result + clean + append_tail, decoded=True)
+        return ANSIString(
+            self._get_codes(0, index) + self._raw_string[index] + append_tail, decoded=True
+        )
 
     def clean(self):
         """
@@ -1143,38 +1350,52 @@ class ANSIString(str, metaclass=ANSIMeta):
         It's possible that only one of these tables is actually needed, the
         other assumed to be what isn't in the first.
 
-        """
-
-        code_indexes = []
-        for match in self.parser.ansi_regex.finditer(self._raw_string):
-            code_indexes.extend(list(range(match.start(), match.end())))
-        if not code_indexes:
+        To save memory, the tables are kept as `array`s of unsigned ints. For a
+        plain string without ANSI codes (a common case), they are `range`s.
+
+        """
+        raw_string = self._raw_string
+        code_indexes = array("I")
+        char_indexes = array("I")
+        pos = 0
+        for match in self.parser.ansi_regex.finditer(raw_string):
+            start, end = match.span()
+            # all indexes not occupied by ansi codes are normal characters
+            char_indexes.extend(range(pos, start))
+            code_indexes.extend(range(start, end))
+            pos = end
+        if not pos:
             # Plain string, no ANSI codes.
-            return code_indexes, list(range(0, len(self._raw_string)))
-        # all indexes not occupied by ansi codes are normal characters
-        char_indexes = [i for i in range(len(self._raw_string)) if i not in code_indexes]
+            return range(0), range(len(raw_string))
+        char_indexes.extend(range(pos, len(raw_string)))
         return code_indexes, char_indexes
 
+    def _get_codes(self, start, end):
+        """
+        Get the ANSI escapes between two indexes of the raw string.
+
+        """
+        if not self._code_indexes:
+            return ""
+        return "".join(self.parser.ansi_regex.findall(self._raw_string, start, end))
+
     def _get_interleving(self, index):
         """
         Get the code characters from the given slice end to the next
         character.
 
         """
+        char_indexes = self._char_indexes
         try:
-            index = self._char_indexes[index - 1]
+            index = char_indexes[index - 1]
         except IndexError:
             return ""
-        s = ""
-        while True:
-            index += 1
-            if index in self._char_indexes:
-                break
-            elif index in self._code_indexes:
-                s += self._raw_string[index]
-            else:
-                break
-        return s
+        next_char = bisect_right(char_indexes, index)
+        if next_char < len(char_indexes):
+            end = char_indexes[next_char]
+        else:
+            end = len(self._raw_string)
+        return self._get_codes(index + 1, end)
 
     def __mul__(self, other):
         """
@@ -1183,19 +1404,7 @@ class ANSIString(str, metaclass=ANSIMeta):
         """
         if not isinstance(other, int):
             return NotImplemented
-        raw_string = self._raw_string * other
-        clean_string = self._clean_string * other
-        code_indexes = self._code_indexes[:]
-        char_indexes = self._char_indexes[:]
-        for i in range(other):
-            code_indexes.extend(self._shifter(self._code_indexes, i * len(self._raw_string)))
-            char_indexes.extend(self._shifter(self._char_indexes, i * len(self._raw_string)))
-        return ANSIString(
-            raw_string,
-            code_indexes=code_indexes,
-            char_indexes=char_indexes,
-            clean_string=clean_string,
-        )
+        return ANSIString(self._raw_string * other, clean_string=self._clean_string * other)
 
     def __rmul__(self, other):
         return self.__mul__(other)
@@ -1427,16 +1636,17 @@ class ANSIString(str, metaclass=ANSIMeta):
                 ANSIString('up, right, left, down')
 
         """
-        result = ANSIString("")
-        last_item = None
-        for item in iterable:
-            if last_item is not None:
-                result += self._raw_string
+        raw_strings = []
+        clean_strings = []
+        for num, item in enumerate(iterable):
+            if num:
+                raw_strings.append(self._raw_string)
+                clean_strings.append(self._clean_string)
             if not isinstance(item, ANSIString):
                 item = ANSIString(item)
-            result += item
-            last_item = item
-        return result
+            raw_strings.append(item._raw_string)
+            clean_strings.append(item._clean_string)
+        return ANSIString("".join(raw_strings), clean_string="".join(clean_strings))
 
     def _filler(self, char, amount):
         """
@@ -1447,10 +1657,10 @@ class ANSIString(str, metaclass=ANSIMeta):
         if not isinstance(char, ANSIString):
             line = char * amount
             return ANSIString(
-                char * amount,
-                code_indexes=[],
-                char_indexes=list(range(0, len(line))),
-                clean_string=char,
+                line,
+                code_indexes=range(0),
+                char_indexes=range(len(line)),
+                clean_string=line,
             )
         try:
             start = char._code_indexes[0]
@@ -1460,14 +1670,7 @@ class ANSIString(str, metaclass=ANSIMeta):
         prefix = char._raw_string[start:end]
         postfix = char._raw_string[end + 1 :]
         line = char._clean_string * amount
-        code_indexes = [i for i in range(0, len(prefix))]
-        length = len(prefix) + len(line)
-        code_indexes.extend([i for i in range(length, length + len(postfix))])
-        char_indexes = self._shifter(list(range(0, len(line))), len(prefix))
-        raw_string = prefix + line + postfix
-        return ANSIString(
-            raw_string, clean_string=line, char_indexes=char_indexes, code_indexes=code_indexes
-        )
+        return ANSIString(prefix + line + postfix, clean_string=line)
 
     # The following methods should not be called with the '_difference' argument explicitly. This is
     # data provided by the wrapper _spacing_preflight.
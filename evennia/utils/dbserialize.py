@@ -21,6 +21,7 @@ be out of sync with the database.
 
 from collections import OrderedDict, defaultdict, deque
 from collections.abc import MutableMapping, MutableSequence, MutableSet
+from contextlib import contextmanager
 from functools import update_wrapper
 
 try:
@@ -37,7 +38,16 @@ from evennia.utils import logger
 from evennia.utils.utils import is_iter, to_bytes, uses_database
 from enum import IntFlag
 
-__all__ = ("to_pickle", "from_pickle", "do_pickle", "do_unpickle", "dbserialize", "dbunserialize")
+__all__ = (
+    "to_pickle",
+    "from_pickle",
+    "do_pickle",
+    "do_unpickle",
+    "dbserialize",
+    "dbunserialize",
+    "deferred_saves",
+    "flush_deferred_saves",
+)
 
 PICKLE_PROTOCOL = 2
 
@@ -134,6 +144,134 @@ def _init_globals():
             _IGNORE_DATETIME_MODELS.append(src_key)
 
 
+#
+# Deferred saving of nested mutables
+#
+
+# nesting depth of active `deferred_saves` blocks
+_DEFERRED_SAVE_DEPTH = 0
+# {id(db_obj): (db_obj, root_saver_mutable)} waiting to be saved
+_DEFERRED_SAVES = {}
+_DEFERRED_SAVE_TASK = None
+_COALESCE_SAVES = None
+
+
+@contextmanager
+def deferred_saves():
+    """
+    Context manager for batching updates to nested Attribute mutables. Normally
+    every change to a nested `_SaverList`/`_SaverDict` etc re-serializes and saves
+    the full Attribute. Inside this block, the Attribute is instead only marked
+    as dirty and is serialized and saved once when the (outermost) block exits.
+
+    Example:
+    ::
+
+        with deferred_saves():
+            for slot in range(100):
+                obj.db.inventory["slots"][slot] = None
+
+    """
+    global _DEFERRED_SAVE_DEPTH
+    _DEFERRED_SAVE_DEPTH += 1
+    try:
+        yield
+    finally:
+        _DEFERRED_SAVE_DEPTH -= 1
+        if not _DEFERRED_SAVE_DEPTH:
+            flush_deferred_saves()
+
+
+def flush_deferred_saves():
+    """
+    Save all Attributes with pending nested updates.
+
+    Returns:
+        int: The number of Attributes saved.
+
+    """
+    global _DEFERRED_SAVES, _DEFERRED_SAVE_TASK
+    if _DEFERRED_SAVE_TASK and _DEFERRED_SAVE_TASK.active():
+        _DEFERRED_SAVE_TASK.cancel()
+    _DEFERRED_SAVE_TASK = None
+
+    pending, _DEFERRED_SAVES = _DEFERRED_SAVES, {}
+    nsaved = 0
+    for db_obj, root in pending.values():
+        if getattr(db_obj, "_is_deleted", False) or not db_obj.pk:
+            # the Attribute was deleted before we got around to saving it
+            continue
+        db_obj.value = root
+        nsaved += 1
+    return nsaved
+
+
+def get_deferred_save(db_obj):
+    """
+    Get the not-yet-saved nested mutable of an Attribute.
+
+    Args:
+        db_obj (Attribute): The Attribute to check.
+
+    Returns:
+        _SaverMutable or None: The live (updated) root mutable of the Attribute,
+            if it has pending updates.
+
+    """
+    if _DEFERRED_SAVES:
+        entry = _DEFERRED_SAVES.get(id(db_obj))
+        if entry and entry[0] is db_obj:
+            return entry[1]
+    return None
+
+
+def discard_deferred_save(db_obj):
+    """
+    Forget pending nested updates to an Attribute, such as when its value is
+    being replaced outright.
+
+    Args:
+        db_obj (Attribute): The Attribute to discard pending updates for.
+
+    """
+    if _DEFERRED_SAVES:
+        entry = _DEFERRED_SAVES.get(id(db_obj))
+        if entry and entry[0] is db_obj:
+            del _DEFERRED_SAVES[id(db_obj)]
+
+
+def _defer_save(db_obj, root):
+    """
+    Try to defer saving of an updated root mutable.
+
+    Args:
+        db_obj (Attribute): The Attribute to (eventually) save to.
+        root (_SaverMutable): The root mutable to store.
+
+    Returns:
+        bool: If the save was deferred. If not, it should be saved directly.
+
+    """
+    global _COALESCE_SAVES, _DEFERRED_SAVE_TASK
+    if _COALESCE_SAVES is None:
+        from django.conf import settings
+
+        _COALESCE_SAVES = settings.ATTRIBUTE_SAVE_COALESCE
+
+    if _DEFERRED_SAVE_DEPTH:
+        _DEFERRED_SAVES[id(db_obj)] = (db_obj, root)
+        return True
+    if _COALESCE_SAVES:
+        _DEFERRED_SAVES[id(db_obj)] = (db_obj, root)
+        if not (_DEFERRED_SAVE_TASK and _DEFERRED_SAVE_TASK.active()):
+            from twisted.internet import reactor
+
+            # save at the start of the next reactor iteration
+            _DEFERRED_SAVE_TASK = reactor.callLater(0, flush_deferred_saves)
+        return True
+    return False
+
+
 #
 # SaverList, SaverDict, SaverSet - Attribute-specific helper classes and functions
 #
@@ -185,7 +323,8 @@ class _SaverMutable:
                         cls_name=cls_name, obj=self, non_saver_name=non_saver_name
                     )
                 )
-            self._db_obj.value = self
+            if not _defer_save(self._db_obj, self):
+                self._db_obj.value = self
         else:
             logger.log_err("_SaverMutable %s has no root Attribute to save to." % self)
 
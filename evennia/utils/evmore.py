@@ -36,9 +36,12 @@ the `caller.msg()` construct every time the page is updated.
 ----
 
 """
+from collections import OrderedDict
+from itertools import islice
+
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models.query import QuerySet
+from django.db.models.query import ModelIterable, QuerySet
 from django.utils.translation import gettext as _
 
 import evennia
@@ -57,6 +60,9 @@ _SCREEN_HEIGHT = settings.CLIENT_DEFAULT_HEIGHT
 
 _EVTABLE = None
 
+# max number of page boundaries remembered when paging a queryset by id
+_MAX_PAGE_KEYS = 100
+
 _LBR = ANSIString("\n")
 
 # text
@@ -143,6 +149,30 @@ def queryset_maxsize(qs):
     return qs.count()
 
 
+def queryset_keyset_order(qs):
+    """
+    Check if a queryset can be paged by its primary key (keyset pagination)
+    rather than by offset.
+
+    Args:
+        qs (QuerySet): The queryset to check.
+
+    Returns:
+        bool or None: `True` if ordered by ascending primary key, `False` if
+            descending and `None` if the queryset cannot be paged by key.
+
+    """
+    if qs.query.is_sliced or not issubclass(qs._iterable_class, ModelIterable):
+        return None
+    pkname = qs.model._meta.pk.name
+    ordering = tuple(qs.query.order_by)
+    if ordering in (("pk",), (pkname,)):
+        return True
+    if ordering in (("-pk",), ("-" + pkname,)):
+        return False
+    return None
+
+
 class EvMore(object):
     """
     The main pager object
@@ -174,6 +204,11 @@ class EvMore(object):
                 - If `EvTable`, the EvTable will be paginated with the same
                   setting on each page if it is too long. The table
                   decorations will be considered in the size of the page.
+                - If a `QuerySet`, each result is a line and only the results on
+                  the shown page are fetched from the database. If the queryset
+                  is ordered by id (`.order_by("id")` or `.order_by("-id")`),
+                  pages are fetched by id instead of by offset, which remains
+                  fast also far into large result sets.
                 - Otherwise `inp` is converted to an iterator, where each step is
                   expected to be a line in the final display. Each line
                   will be run through `iter_callable`.
@@ -250,6 +285,8 @@ class EvMore(object):
         self._data = None
 
         self._pages = []
+        self._lines = []
+        self._page_keys = OrderedDict()
         self._npos = 0
 
         self._npages = 1
@@ -378,6 +415,50 @@ class EvMore(object):
         """
         return self._data.page(pageno + 1)
 
+    def paginator_lines(self, pageno):
+        """
+        Paginate an iterator of lines, only consuming it as far as needed for
+        the page. Lines already consumed are kept for paging back.
+
+        """
+        end = pageno * self.height + self.height
+        lines = self._lines
+        if len(lines) < end:
+            lines.extend(str(line) for line in islice(self._data, end - len(lines)))
+        return "\n".join(lines[pageno * self.height : end])
+
+    def paginator_keyset(self, pageno):
+        """
+        Paginate a queryset ordered by id, by fetching the results after the last
+        id of the previous page (or before the first id of the next page). This
+        avoids the database having to skip past all earlier results to get to a
+        page. Falls back to offset for pages without a known neighbor.
+
+        """
+        qs, ascending = self._data
+        height = self.height
+        keys = self._page_keys
+        after, before = ("pk__gt", "pk__lt") if ascending else ("pk__lt", "pk__gt")
+
+        if pageno == 0:
+            page = list(qs[:height])
+        elif pageno - 1 in keys:
+            page = list(qs.filter(**{after: keys[pageno - 1][1]})[:height])
+        elif pageno + 1 in keys:
+            page = list(qs.reverse().filter(**{before: keys[pageno + 1][0]})[:height])[::-1]
+        elif pageno == self._npages - 1:
+            page = list(qs.reverse()[: self._nsize - pageno * height])[::-1]
+        else:
+            page = list(qs[pageno * height : pageno * height + height])
+
+        if page:
+            # remember the page boundaries, but only for the most recent pages
+            keys[pageno] = (page[0].pk, page[-1].pk)
+            keys.move_to_end(pageno)
+            if len(keys) > _MAX_PAGE_KEYS:
+                keys.popitem(last=False)
+        return page
+
     # default helpers to set up particular input types
 
     def init_evtable(self, table):
@@ -386,17 +467,24 @@ class EvMore(object):
             # enforced height of each paged table, plus space for evmore extras
             self.height = table.height - 4
 
-        # convert table to string
-        text = str(table)
+        # the table rows are only formatted when the page they are on is shown
+        self._data = table.iter_lines()
+        nlines = table.cheight
+        self._npages = max(1, nlines // self.height + (0 if nlines % self.height == 0 else 1))
         self._justify = False
         self._justify_kwargs = None  # enforce
-        self.init_str(text)
 
     def init_queryset(self, qs):
         """The input is a queryset"""
         nsize = qs.count()  # we assume each will be a line
         self._npages = nsize // self.height + (0 if nsize % self.height == 0 else 1)
+        self._nsize = nsize
         self._data = qs
+        self._page_formatter = self.lines_formatter
+
+    def lines_formatter(self, page):
+        """Format a page of results with one result per line."""
+        return "\n".join(str(item) for item in page)
 
     def init_django_paginator(self, pages):
         """
@@ -486,11 +574,16 @@ class EvMore(object):
         if inherits_from(inp, "evennia.utils.evtable.EvTable"):
             # an EvTable
             self.init_evtable(inp)
-            self._paginator = self.paginator_index
+            self._paginator = self.paginator_lines
         elif isinstance(inp, QuerySet):
             # a queryset
             self.init_queryset(inp)
-            self._paginator = self.paginator_slice
+            ascending = queryset_keyset_order(inp)
+            if ascending is None:
+                self._paginator = self.paginator_slice
+            else:
+                self._data = (inp, ascending)
+                self._paginator = self.paginator_keyset
         elif isinstance(inp, Paginator):
             self.init_django_paginator(inp)
             self._paginator = self.paginator_django
@@ -446,6 +446,8 @@ class EvCell:
         self.data = self._split_lines(_to_ansi(data))
         self.raw_width = max(d_len(line) for line in self.data)
         self.raw_height = len(self.data)
+        # {(width, alignment...): lines} - the data wrapped and aligned to a width
+        self._line_cache = {}
 
         # this is extra trimming required for cels in the middle of a table only
         self.trim_horizontal = 0
@@ -476,9 +478,30 @@ class EvCell:
         Apply all EvCells' formatting operations.
 
         """
-        data = self._border(self._pad(self._valign(self._align(self._fit_width(self.data)))))
+        data = self._border(self._pad(self._valign(self._get_aligned())))
         return data
 
+    def _get_aligned(self):
+        """
+        Get the data wrapped to the width of the cell and aligned. This only
+        changes with the width and alignment options, so it's cached (and
+        shared with copies of the cell) for each combination of these.
+
+        Returns:
+            lines (list): The wrapped and aligned lines.
+
+        """
+        key = (
+            self.width,
+            self.align,
+            self.hfill_char,
+            self.enforce_size and (self.height, self.crop_string),
+        )
+        lines = self._line_cache.get(key)
+        if lines is None:
+            lines = self._line_cache[key] = self._align(self._fit_width(self.data))
+        return lines
+
     def _split_lines(self, text):
         """
         Simply split by linebreaks
@@ -637,15 +660,19 @@ class EvCell:
             + max(0, self.border_right - 1)
         )
 
-        vfill = self.corner_top_left_char if left else ""
-        vfill += cwidth * self.border_top_char
-        vfill += self.corner_top_right_char if right else ""
-        top = [vfill for _ in range(self.border_top)]
+        top = []
+        if self.border_top > 0:
+            vfill = self.corner_top_left_char if left else ""
+            vfill += cwidth * self.border_top_char
+            vfill += self.corner_top_right_char if right else ""
+            top = [vfill for _ in range(self.border_top)]
 
-        vfill = self.corner_bottom_left_char if left else ""
-        vfill += cwidth * self.border_bottom_char
-        vfill += self.corner_bottom_right_char if right else ""
-        bottom = [vfill for _ in range(self.border_bottom)]
+        bottom = []
+        if self.border_bottom > 0:
+            vfill = self.corner_bottom_left_char if left else ""
+            vfill += cwidth * self.border_bottom_char
+            vfill += self.corner_bottom_right_char if right else ""
+            bottom = [vfill for _ in range(self.border_bottom)]
 
         return top + [left + line + right for line in data] + bottom
 
@@ -679,7 +706,16 @@ class EvCell:
             natural_height (int): Height of cell.
 
         """
-        return len(self.formatted)  # if self.formatted else 0
+        if self.formatted:
+            return len(self.formatted)
+        # count the lines without formatting the cell
+        return (
+            max(0, self.border_top)
+            + max(0, self.pad_top)
+            + max(len(self._get_aligned()), self.height)
+            + max(0, self.pad_bottom)
+            + max(0, self.border_bottom)
+        )
 
     def get_width(self):
         """
@@ -689,7 +725,7 @@ class EvCell:
             natural_width (int): Width of cell.
 
         """
-        return d_len(self.formatted[0])  # if self.formatted else 0
+        return d_len(self.get()[0])
 
     def replace_data(self, data, **kwargs):
         """
@@ -706,6 +742,7 @@ class EvCell:
         self.data = self._split_lines(_to_ansi(data))
         self.raw_width = max(d_len(line) for line in self.data)
         self.raw_height = len(self.data)
+        self._line_cache = {}
         self.reformat(**kwargs)
 
     def reformat(self, **kwargs):
@@ -831,8 +868,8 @@ class EvCell:
             if self.height <= 0 < self.raw_height:
                 raise Exception("Cell height too small, no room for data.")
 
-        # reformat (to new sizes, padding, header and borders)
-        self.formatted = self._reformat()
+        # the cell is reformatted (to new sizes, padding, header and borders) when next used
+        self.formatted = None
 
     def get(self):
         """
@@ -843,6 +880,19 @@ class EvCell:
             self.formatted = self._reformat()
         return self.formatted
 
+    def __deepcopy__(self, memo):
+        """
+        Copying a cell (as done when balancing a table) doesn't need to copy the
+        text, which is never changed in-place. The copy shares the cache of
+        wrapped lines with the original.
+
+        """
+        cell = copy(self)
+        cell.data = list(self.data)
+        if self.formatted:
+            cell.formatted = list(self.formatted)
+        return cell
+
     def __repr__(self):
         if not self.formatted:
             self.formatted = self._reformat()
@@ -1453,13 +1503,14 @@ class EvTable:
         self.cwidth = sum(cwidths)
         self.cheight = sum(cheights)
 
-    def _generate_lines(self):
+    def _generate_lines(self, balance=True):
         """
         Generates lines across all columns
         (each cell may contain multiple lines)
-        This will also balance the table.
+        This will also balance the table, unless `balance` is `False`.
         """
-        self._balance()
+        if balance:
+            self._balance()
         for iy in range(self.nrows):
             cell_row = [col[iy] for col in self.worktable]
             # this produces a list of lists, each of equal length
@@ -1655,6 +1706,20 @@ class EvTable:
         self.table[index].options.update(kwargs)
         self.table[index].reformat(**kwargs)
 
+    def iter_lines(self):
+        """
+        Balance the table and iterate over its lines. Cells are only formatted
+        when the row they are on is reached, so this can be used to show part of
+        a large table without rendering all of it.
+
+        Returns:
+            iterator: The lines of the table, in order. After this call, the total
+                number of lines is available as `.cheight`.
+
+        """
+        self._balance()
+        return self._generate_lines(balance=False)
+
     def get(self):
         """
         Return lines of table as a list.
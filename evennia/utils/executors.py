@@ -0,0 +1,293 @@
+"""
+Executors
+
+Named, size-limited thread pools for running blocking code (like file- or
+network-access or heavy text processing) outside of the main reactor
+thread, so it doesn't stall the rest of the server.
+
+Each pool is configured in `settings.EXECUTOR_POOLS` as
+`{name: {"maxthreads": int, "maxqueue": int}}`. `maxthreads` is the number
+of threads running jobs at the same time and `maxqueue` how many jobs may
+wait for a free thread; submitting more than that raises `ExecutorFullError`
+so callers can back off instead of piling up work. Pools not in the setting
+use the limits of the "default" pool.
+
+Usage:
+
+```python
+from evennia.utils.executors import run_in_executor
+
+def generate_map(seed):
+    # pure computation, no database access
+    ...
+    return grid
+
+def at_map(grid, caller=None):
+    # called in the main thread - safe to access the database here
+    caller.location.db.map = grid
+
+run_in_executor(generate_map, 1234, pool="mapgen", at_return=at_map,
+                at_return_kwargs={"caller": caller})
+```
+
+The function runs in a worker thread while the callbacks are called in the
+main reactor thread, so results should be returned and stored from there.
+Code running in a worker thread should not access typeclassed entities or
+the database directly; if it must, use `evennia.utils.utils.run_in_main_thread`
+to have it done in the main thread.
+
+Note that pure-Python computation still holds the interpreter lock, so
+threads mainly help for code that waits (on disk, network or external
+processes) or that releases the lock (like many C-extensions).
+
+"""
+
+import threading
+from collections import Counter
+
+from django.conf import settings
+from twisted.internet import reactor
+from twisted.internet.defer import CancelledError, Deferred
+from twisted.python import threadpool
+from twisted.python.failure import Failure
+
+from evennia.utils import logger
+
+_EXECUTORS = {}
+
+
+class ExecutorFullError(RuntimeError):
+    """
+    Raised when submitting to an executor pool whose queue is full.
+
+    """
+
+
+class ExecutorPool:
+    """
+    A named thread pool with a limited number of threads and waiting jobs.
+
+    """
+
+    def __init__(self, name, maxthreads=4, maxqueue=1000):
+        """
+        Args:
+            name (str): The name of the pool.
+            maxthreads (int, optional): The max number of jobs running at the same time.
+            maxqueue (int, optional): The max number of jobs waiting for a free thread.
+                If 0, there is no limit.
+
+        """
+        self.name = name
+        self.maxthreads = max(1, maxthreads)
+        self.maxqueue = max(0, maxqueue)
+        self.reactor = reactor
+        self._threadpool = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.metrics = Counter()
+
+    def start(self):
+        """
+        Start the worker threads. This is done automatically on first use.
+
+        """
+        if self._threadpool is None:
+            self._threadpool = threadpool.ThreadPool(
+                minthreads=0, maxthreads=self.maxthreads, name=f"evennia-{self.name}"
+            )
+            self._threadpool.start()
+            self.reactor.addSystemEventTrigger("during", "shutdown", self.stop)
+
+    def stop(self):
+        """
+        Stop the worker threads, waiting for running jobs to finish.
+
+        """
+        if self._threadpool is not None:
+            pool, self._threadpool = self._threadpool, None
+            pool.stop()
+
+    def _run(self, job, func, args, kwargs):
+        """
+        Run a job (in a worker thread).
+
+        """
+        with self._lock:
+            self._queued -= 1
+            if job["cancelled"]:
+                return
+            self._running += 1
+        try:
+            result = func(*args, **kwargs)
+            success = True
+        except BaseException:
+            result = Failure()
+            success = False
+        with self._lock:
+            self._running -= 1
+        self.reactor.callFromThread(self._finish, job, success, result)
+
+    def _finish(self, job, success, result):
+        """
+        Pass the result of a job to its Deferred (in the main thread).
+
+        """
+        deferred = job["deferred"]
+        if deferred.called:
+            # canceled while running - the result is dropped
+            return
+        if success:
+            self.metrics["completed"] += 1
+            deferred.callback(result)
+        else:
+            self.metrics["failed"] += 1
+            deferred.errback(result)
+
+    def _cancel(self, job):
+        job["cancelled"] = True
+        self.metrics["cancelled"] += 1
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run a function in a worker thread.
+
+        Args:
+            func (callable): The function to run.
+            *args: Passed to `func`.
+            **kwargs: Passed to `func`.
+
+        Returns:
+            Deferred: Fires with the return of `func` (or a Failure if it raised)
+                in the main thread. Canceling it (`deferred.cancel()`) stops the
+                job from running if it's still waiting. A job already running can't
+                be stopped, but its result will be ignored.
+
+        Raises:
+            ExecutorFullError: If `maxqueue` jobs are already waiting.
+
+        """
+        with self._lock:
+            if self.maxqueue and self._queued - self.idle_threads() >= self.maxqueue:
+                self.metrics["rejected"] += 1
+                raise ExecutorFullError(
+                    f"Executor pool '{self.name}' is full ({self.maxqueue} jobs waiting)."
+                )
+            self._queued += 1
+            self.metrics["max_queued"] = max(self.metrics["max_queued"], self._queued)
+        self.metrics["submitted"] += 1
+
+        job = {"cancelled": False}
+        job["deferred"] = Deferred(canceller=lambda deferred: self._cancel(job))
+        self.start()
+        self._threadpool.callInThread(self._run, job, func, args, kwargs)
+        return job["deferred"]
+
+    def idle_threads(self):
+        """
+        Get the number of threads not running a job.
+
+        Returns:
+            int: The number of free threads.
+
+        """
+        return max(0, self.maxthreads - self._running)
+
+    def stats(self):
+        """
+        Get statistics about the pool.
+
+        Returns:
+            dict: With keys `maxthreads`, `maxqueue`, `running` and `queued` (jobs
+                waiting for a thread) as well as the totals `submitted`, `completed`,
+                `failed`, `cancelled`, `rejected` and the most jobs waiting at
+                once, `max_queued`.
+
+        """
+        with self._lock:
+            stats = {
+                "maxthreads": self.maxthreads,
+                "maxqueue": self.maxqueue,
+                "running": self._running,
+                "queued": self._queued,
+            }
+        for key in ("submitted", "completed", "failed", "cancelled", "rejected", "max_queued"):
+            stats[key] = self.metrics[key]
+        return stats
+
+
+def get_executor(name="default"):
+    """
+    Get (or create) an executor pool by name.
+
+    Args:
+        name (str, optional): The name of the pool. Limits are taken from
+            `settings.EXECUTOR_POOLS`, falling back to those of the "default" pool.
+
+    Returns:
+        ExecutorPool: The pool.
+
+    """
+    executor = _EXECUTORS.get(name)
+    if executor is None:
+        pools = settings.EXECUTOR_POOLS
+        config = pools.get(name, pools.get("default", {}))
+        executor = _EXECUTORS[name] = ExecutorPool(name, **config)
+    return executor
+
+
+def all_executors():
+    """
+    Get all executor pools created so far.
+
+    Returns:
+        dict: `{name: ExecutorPool}`.
+
+    """
+    return dict(_EXECUTORS)
+
+
+def run_in_executor(func, *args, **kwargs):
+    """
+    Run a function in a worker thread of an executor pool, with its result
+    passed back to the main thread.
+
+    Args:
+        func (callable): The function to run. It should not access the database.
+        *args: Passed to `func`.
+
+    Keyword Args:
+        pool (str): The name of the executor pool to use. Defaults to "default".
+        at_return (callable): Called in the main thread with the return value of `func`.
+        at_return_kwargs (dict): Keyword arguments to `at_return`.
+        at_err (callable): Called in the main thread with a Failure if `func` raised
+            an error. If not given, the error is logged.
+        at_err_kwargs (dict): Keyword arguments to `at_err`.
+        **kwargs: All other keyword arguments are passed to `func`.
+
+    Returns:
+        Deferred: The Deferred of the job. Call its `.cancel()` to cancel the job.
+
+    Raises:
+        ExecutorFullError: If the pool's queue is full.
+
+    """
+    pool = kwargs.pop("pool", "default")
+    callback = kwargs.pop("at_return", None)
+    errback = kwargs.pop("at_err", None)
+    callback_kwargs = kwargs.pop("at_return_kwargs", {})
+    errback_kwargs = kwargs.pop("at_err_kwargs", {})
+
+    deferred = get_executor(pool).submit(func, *args, **kwargs)
+    if callback:
+        deferred.addCallback(callback, **callback_kwargs)
+    if errback:
+        deferred.addErrback(errback, **errback_kwargs)
+
+    def _log_error(failure):
+        if not failure.check(CancelledError):
+            logger.log_err(f"Error in executor pool '{pool}': {failure.getTraceback()}")
+
+    deferred.addErrback(_log_error)
+    return deferred
@@ -4,21 +4,26 @@ Django ID mapper
 Modified for Evennia by making sure that no model references
 leave caching unexpectedly (no use of WeakRefs).
 
-Also adds `cache_size()` for monitoring the size of the cache.
+Also adds `cache_size()` for monitoring the size of the cache and
+`evict_cache()` for keeping it bounded by evicting the least recently
+used instances.
 """
 
 import gc
 import os
 import threading
 import time
+from collections import defaultdict
+from itertools import count
 from weakref import WeakValueDictionary
 
+from django.conf import settings
 from django.core.exceptions import FieldError, ObjectDoesNotExist
 from django.db.models.base import Model, ModelBase
 from django.db.models.signals import post_migrate, post_save, pre_delete
 from django.db.transaction import atomic
 from django.db.utils import DatabaseError
-from twisted.internet.reactor import callFromThread
+from twisted.internet.reactor import callFromThread, callLater
 
 from evennia.utils import logger
 from evennia.utils.utils import dbref, get_evennia_pids, to_str
@@ -26,12 +31,20 @@ from evennia.utils.utils import dbref, get_evennia_pids, to_str
 from .manager import SharedMemoryManager
 
 AUTO_FLUSH_MIN_INTERVAL = 60.0 * 5  # at least 5 mins between cache flushes
+# when memory use is too high, evict instances until the cache is this
+# fraction of the estimated max cache size
+AUTO_EVICT_TARGET = 0.8
 
 _GA = object.__getattribute__
 _SA = object.__setattr__
 _DA = object.__delattr__
 _MONITOR_HANDLER = None
 
+# increasing counter marking when a cached instance was last accessed
+_ACCESS_COUNTER = count()
+# {dbmodel: {"hits": int, "misses": int, "evictions": int}}
+_CACHE_STATS = defaultdict(lambda: {"hits": 0, "misses": 0, "evictions": 0})
+
 # References to db-updated objects are stored here so the
 # main process can be informed to re-cache itself.
 PROC_MODIFIED_COUNT = 0
@@ -71,8 +84,11 @@ class SharedMemoryModelBase(ModelBase):
             return new_instance()
         cached_instance = cls.get_cached_instance(instance_key)
         if cached_instance is None:
+            _CACHE_STATS[cls.__dbclass__]["misses"] += 1
             cached_instance = new_instance()
             cls.cache_instance(cached_instance, new=True)
+        else:
+            _CACHE_STATS[cls.__dbclass__]["hits"] += 1
         return cached_instance
 
     def _prepare(cls):
@@ -299,7 +315,11 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         done even when instance caching is disabled.
 
         """
-        return cls.__dbclass__.__instance_cache__.get(id)
+        instance = cls.__dbclass__.__instance_cache__.get(id)
+        if instance is not None:
+            # mark as recently used
+            _SA(instance, "_idmapper_access", next(_ACCESS_COUNTER))
+        return instance
 
     @classmethod
     def cache_instance(cls, instance, new=False):
@@ -317,6 +337,7 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         if pk is not None:
             new = new or pk not in cls.__dbclass__.__instance_cache__
             cls.__dbclass__.__instance_cache__[pk] = instance
+            _SA(instance, "_idmapper_access", next(_ACCESS_COUNTER))
             if new:
                 try:
                     # trigger the at_init hook only
@@ -401,6 +422,36 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         """
         return True
 
+    def at_idmapper_evict(self):
+        """
+        This is called when the idmapper cache is too big and this instance
+        is among the least recently used ones, to be evicted from the cache.
+        Unlike `at_idmapper_flush`, this should not have side effects.
+
+        Returns:
+            bool: If True, the instance may be evicted. If False, it stays
+                in the cache.
+
+        """
+        return True
+
+    def get_idmapper_references(self):
+        """
+        Get the other cached instances this instance holds references to. These
+        are never evicted from the cache while this instance remains in it,
+        since a new instance would otherwise be loaded for the same database row.
+
+        Returns:
+            list: Instances of `SharedMemoryModel` referenced by this instance.
+
+        """
+        # related instances loaded through foreignkeys
+        return [
+            related
+            for related in self._state.fields_cache.values()
+            if isinstance(related, SharedMemoryModel)
+        ]
+
     def flush_from_cache(self, force=False):
         """
         Flush this instance from the instance cache. Use
@@ -417,6 +468,7 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
         Delete the object, clearing cache.
 
         """
+        WRITE_BEHIND_QUEUE.discard(self)
         self.flush_from_cache()
         self._is_deleted = True
         super().delete(*args, **kwargs)
@@ -445,7 +497,18 @@ class SharedMemoryModel(Model, metaclass=SharedMemoryModelBase):
             PROC_MODIFIED_COUNT += 1
             PROC_MODIFIED_OBJS[PROC_MODIFIED_COUNT] = self
 
-        if _IS_MAIN_THREAD:
+        if (
+            _IS_MAIN_THREAD
+            and not args
+            and not _IS_SUBPROCESS
+            and kwargs.get("update_fields")
+            and self.pk
+            and settings.IDMAPPER_WRITE_BEHIND
+        ):
+            # write-behind mode - the instance already exists in the database, so
+            # we can queue the changed fields and let them be flushed in a batch.
+            WRITE_BEHIND_QUEUE.add(self, kwargs["update_fields"])
+        elif _IS_MAIN_THREAD:
             # in main thread - normal operation
             try:
                 with atomic():
@@ -520,6 +583,162 @@ class WeakSharedMemoryModel(SharedMemoryModel, metaclass=WeakSharedMemoryModelBa
         abstract = True
 
 
+class WriteBehindQueue:
+    """
+    Coalescing queue for deferred saves of idmapped instances. This is used
+    when `settings.IDMAPPER_WRITE_BEHIND` is active. Field-updates of
+    already-existing instances are not committed immediately but are
+    gathered per instance (merging the set of changed fields) and then
+    committed together in one transaction, either after
+    `settings.IDMAPPER_WRITE_BEHIND_INTERVAL` seconds or as soon as
+    `settings.IDMAPPER_WRITE_BEHIND_MAXSIZE` instances are waiting.
+
+    Since the idmapper keeps the instance in memory, all reads through the
+    instance (`obj.key`, `obj.location` etc) see the new value immediately.
+    Only raw database queries will see the old value until the next flush.
+
+    """
+
+    def __init__(self):
+        # {(dbclass, pk): (instance, {fieldname, ...}), ...}
+        self._queue = {}
+        self._flush_task = None
+        # metrics
+        self.flush_count = 0
+        self.save_count = 0
+        self.coalesced_count = 0
+        self.max_depth = 0
+        self.last_flush_time = 0.0
+        self.max_flush_time = 0.0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def add(self, instance, update_fields):
+        """
+        Queue an instance for saving.
+
+        Args:
+            instance (SharedMemoryModel): The (already saved) instance to queue.
+            update_fields (iterable): The names of the fields that changed.
+
+        """
+        key = (instance.__dbclass__, instance.pk)
+        entry = self._queue.get(key)
+        if entry:
+            entry[1].update(update_fields)
+            self.coalesced_count += 1
+        else:
+            self._queue[key] = (instance, set(update_fields))
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+        if len(self._queue) >= settings.IDMAPPER_WRITE_BEHIND_MAXSIZE:
+            self.flush()
+        elif not (self._flush_task and self._flush_task.active()):
+            self._flush_task = callLater(settings.IDMAPPER_WRITE_BEHIND_INTERVAL, self.flush)
+
+    def discard(self, instance):
+        """
+        Remove an instance from the queue without saving it (such as when
+        it is being deleted).
+
+        Args:
+            instance (SharedMemoryModel): The instance to remove.
+
+        """
+        if self._queue:
+            self._queue.pop((instance.__dbclass__, instance.pk), None)
+
+    def flush(self):
+        """
+        Commit all queued instances to the database in one transaction.
+
+        Returns:
+            int: The number of instances saved.
+
+        """
+        if self._flush_task and self._flush_task.active():
+            self._flush_task.cancel()
+        self._flush_task = None
+        if not self._queue:
+            return 0
+
+        queue, self._queue = self._queue, {}
+        nsaved = 0
+        t0 = time.perf_counter()
+        with atomic():
+            for instance, update_fields in queue.values():
+                if instance._is_deleted or not instance.pk:
+                    continue
+                try:
+                    # the inner atomic is a savepoint so one failed save does not
+                    # roll back the rest of the batch
+                    with atomic():
+                        Model.save(instance, update_fields=update_fields)
+                except DatabaseError:
+                    # same fallback as for a normal save
+                    try:
+                        with atomic():
+                            Model.save(instance)
+                    except DatabaseError:
+                        logger.log_trace(f"Write-behind: Could not save {instance!r}.")
+                        continue
+                nsaved += 1
+
+        flush_time = time.perf_counter() - t0
+        self.flush_count += 1
+        self.save_count += nsaved
+        self.last_flush_time = flush_time
+        self.max_flush_time = max(self.max_flush_time, flush_time)
+        return nsaved
+
+    def metrics(self):
+        """
+        Get statistics about the queue.
+
+        Returns:
+            dict: Queue metrics, with keys `depth`, `max_depth`, `flushes`, `saves`,
+                `coalesced`, `last_flush_time` and `max_flush_time` (the latter
+                two in seconds).
+
+        """
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "flushes": self.flush_count,
+            "saves": self.save_count,
+            "coalesced": self.coalesced_count,
+            "last_flush_time": self.last_flush_time,
+            "max_flush_time": self.max_flush_time,
+        }
+
+
+WRITE_BEHIND_QUEUE = WriteBehindQueue()
+
+
+def flush_write_behind():
+    """
+    Force-commit all saves waiting in the write-behind queue. This is called
+    by the server on reload/shutdown.
+
+    Returns:
+        int: The number of instances saved.
+
+    """
+    return WRITE_BEHIND_QUEUE.flush()
+
+
+def _class_hierarchy(clslist):
+    """Recursively yield a class hierarchy"""
+    for cls in clslist:
+        subclass_list = cls.__subclasses__()
+        if subclass_list:
+            for subcls in _class_hierarchy(subclass_list):
+                yield subcls
+        else:
+            yield cls
+
+
 def flush_cache(**kwargs):
     """
     Flush idmapper cache. When doing so the cache will fire the
@@ -529,23 +748,140 @@ def flush_cache(**kwargs):
     Uses a signal so we make sure to catch cascades.
 
     """
+    from evennia.utils.dbserialize import flush_deferred_saves
 
-    def class_hierarchy(clslist):
-        """Recursively yield a class hierarchy"""
-        for cls in clslist:
-            subclass_list = cls.__subclasses__()
-            if subclass_list:
-                for subcls in class_hierarchy(subclass_list):
-                    yield subcls
-            else:
-                yield cls
-
-    for cls in class_hierarchy([SharedMemoryModel]):
+    # make sure no pending changes are lost with the flushed instances
+    flush_deferred_saves()
+    WRITE_BEHIND_QUEUE.flush()
+    for cls in _class_hierarchy([SharedMemoryModel]):
         cls.flush_instance_cache()
     # run the python garbage collector
     return gc.collect()
 
 
+def _cached_dbmodels():
+    """Get all database models with an instance cache"""
+    return set(cls.__dbclass__ for cls in _class_hierarchy([SharedMemoryModel]))
+
+
+def evict_cache(max_instances=None, fraction=None, models=None):
+    """
+    Evict the least recently used instances from the idmapper cache, so as
+    to keep it bounded without dropping everything at once (which would make
+    everything in use be reloaded from the database right after).
+
+    Args:
+        max_instances (int, optional): Keep at most this many instances of
+            each database model (like `ObjectDB` or `Attribute`).
+        fraction (float, optional): Keep at most this fraction (0..1) of the
+            currently cached instances of each database model.
+        models (list, optional): Only evict instances of these models. If not
+            given, consider all models.
+
+    Returns:
+        int: The number of instances evicted.
+
+    Notes:
+        Instances whose `at_idmapper_evict` returns `False` are kept, as are all
+        instances referenced by instances that are kept (see
+        `get_idmapper_references`). So fewer instances than asked for may be
+        evicted.
+
+    """
+    from evennia.utils.dbserialize import flush_deferred_saves
+
+    # pending nested Attribute updates must be saved to the instances they were made on
+    flush_deferred_saves()
+
+    dbmodels = _cached_dbmodels()
+    evict_dbmodels = set(model.__dbclass__ for model in models) if models else dbmodels
+
+    # pick the least recently used instances of each model
+    candidates = {}
+    for dbmodel in evict_dbmodels:
+        cache = dbmodel.__instance_cache__
+        nkeep = len(cache)
+        if max_instances is not None:
+            nkeep = min(nkeep, max_instances)
+        if fraction is not None:
+            nkeep = min(nkeep, int(len(cache) * fraction))
+        nevict = len(cache) - nkeep
+        if nevict <= 0:
+            continue
+        for instance in sorted(
+            cache.values(), key=lambda inst: inst.__dict__.get("_idmapper_access", -1)
+        ):
+            if not nevict:
+                break
+            if instance.at_idmapper_evict():
+                candidates[(dbmodel, instance.pk)] = instance
+                nevict -= 1
+    if not candidates:
+        return 0
+
+    # keep everything referenced by instances remaining in the cache
+    pending = [
+        instance
+        for dbmodel in dbmodels
+        for pk, instance in dbmodel.__instance_cache__.items()
+        if (dbmodel, pk) not in candidates
+    ]
+    while pending and candidates:
+        kept = []
+        for instance in pending:
+            for related in instance.get_idmapper_references():
+                related = candidates.pop((related.__dbclass__, related.pk), None)
+                if related is not None:
+                    kept.append(related)
+        pending = kept
+
+    # make sure no pending changes are lost with the evicted instances
+    WRITE_BEHIND_QUEUE.flush()
+    for dbmodel, pk in candidates:
+        dbmodel.__instance_cache__.pop(pk, None)
+        _CACHE_STATS[dbmodel]["evictions"] += 1
+    return len(candidates)
+
+
+def cache_stats():
+    """
+    Get the hit/miss/eviction counts of the idmapper cache since server start.
+    A 'hit' is when a database query returns an instance already in the cache,
+    a 'miss' when a new instance had to be created.
+
+    Returns:
+        dict: `{model_name: {"hits": int, "misses": int, "evictions": int}, ...}`.
+
+    """
+    return {dbmodel.__name__: dict(stats) for dbmodel, stats in _CACHE_STATS.items()}
+
+
+def get_resident_memory():
+    """
+    Get the resident memory (RSS) currently used by this process.
+
+    Returns:
+        float or None: The memory in MB, or `None` if it can't be determined.
+
+    Notes:
+        This reads `/proc/self/statm` where available and otherwise asks `ps`
+        (such as on macOS). The peak memory reported by the `resource` module
+        is not used, since it never goes down.
+
+    """
+    try:
+        with open("/proc/self/statm") as fil:
+            return int(fil.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1000000.0
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        # in kB
+        return float(os.popen("ps -p %d -o rss= 2>/dev/null" % os.getpid()).read()) / 1000.0
+    except (OSError, ValueError):
+        # no ps available (like on Windows)
+        return None
+
+
 # request_finished.connect(flush_cache)
 post_migrate.connect(flush_cache)
 
@@ -582,7 +918,10 @@ LAST_FLUSH = None
 
 def conditional_flush(max_rmem, force=False):
     """
-    Flush the cache if the estimated memory usage exceeds `max_rmem`.
+    Shrink the cache if the estimated memory usage exceeds `max_rmem`. This
+    evicts the least recently used instances until the cache is down to
+    `AUTO_EVICT_TARGET` of the cache size estimated for `max_rmem`. It also
+    enforces `settings.IDMAPPER_CACHE_MAX_INSTANCES`, if set.
 
     The flusher has a timeout to avoid flushing over and over
     in particular situations (this means that for some setups
@@ -591,7 +930,7 @@ def conditional_flush(max_rmem, force=False):
 
     Args:
         max_rmem (int): memory-usage estimation-treshold after which
-            cache is flushed.
+            cache is shrunk.
         force (bool, optional): forces a flush, regardless of timeout.
             Defaults to `False`.
 
@@ -616,6 +955,9 @@ def conditional_flush(max_rmem, force=False):
         Ncache = int(abs(float(vmem) - 35.0) / 0.0157)
         return Ncache
 
+    if settings.IDMAPPER_CACHE_MAX_INSTANCES:
+        evict_cache(max_instances=settings.IDMAPPER_CACHE_MAX_INSTANCES)
+
     if not max_rmem:
         # auto-flush is disabled
         return
@@ -634,21 +976,19 @@ def conditional_flush(max_rmem, force=False):
         )
         return
 
-    if os.name == "nt":
-        # we can't look for mem info in Windows at the moment
-        return
-
     # check actual memory usage
+    actual_rmem = get_resident_memory()
+    if actual_rmem is None:
+        # we can't look for mem info on this platform
+        return
     Ncache_max = mem2cachesize(max_rmem)
-    Ncache, _ = cache_size()
-    actual_rmem = (
-        float(os.popen("ps -p %d -o %s | tail -1" % (os.getpid(), "rss")).read()) / 1000.0
-    )  # resident memory
+    Ncache = sum(len(dbmodel.__instance_cache__) for dbmodel in _cached_dbmodels())
 
     if Ncache >= Ncache_max and actual_rmem > max_rmem * 0.9:
-        # flush cache when number of objects in cache is big enough and our
+        # shrink cache when number of objects in cache is big enough and our
         # actual memory use is within 10% of our set max
-        flush_cache()
+        evict_cache(fraction=AUTO_EVICT_TARGET * Ncache_max / Ncache)
+        gc.collect()
         LAST_FLUSH = now
 
 
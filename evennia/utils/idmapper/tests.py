@@ -1,7 +1,16 @@
+from unittest.mock import patch
+
 from django.db import models
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-from .models import SharedMemoryModel
+from . import models as idmapper_models
+from .models import (
+    WRITE_BEHIND_QUEUE,
+    SharedMemoryModel,
+    cache_stats,
+    evict_cache,
+    get_resident_memory,
+)
 
 
 class Category(SharedMemoryModel):
@@ -76,3 +85,153 @@ class SharedMemorysTest(TestCase):
         pk = article.pk
         article.delete()
         self.assertEqual(pk not in Article.__instance_cache__, True)
+
+
+class EvictionTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        Article.flush_instance_cache(force=True)
+        Category.flush_instance_cache(force=True)
+        self.regcategory = RegularCategory.objects.create(name="Category")
+        self.categories = [Category.objects.create(name="Category %d" % n) for n in range(2)]
+        self.articles = [
+            Article.objects.create(
+                name="Article %d" % n, category_id=self.categories[0].id, category2=self.regcategory
+            )
+            for n in range(10)
+        ]
+
+    def test_evict_lru(self):
+        # access the first articles, making them the most recently used
+        for article in self.articles[:3]:
+            Article.get_cached_instance(article.pk)
+        nevictions = cache_stats().get("Article", {}).get("evictions", 0)
+        nevicted = evict_cache(max_instances=3, models=[Article])
+        self.assertEqual(nevicted, 7)
+        self.assertEqual(
+            sorted(Article.__instance_cache__), sorted(article.pk for article in self.articles[:3])
+        )
+        self.assertEqual(cache_stats()["Article"]["evictions"] - nevictions, 7)
+        # an evicted article is reloaded from the database
+        article = Article.objects.get(pk=self.articles[5].pk)
+        self.assertIsNot(article, self.articles[5])
+        self.assertIs(Article.objects.get(pk=self.articles[0].pk), self.articles[0])
+
+    def test_evict_keeps_referenced(self):
+        for category in self.categories:
+            Category.get_cached_instance(category.pk)
+        # this loads the first category into the article's foreignkey cache
+        self.assertIs(self.articles[0].category, self.categories[0])
+        evict_cache(max_instances=0, models=[Category])
+        self.assertEqual(list(Category.__instance_cache__), [self.categories[0].pk])
+
+    def test_evict_hook(self):
+        with patch.object(Article, "at_idmapper_evict", return_value=False):
+            self.assertEqual(evict_cache(max_instances=0, models=[Article]), 0)
+        self.assertEqual(len(Article.__instance_cache__), 10)
+        self.assertEqual(evict_cache(fraction=0.5, models=[Article]), 5)
+        self.assertEqual(len(Article.__instance_cache__), 5)
+
+    def test_hits_and_misses(self):
+        stats = cache_stats().get("Article", {"hits": 0, "misses": 0})
+        list(Article.objects.all())
+        evict_cache(max_instances=0, models=[Article])
+        list(Article.objects.all())
+        newstats = cache_stats()["Article"]
+        self.assertEqual(newstats["hits"] - stats["hits"], 10)
+        self.assertEqual(newstats["misses"] - stats["misses"], 10)
+
+    def test_get_resident_memory(self):
+        rmem = get_resident_memory()
+        self.assertGreater(rmem, 0)
+        # without /proc, the current memory is read from ps
+        with patch("builtins.open", side_effect=OSError):
+            self.assertAlmostEqual(get_resident_memory(), rmem, delta=rmem * 0.5)
+        with (
+            patch("builtins.open", side_effect=OSError),
+            patch.object(idmapper_models.os, "popen", side_effect=OSError),
+        ):
+            self.assertIsNone(get_resident_memory())
+
+    def test_conditional_flush(self):
+        self.assertGreater(get_resident_memory(), 0)
+        with (
+            patch.object(idmapper_models, "LAST_FLUSH", 1),
+            patch.object(idmapper_models, "get_resident_memory", return_value=1000.0),
+            patch.object(idmapper_models, "_cached_dbmodels", return_value={Article}),
+            patch.object(Article, "__instance_cache__", dict.fromkeys(range(2000))),
+            patch.object(idmapper_models, "evict_cache") as mock_evict,
+            patch.object(idmapper_models, "flush_cache") as mock_flush,
+        ):
+            idmapper_models.conditional_flush(50)
+            # 50MB is estimated to fit ~955 instances, 80% of which are kept
+            mock_evict.assert_called_once_with(fraction=0.8 * 955 / 2000)
+            mock_flush.assert_not_called()
+
+
+@override_settings(IDMAPPER_WRITE_BEHIND=True, IDMAPPER_WRITE_BEHIND_MAXSIZE=5)
+class WriteBehindTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.create(name="Category")
+        self.regcategory = RegularCategory.objects.create(name="Category")
+        self.articles = [
+            Article.objects.create(
+                name="Article %d" % (n,), category=self.category, category2=self.regcategory
+            )
+            for n in range(4)
+        ]
+
+    def tearDown(self):
+        WRITE_BEHIND_QUEUE.flush()
+        super().tearDown()
+
+    def _db_name(self, article):
+        return Article.objects.filter(pk=article.pk).values_list("name", flat=True)[0]
+
+    def test_queue_and_flush(self):
+        article = self.articles[0]
+        article.name = "Changed"
+        article.save(update_fields=["name"])
+        self.assertEqual(article.name, "Changed")
+        self.assertEqual(self._db_name(article), "Article 0")
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 1)
+        self.assertEqual(WRITE_BEHIND_QUEUE.flush(), 1)
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 0)
+        self.assertEqual(self._db_name(article), "Changed")
+
+    def test_coalesce(self):
+        article = self.articles[0]
+        for num in range(3):
+            article.name = "Changed %d" % num
+            article.save(update_fields=["name"])
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 1)
+        self.assertEqual(WRITE_BEHIND_QUEUE.metrics()["coalesced"], 2)
+        WRITE_BEHIND_QUEUE.flush()
+        self.assertEqual(self._db_name(article), "Changed 2")
+
+    def test_size_threshold(self):
+        extra = Article.objects.create(
+            name="Article 4", category=self.category, category2=self.regcategory
+        )
+        for article in self.articles + [extra]:
+            article.name = "Changed"
+            article.save(update_fields=["name"])
+        # reaching the max size flushes the queue directly
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 0)
+        self.assertEqual(self._db_name(extra), "Changed")
+
+    def test_delete_discards(self):
+        article = self.articles[0]
+        article.name = "Changed"
+        article.save(update_fields=["name"])
+        article.delete()
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 0)
+        self.assertEqual(WRITE_BEHIND_QUEUE.flush(), 0)
+
+    def test_full_save_is_immediate(self):
+        article = self.articles[0]
+        article.name = "Changed"
+        article.save()
+        self.assertEqual(len(WRITE_BEHIND_QUEUE), 0)
+        self.assertEqual(self._db_name(article), "Changed")
@@ -33,7 +33,7 @@ from base64 import b64decode, b64encode
 from copy import Error as CopyError
 from copy import deepcopy
 from datetime import datetime
-from pickle import dumps, loads
+from pickle import dumps
 from zlib import compress, decompress
 
 # import six # this is actually a pypy component, not in default syslib
@@ -44,6 +44,7 @@ from django.forms.widgets import Textarea
 from django.utils.encoding import force_str
 
 from evennia.utils.dbserialize import pack_dbobj
+from evennia.utils.serializers import PickleSerializer, deserialize, get_serializer
 
 DEFAULT_PROTOCOL = 4
 
@@ -98,7 +99,11 @@ def dbsafe_encode(value, compress_object=False, pickle_protocol=DEFAULT_PROTOCOL
         # database model.
         value = pack_dbobj(value)
 
-    value = dumps(value, protocol=pickle_protocol)
+    serializer = get_serializer()
+    if isinstance(serializer, PickleSerializer):
+        value = dumps(value, protocol=pickle_protocol)
+    else:
+        value = serializer.dumps(value)
 
     if compress_object:
         value = compress(value)
@@ -111,7 +116,8 @@ def dbsafe_decode(value, compress_object=False):
     value = b64decode(value)
     if compress_object:
         value = decompress(value)
-    return loads(value)
+    # this handles data stored with any serializer backend
+    return deserialize(value)
 
 
 class PickledWidget(Textarea):
@@ -0,0 +1,146 @@
+"""
+Serializer backends
+
+This module holds the backends used to turn the (already `to_pickle`-prepared)
+data of `PickledObjectField`s, such as Attribute values, into bytes for
+database storage and back again. The backend is set with
+`settings.DATA_SERIALIZER`.
+
+- `PickleSerializer` - the default, stores the data with Python's `pickle`.
+
+A custom backend should inherit from `BaseSerializer` and mark its data with a
+unique `prefix`. Data without the prefix of the active backend is read as
+pickle, so existing data can still be read after switching backend. Note
+however that `exact`-lookups on a serialized field (like searching for
+Attributes with a given value) compare the serialized bytes, so data stored
+with one backend will not be found by lookups made with another. Use
+`evennia.server.profiling.serializer_benchmark` to compare a custom backend
+with pickle.
+
+"""
+
+from pickle import dumps, loads
+
+from django.conf import settings
+
+from evennia.utils.utils import class_from_module
+
+_SERIALIZER = None
+
+
+class BaseSerializer:
+    """
+    Base class for serializer backends.
+
+    """
+
+    # a unique prefix for data stored with this serializer. This must not
+    # collide with the start of a pickle (which starts with `\x80` for all
+    # protocols we use).
+    prefix = b""
+
+    def dumps(self, data):
+        """
+        Serialize data.
+
+        Args:
+            data (any): The data to serialize. This has already been passed through
+                `dbserialize.to_pickle`, so database objects have been packed.
+
+        Returns:
+            bytes: The serialized data.
+
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        Deserialize data.
+
+        Args:
+            data (bytes): Data serialized by this backend.
+
+        Returns:
+            any: The deserialized data.
+
+        """
+        raise NotImplementedError
+
+    def can_load(self, data):
+        """
+        Check if data was serialized with this backend.
+
+        Args:
+            data (bytes): Serialized data.
+
+        Returns:
+            bool: If this serializer can deserialize the data.
+
+        """
+        return bool(self.prefix) and data.startswith(self.prefix)
+
+
+class PickleSerializer(BaseSerializer):
+    """
+    Serialize with Python's standard `pickle` module.
+
+    """
+
+    def __init__(self, protocol=4):
+        self.protocol = protocol
+
+    def dumps(self, data):
+        return dumps(data, protocol=self.protocol)
+
+    def loads(self, data):
+        return loads(data)
+
+    def can_load(self, data):
+        # also used as fallback for everything without a known prefix
+        return True
+
+
+def get_serializer():
+    """
+    Get the serializer backend set by `settings.DATA_SERIALIZER`.
+
+    Returns:
+        BaseSerializer: The serializer to use for storing data.
+
+    """
+    global _SERIALIZER
+    if not _SERIALIZER:
+        _SERIALIZER = class_from_module(settings.DATA_SERIALIZER)()
+    return _SERIALIZER
+
+
+def serialize(data):
+    """
+    Serialize data with the currently active serializer backend.
+
+    Args:
+        data (any): The data to serialize.
+
+    Returns:
+        bytes: The serialized data.
+
+    """
+    return get_serializer().dumps(data)
+
+
+def deserialize(data):
+    """
+    Deserialize data stored by the active serializer backend or with pickle.
+
+    Args:
+        data (bytes): The serialized data.
+
+    Returns:
+        any: The deserialized data.
+
+    """
+    serializer = get_serializer()
+    if serializer.prefix and serializer.can_load(data):
+        return serializer.loads(data)
+    # data stored before switching backend
+    return loads(data)
@@ -8,6 +8,7 @@ Test of the ANSI parsing and ANSIStrings.
 
 from django.test import TestCase
 
+from evennia.utils.ansi import ANSIParser
 from evennia.utils.ansi import ANSIString as AN
 
 
@@ -52,3 +53,71 @@ class TestANSIString(TestCase):
         self.assertEqual(split2, split3, "Split 2 and 3 differ")
         self.assertEqual(split1, split2, "Split 1 and 2 differ")
         self.assertEqual(split1, split3, "Split 1 and 3 differ")
+
+
+class TestANSIParser(TestCase):
+    """
+    Verifies the tokenizing of markup in ANSIParser.
+    """
+
+    def setUp(self):
+        self.parser = ANSIParser()
+
+    def test_tokenize(self):
+        self.assertEqual(
+            self.parser.tokenize("|rred||r|n |123x|#ff0000y"),
+            [
+                ("ansi", "|r", ()),
+                "red",
+                "|",
+                "r",
+                ("ansi", "|n", ()),
+                " ",
+                ("fg", "|123", ("1", "2", "3")),
+                "x",
+                ("hex", "|#ff0000", ("|#", "ff0000")),
+                "y",
+            ],
+        )
+
+    def test_emit(self):
+        string = "|[r|wWhite on red|n and |#ff0000hex|n"
+        tokens = self.parser.tokenize(string)
+        self.assertEqual(
+            self.parser.emit(tokens),
+            "\x1b[41m\x1b[1m\x1b[37mWhite on red\x1b[0m and \x1b[1m\x1b[31mhex\x1b[0m",
+        )
+        self.assertEqual(
+            self.parser.emit(tokens, xterm256=True, truecolor=True),
+            "\x1b[48;5;196m\x1b[1m\x1b[37mWhite on red\x1b[0m and \x1b[38;2;255;0;0mhex\x1b[0m",
+        )
+        self.assertEqual(self.parser.emit(tokens, strip_ansi=True), "White on red and hex")
+
+    def test_parse_matches_chained(self):
+        """The single-pass parser gives the same result as the old chained regexes"""
+        from evennia.server.profiling.ansi_benchmark import _parse_chained
+
+        strings = [
+            "|rred||r|n |123x|#ff0000y",
+            "|||r ||| |||| |r|||n",
+            "|[r|wWhite on red|n |[x|Wbright|n |[=c|=kgrey|n",
+            "|[#00ff00bg|n |#abcdef|[#123456 both|n |#zzzzzz not hex",
+            "|500fg|[050bg|=a|[=z grey|n |678 out of range |[999",
+            "|lclook|ltLook here|le and |luhttp://x.com|ltlink|le",
+            "|*inverse|n |^blink|n |_under|n |uund|n |-tab |/ newline |>indent",
+            "plain text with no markup at all",
+            "ends with a pipe |",
+        ]
+        for kwargs in (
+            {},
+            {"xterm256": True},
+            {"xterm256": True, "truecolor": True},
+            {"xterm256": True, "mxp": True},
+            {"strip_ansi": True},
+        ):
+            for string in strings:
+                self.assertEqual(
+                    self.parser.parse_ansi(string, **kwargs),
+                    _parse_chained(self.parser, string, **kwargs),
+                    (string, kwargs),
+                )
@@ -5,10 +5,13 @@ Tests for dbserialize module
 from collections import defaultdict, deque
 
 from django.test import TestCase
+from mock import patch
 from parameterized import parameterized
 
 from evennia.objects.objects import DefaultObject
+from evennia.typeclasses.attributes import Attribute
 from evennia.utils import dbserialize
+from evennia.utils.idmapper.models import evict_cache
 from enum import IntFlag, auto
 
 
@@ -137,6 +140,74 @@ class TestDbSerialize(TestCase):
         self.assertEqual(list(self.obj.db.test), [2])
 
 
+class TestDeferredSaves(TestCase):
+    """
+    Batching of nested mutable saves.
+    """
+
+    def setUp(self):
+        self.obj = DefaultObject(db_key="Tester")
+        self.obj.save()
+        self.obj.db.test = {"slots": [0, 0, 0, 0]}
+
+    def _stored(self):
+        attr = self.obj.attributes.get("test", return_obj=True)
+        return dbserialize.from_pickle(attr.db_value)
+
+    def test_deferred(self):
+        attr = self.obj.attributes.get("test", return_obj=True)
+        with patch.object(
+            type(attr), "save", autospec=True, side_effect=type(attr).save
+        ) as mock_save:
+            with self.obj.attributes.deferred():
+                for slot in range(4):
+                    self.obj.db.test["slots"][slot] = slot + 1
+                # not yet saved, but visible to readers
+                self.assertEqual(self._stored(), {"slots": [0, 0, 0, 0]})
+                self.assertEqual(self.obj.db.test, {"slots": [1, 2, 3, 4]})
+            mock_save.assert_called_once()
+        self.assertEqual(self._stored(), {"slots": [1, 2, 3, 4]})
+
+    def test_deferred__nested_blocks(self):
+        with dbserialize.deferred_saves():
+            with dbserialize.deferred_saves():
+                self.obj.db.test["slots"][0] = 5
+            self.assertEqual(self._stored(), {"slots": [0, 0, 0, 0]})
+        self.assertEqual(self._stored(), {"slots": [5, 0, 0, 0]})
+
+    def test_deferred__replaced_value(self):
+        with self.obj.attributes.deferred():
+            self.obj.db.test["slots"][0] = 5
+            self.obj.db.test = "replaced"
+        self.assertEqual(self.obj.db.test, "replaced")
+
+    def test_deferred__deleted(self):
+        with self.obj.attributes.deferred():
+            self.obj.db.test["slots"][0] = 5
+            del self.obj.db.test
+        self.assertEqual(self.obj.db.test, None)
+
+    @patch("evennia.utils.dbserialize._COALESCE_SAVES", True)
+    @patch("twisted.internet.reactor.callLater")
+    def test_coalesce(self, mock_calllater):
+        self.obj.db.test["slots"][0] = 5
+        self.obj.db.test["slots"][1] = 6
+        mock_calllater.assert_called_once_with(0, dbserialize.flush_deferred_saves)
+        self.assertEqual(self._stored(), {"slots": [0, 0, 0, 0]})
+        self.assertEqual(dbserialize.flush_deferred_saves(), 1)
+        self.assertEqual(self._stored(), {"slots": [5, 6, 0, 0]})
+
+    @patch("evennia.utils.dbserialize._COALESCE_SAVES", True)
+    @patch("twisted.internet.reactor.callLater")
+    def test_coalesce__evicted(self, mock_calllater):
+        self.obj.db.test["slots"][0] = 5
+        # the pending save must not be lost, nor applied after the new instance loads
+        evict_cache(max_instances=0, models=[Attribute])
+        self.assertEqual(self.obj.db.test, {"slots": [5, 0, 0, 0]})
+        self.assertEqual(dbserialize.flush_deferred_saves(), 0)
+        self.assertEqual(self._stored(), {"slots": [5, 0, 0, 0]})
+
+
 class _InvalidContainer:
     """Container not saveable in Attribute (if obj is dbobj, it 'hides' it)"""
 
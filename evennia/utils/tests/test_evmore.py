@@ -0,0 +1,73 @@
+"""
+Tests for the EvMore pager.
+
+"""
+
+from mock import MagicMock, patch
+
+from evennia.objects.models import ObjectDB
+from evennia.utils import create, evmore
+from evennia.utils.test_resources import BaseEvenniaTest
+
+
+class TestEvMoreQuerySet(BaseEvenniaTest):
+    def setUp(self):
+        super().setUp()
+        self.char1.msg = MagicMock()
+        # gives 4 lines per page
+        self.session.protocol_flags["SCREENHEIGHT"] = {0: 8}
+        for num in range(6):
+            create.create_object(key=f"Obj{num}", location=self.room1)
+
+    def _pages(self, qs):
+        items = list(qs)
+        return [items[i : i + 4] for i in range(0, len(items), 4)]
+
+    def _paginate(self, qs):
+        more = evmore.EvMore(self.char1, qs, session=self.session)
+        self.assertEqual(more.height, 4)
+        return more
+
+    def test_keyset_order(self):
+        self.assertTrue(evmore.queryset_keyset_order(ObjectDB.objects.order_by("id")))
+        self.assertTrue(evmore.queryset_keyset_order(ObjectDB.objects.order_by("pk")))
+        self.assertFalse(evmore.queryset_keyset_order(ObjectDB.objects.order_by("-id")))
+        self.assertIsNone(evmore.queryset_keyset_order(ObjectDB.objects.all()))
+        self.assertIsNone(evmore.queryset_keyset_order(ObjectDB.objects.order_by("db_key")))
+        self.assertIsNone(evmore.queryset_keyset_order(ObjectDB.objects.order_by("id")[:5]))
+        self.assertIsNone(
+            evmore.queryset_keyset_order(ObjectDB.objects.order_by("id").values_list("id"))
+        )
+
+    def test_keyset_pages(self):
+        for qs in (ObjectDB.objects.order_by("id"), ObjectDB.objects.order_by("-id")):
+            pages = self._pages(qs)
+            more = self._paginate(qs)
+            self.assertEqual(more._paginator, more.paginator_keyset)
+            self.assertEqual(more._npages, len(pages))
+            self.assertGreater(len(pages), 2)
+            # paging forward, back from the end and jumping to a page
+            for pageno in list(range(len(pages))) + list(reversed(range(len(pages)))):
+                self.assertEqual(more.paginator(pageno), pages[pageno])
+            more._page_keys.clear()
+            self.assertEqual(more.paginator(len(pages) - 1), pages[-1])
+            self.assertEqual(more.paginator(len(pages) - 2), pages[-2])
+            more._page_keys.clear()
+            self.assertEqual(more.paginator(1), pages[1])
+            self.assertEqual(more.paginator(2), pages[2])
+
+    def test_page_keys_bounded(self):
+        qs = ObjectDB.objects.order_by("id")
+        pages = self._pages(qs)
+        more = self._paginate(qs)
+        with patch("evennia.utils.evmore._MAX_PAGE_KEYS", 2):
+            for pageno in range(len(pages)):
+                more.paginator(pageno)
+        self.assertEqual(list(more._page_keys), [len(pages) - 2, len(pages) - 1])
+
+    def test_display(self):
+        qs = ObjectDB.objects.order_by("id")
+        more = self._paginate(qs)
+        text = self.char1.msg.call_args[1]["text"][0]
+        self.assertTrue(text.startswith("\n".join(str(obj) for obj in qs[:4])))
+        more.page_quit(quiet=True)
@@ -3,6 +3,7 @@ Tests for EvTable component.
 
 """
 
+from copy import deepcopy
 from unittest import skip
 
 from evennia.utils import ansi, evtable
@@ -425,6 +426,38 @@ class TestEvTable(EvenniaTestCase):
 """
         self._validate(expected, str(table))
 
+    def test_iter_lines(self):
+        """
+        Rows are only formatted as they are iterated over.
+
+        """
+        table = evtable.EvTable("Name", "Value", border="cells")
+        for num in range(5):
+            table.add_row(f"name{num}", num)
+
+        lines = table.iter_lines()
+        self.assertEqual(table.cheight, 13)
+        self.assertIsNone(table.worktable[0][4].formatted)
+        self.assertEqual(next(lines), table.get()[0])
+        self.assertEqual(len(list(lines)), 12)
+        self.assertEqual(str(table), str(ansi.ANSIString("\n").join(table.get())))
+
+    def test_cell_width_cache(self):
+        """
+        Wrapped lines are cached per width and shared with copies of the cell.
+
+        """
+        cell = evtable.EvCell("A longer text to wrap", width=10)
+        self.assertEqual(cell.get_height(), 4)
+        self.assertEqual(len(cell._line_cache), 1)
+        copied = deepcopy(cell)
+        copied.reformat(width=12)
+        self.assertEqual(ansi.strip_ansi(str(copied)), " A longer   \n text to    \n wrap       ")
+        self.assertEqual(len(cell._line_cache), 2)
+        cell.replace_data("Short")
+        self.assertEqual(ansi.strip_ansi(str(cell)), " Short    ")
+        self.assertEqual(len(copied._line_cache), 2)
+
     @skip("Needs to be further invstigated")
     def test_formatting_with_carriage_return_marker_3693_b(self):
         """
@@ -0,0 +1,100 @@
+"""
+Unit tests for the evennia.utils.executors module.
+"""
+
+import threading
+
+from django.test import TestCase, override_settings
+from twisted.internet.defer import CancelledError
+
+from evennia.utils import executors
+
+
+class _FakeReactor:
+    """
+    Collects the calls made from the worker threads, to be run by the test.
+
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.triggers = []
+
+    def callFromThread(self, func, *args, **kwargs):
+        self.calls.append((func, args, kwargs))
+
+    def addSystemEventTrigger(self, *args):
+        self.triggers.append(args)
+
+    def run_calls(self):
+        calls, self.calls = self.calls, []
+        for func, args, kwargs in calls:
+            func(*args, **kwargs)
+
+
+class TestExecutorPool(TestCase):
+    def setUp(self):
+        self.pool = executors.ExecutorPool("test", maxthreads=1, maxqueue=1)
+        self.pool.reactor = _FakeReactor()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.stop()
+
+    def _block(self, value):
+        self.started.set()
+        self.release.wait(5)
+        return value
+
+    def _wait_done(self, num=1):
+        for _ in range(500):
+            if len(self.pool.reactor.calls) >= num:
+                break
+            threading.Event().wait(0.01)
+        self.pool.reactor.run_calls()
+
+    def test_submit(self):
+        results = []
+        self.pool.submit(sum, [1, 2, 3]).addCallback(results.append)
+        self._wait_done()
+        self.assertEqual(results, [6])
+        self.assertEqual(self.pool.stats()["completed"], 1)
+
+    def test_error(self):
+        failures = []
+        self.pool.submit(int, "not a number").addErrback(failures.append)
+        self._wait_done()
+        self.assertTrue(failures[0].check(ValueError))
+        self.assertEqual(self.pool.stats()["failed"], 1)
+
+    def test_queue_full_and_cancel(self):
+        results, failures = [], []
+        self.pool.submit(self._block, 1).addCallback(results.append)
+        self.started.wait(5)
+        waiting = self.pool.submit(self._block, 2)
+        waiting.addCallbacks(results.append, failures.append)
+        with self.assertRaises(executors.ExecutorFullError):
+            self.pool.submit(self._block, 3)
+
+        waiting.cancel()
+        self.assertTrue(failures[0].check(CancelledError))
+        self.release.set()
+        self._wait_done()
+        # the canceled job never ran
+        self.assertEqual(results, [1])
+        stats = self.pool.stats()
+        self.assertEqual(
+            (stats["submitted"], stats["rejected"], stats["cancelled"], stats["completed"]),
+            (2, 1, 1, 1),
+        )
+        self.assertEqual((stats["running"], stats["queued"]), (0, 0))
+
+    @override_settings(EXECUTOR_POOLS={"default": {"maxthreads": 2, "maxqueue": 10}})
+    def test_get_executor(self):
+        executor = executors.get_executor("test_get_executor")
+        self.assertEqual((executor.maxthreads, executor.maxqueue), (2, 10))
+        self.assertIs(executors.get_executor("test_get_executor"), executor)
+        self.assertIn("test_get_executor", executors.all_executors())
+        executors._EXECUTORS.pop("test_get_executor")
@@ -0,0 +1,64 @@
+"""
+Tests for the data serializer backends.
+
+"""
+
+from json import dumps, loads
+
+from django.test import TestCase
+from mock import patch
+
+from evennia.objects.objects import DefaultObject
+from evennia.typeclasses.attributes import Attribute
+from evennia.utils import serializers
+from evennia.utils.dbserialize import from_pickle
+
+
+class _JSONSerializer(serializers.BaseSerializer):
+    """
+    Minimal custom backend (only handles json-compatible data).
+
+    """
+
+    prefix = b"\xc1json"
+
+    def dumps(self, data):
+        return self.prefix + dumps(data).encode("utf-8")
+
+    def loads(self, data):
+        return loads(data[len(self.prefix) :].decode("utf-8"))
+
+
+class TestSerializers(TestCase):
+    def setUp(self):
+        self.serializer = _JSONSerializer()
+
+    def test_pickle_serializer(self):
+        serializer = serializers.PickleSerializer()
+        data = {"a": [1, (2, 3)], "b": {4}}
+        blob = serializer.dumps(data)
+        self.assertTrue(serializer.can_load(blob))
+        self.assertEqual(serializer.loads(blob), data)
+
+    def test_deserialize_any_format(self):
+        data = {"a": [1, 2]}
+        pickled = serializers.PickleSerializer().dumps(data)
+        with patch("evennia.utils.serializers._SERIALIZER", self.serializer):
+            packed = serializers.serialize(data)
+            self.assertTrue(packed.startswith(self.serializer.prefix))
+            self.assertEqual(serializers.deserialize(pickled), data)
+            self.assertEqual(serializers.deserialize(packed), data)
+
+    def test_attribute_storage(self):
+        obj = DefaultObject(db_key="Tester")
+        obj.save()
+
+        def _stored(key):
+            # bypass the idmapper to load the value from the database
+            return Attribute.objects.filter(db_key=key).values_list("db_value", flat=True)[0]
+
+        obj.db.pickled = {"a": [1, 2]}
+        with patch("evennia.utils.serializers._SERIALIZER", self.serializer):
+            obj.db.packed = {"b": [3, 4]}
+            self.assertEqual(_stored("pickled"), {"a": [1, 2]})
+            self.assertEqual(from_pickle(_stored("packed")), {"b": [3, 4]})
@@ -25,8 +25,8 @@ class ANSIStringTestCase(TestCase):
         """
         Verifies the indexes in an ANSIString match what they should.
         """
-        self.assertEqual(ansi._char_indexes, char)
-        self.assertEqual(ansi._code_indexes, code)
+        self.assertEqual(list(ansi._char_indexes), char)
+        self.assertEqual(list(ansi._code_indexes), code)
 
     def test_instance(self):
         """
@@ -242,6 +242,23 @@ class ANSIStringTestCase(TestCase):
         split_string = string[:]
         self.assertEqual(string.raw(), split_string.raw())
 
+    def test_lazy_indexes(self):
+        """
+        Verifies that the index tables are only calculated when needed.
+        """
+        string = ANSIString("|rred|n") + ANSIString(" and plain") * 2
+        self.assertIsNone(string._char_index_map)
+        self.assertEqual(len(string), 23)
+        self.assertIsNone(string._char_index_map)
+        self.checker(string[2:5], "\x1b[1m\x1b[31md\x1b[0m a", "d a")
+        self.assertIsNotNone(string._char_index_map)
+        self.assertEqual(ANSIString("plain")._char_indexes, range(5))
+
+    def test_justify(self):
+        string = ANSIString("|rTest|n")
+        self.checker(string.ljust(6), "\x1b[1m\x1b[31mTest\x1b[0m  ", "Test  ")
+        self.checker(string.center(7, "-"), "-\x1b[1m\x1b[31mTest\x1b[0m--", "-Test--")
+
 
 class TestTextToHTMLparser(TestCase):
     def setUp(self):
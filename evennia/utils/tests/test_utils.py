@@ -14,6 +14,7 @@ from django.test import TestCase
 from parameterized import parameterized
 from twisted.internet import task
 
+from evennia.server.models import ServerConfig
 from evennia.utils import utils
 from evennia.utils.ansi import ANSIString
 from evennia.utils.test_resources import BaseEvenniaTest
@@ -529,6 +530,7 @@ class TestDelay(BaseEvenniaTest):
         if _TASK_HANDLER is None:
             from evennia.scripts.taskhandler import TASK_HANDLER as _TASK_HANDLER
         _TASK_HANDLER.clock = task.Clock()
+        _TASK_HANDLER._now = False
         self.char1.ndb.dummy_var = False
 
     def tearDown(self):
@@ -740,6 +742,56 @@ class TestDelay(BaseEvenniaTest):
         )  # Clock must advance to trigger, even if past timedelay
         self.assertEqual(self.char1.ndb.dummy_var, "dummy_func ran")
 
+    def test_persist_per_task(self):
+        # each persistent task is stored separately
+        t1 = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        t2 = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        utils.delay(self.timedelay, dummy_func, self.char1.dbref)
+        stored = ServerConfig.objects.filter(db_key__startswith="delayed_task_")
+        self.assertEqual(
+            sorted(stored.values_list("db_key", flat=True)),
+            [f"delayed_task_{t1.get_id()}", f"delayed_task_{t2.get_id()}"],
+        )
+        t1.remove()
+        self.assertEqual(
+            list(stored.values_list("db_key", flat=True)), [f"delayed_task_{t2.get_id()}"]
+        )
+        _TASK_HANDLER.clear(False)
+        _TASK_HANDLER.load()
+        self.assertEqual(list(_TASK_HANDLER.tasks), [t2.get_id()])
+
+    def test_load_old_format(self):
+        # tasks stored the old way, all in one entry, are converted
+        t = utils.delay(self.timedelay, dummy_func, self.char1.dbref, persistent=True)
+        task_id = t.get_id()
+        ServerConfig.objects.conf("delayed_tasks", {task_id: _TASK_HANDLER.to_save[task_id]})
+        ServerConfig.objects.conf(f"delayed_task_{task_id}", delete=True)
+        _TASK_HANDLER.clear(False)
+        _TASK_HANDLER.load()
+        self.assertEqual(list(_TASK_HANDLER.tasks), [task_id])
+        self.assertEqual(ServerConfig.objects.conf("delayed_tasks"), None)
+        self.assertTrue(ServerConfig.objects.filter(db_key=f"delayed_task_{task_id}").exists())
+        _TASK_HANDLER.create_delays()
+        _TASK_HANDLER.clock.advance(self.timedelay)
+        self.assertEqual(self.char1.ndb.dummy_var, "dummy_func ran")
+
+    def test_get_due(self):
+        t1 = utils.delay(30, dummy_func, self.char1.dbref)
+        t2 = utils.delay(10, dummy_func, self.char1.dbref)
+        t3 = utils.delay(20, dummy_func, self.char1.dbref)
+        t3.cancel()
+        ids = (t1.get_id(), t2.get_id(), t3.get_id())
+
+        def _get_due(seconds):
+            # ignore tasks started by the test setup
+            return [t.get_id() for t in _TASK_HANDLER.get_due(seconds) if t.get_id() in ids]
+
+        self.assertEqual(_get_due(5), [])
+        self.assertEqual(_get_due(25), [t2.get_id()])
+        self.assertEqual(_get_due(60), [t2.get_id(), t1.get_id()])
+        t2.remove()
+        self.assertEqual(_get_due(60), [t1.get_id()])
+
 
 class TestIntConversions(TestCase):
     def test_int2str(self):
@@ -1277,6 +1277,9 @@ def run_async(to_execute, *args, **kwargs):
         your `to_execute` under sqlite3 you will probably run very slow or even get
         tracebacks.
 
+        This uses Twisted's shared thread pool, with no limit on waiting jobs. Use
+        `evennia.utils.executors.run_in_executor` to run in a named, size-limited pool.
+
     """
 
     # handle special reserved input kwargs